@@ -0,0 +1,287 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import pygame
+from main import Game
+from benchmarks.scenarios import SCENARIOS
+
+# --- 基准测试 ---
+# 每个场景无界面运行 N 个模拟步 (每步 update_state 后把游戏世界画到离屏表面)，
+# 统计各 operon 方法每步的耗时 (平均值、分位数) 和内存分配，结果输出为 JSON。
+# 用法 (在 newgame 目录下):
+#   python -m benchmarks.run [--frames N] [--scenario NAME ...] [--output FILE] [--baseline [FILE]]
+# 提交的 baseline.json 用于发现 WATCHED 中方法的性能退化；计时和机器相关，换机器后需重新生成。
+# 基线只能由一次跑完全部场景的结果整体生成 (--output benchmarks/baseline.json 不能与 --scenario 同用)，
+# 不要把单个场景的结果手工合并进去，否则其它场景的数字会过时。
+# 有意改变了 WATCHED 方法耗时的提交 (包括已知的变慢) 要在同一个提交里重新生成基线，
+# 否则从这个提交起 --baseline 会一直失败
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+BENCHMARK_SEED = 1234
+DEFAULT_FRAMES = 600
+DEFAULT_WARMUP = 60  # 预热步不计入统计 (地图块缓存、素材载入)
+DEFAULT_ALLOC_FRAMES = 120  # tracemalloc 开销很大，分配统计单独用较少的步数再跑一遍
+REGRESSION_THRESHOLD = 1.3  # 中位数超过基线的倍数视为退化
+WATCHED = ('EnemyOperon.update', 'CombatOperon.update', 'MapRenderOperon.draw_grid')
+
+# 被测方法: (Game 上的属性名，空串表示 Game 本身或 None 表示全局对象, 方法名)
+TARGETS = (
+    ('', 'update_state'),
+    ('', '_render_game_world'),
+    ('movement_operon', 'update'),
+    ('enemy_operon', 'update'),
+    ('npc_operon', 'update'),
+    ('combat_operon', 'update'),
+    ('weapon_operon', 'update'),
+    ('map_edit_operon', 'edit_tile'),
+    ('interact_point_operon', 'damage_door_at_rect'),
+    ('map_render_operon', 'draw_grid'),
+    ('movement_operon', 'draw'),
+    ('enemy_operon', 'draw'),
+    ('combat_operon', 'draw'),
+    ('', '_save_progress'),
+    ('', '_reset_player_state'),
+)
+
+
+class OperonTimer:
+    """
+    把被测方法替换为计时包装 (实例属性，结束后删除)，按模拟步累加每个方法的耗时或分配量
+    """
+    def __init__(self, trace_allocations=False):
+        """
+        :param trace_allocations: True 时统计分配量 (需要 tracemalloc 已启动)，否则统计耗时
+        """
+        self.trace_allocations = trace_allocations
+        self.samples = {}  # 标签 -> 每个模拟步的耗时 (ns) 或分配峰值 (字节)
+        self._step = {}
+        self._alloc_stack = []  # 嵌套调用的 [进入时已分配量, 期间的分配峰值]
+        self._patched = []
+
+    def wrap(self, obj, name):
+        label = f"{type(obj).__name__}.{name}"
+        method = getattr(obj, name)
+        wrapper = self._traced(method, label) if self.trace_allocations else self._timed(method, label)
+        setattr(obj, name, wrapper)
+        self._patched.append((obj, name))
+
+    def unwrap_all(self):
+        for obj, name in self._patched:
+            delattr(obj, name)
+        self._patched = []
+
+    def _timed(self, method, label):
+        step = self._step
+        clock = time.perf_counter_ns
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                step[label] = step.get(label, 0) + clock() - start
+        return timed
+
+    def _traced(self, method, label):
+        step = self._step
+        stack = self._alloc_stack
+
+        def traced(*args, **kwargs):
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                # 外层调用到目前为止的峰值，在重置峰值前记下
+                stack[-1][1] = max(stack[-1][1], peak)
+            frame = [current, current]
+            stack.append(frame)
+            tracemalloc.reset_peak()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                _, peak = tracemalloc.get_traced_memory()
+                stack.pop()
+                frame[1] = max(frame[1], peak)
+                if stack:
+                    stack[-1][1] = max(stack[-1][1], frame[1])
+                step[label] = step.get(label, 0) + frame[1] - frame[0]
+        return traced
+
+    def end_step(self, keep=True):
+        """结束一个模拟步；keep=False 时丢弃本步数据 (预热)"""
+        if keep:
+            for label, value in self._step.items():
+                self.samples.setdefault(label, []).append(value)
+        self._step.clear()
+
+
+def percentile(ordered, p):
+    """已排序序列的 p 分位数 (最近秩)"""
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def summarise_times(values):
+    ordered = sorted(values)
+    ms = 1e-6
+    return {
+        'steps': len(ordered),
+        'mean_ms': round(sum(ordered) / len(ordered) * ms, 4),
+        'p50_ms': round(percentile(ordered, 50) * ms, 4),
+        'p95_ms': round(percentile(ordered, 95) * ms, 4),
+        'p99_ms': round(percentile(ordered, 99) * ms, 4),
+        'max_ms': round(ordered[-1] * ms, 4),
+    }
+
+
+def summarise_allocations(values):
+    ordered = sorted(values)
+    return {
+        'alloc_mean_kb': round(sum(ordered) / len(ordered) / 1024, 2),
+        'alloc_p95_kb': round(percentile(ordered, 95) / 1024, 2),
+        'alloc_max_kb': round(ordered[-1] / 1024, 2),
+    }
+
+
+def run_pass(scenario, steps, warmup, trace_allocations):
+    """
+    在新建的无界面游戏上运行场景一遍
+    :return: 标签 -> 每步样本
+    """
+    game = Game(headless=True, seed=BENCHMARK_SEED)
+    game.start_game(scenario.save_slot)
+    scenario.setup(game)
+    current = {}
+    game.input_operon.process_input = lambda events: current['actions']
+
+    timer = OperonTimer(trace_allocations)
+    for attribute, name in TARGETS:
+        timer.wrap(getattr(game, attribute) if attribute else game, name)
+    if trace_allocations:
+        tracemalloc.start()
+    try:
+        for step in range(warmup + steps):
+            actions = game.input_operon._get_default_actions()
+            actions['mouse_pos'] = None
+            scenario.drive(game, step, actions)
+            current['actions'] = actions
+            game.update_state([])
+            game._render_game_world()
+            timer.end_step(keep=step >= warmup)
+    finally:
+        if trace_allocations:
+            tracemalloc.stop()
+        timer.unwrap_all()
+        scenario.teardown(game)
+        pygame.quit()
+    return timer.samples
+
+
+def run_scenario(scenario, frames, warmup, alloc_frames):
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        times = run_pass(scenario, frames, warmup, trace_allocations=False)
+        allocations = run_pass(scenario, alloc_frames, warmup, trace_allocations=True) if alloc_frames else {}
+    operons = {}
+    for label, values in times.items():
+        operons[label] = summarise_times(values)
+        if allocations.get(label):
+            operons[label].update(summarise_allocations(allocations[label]))
+    return {
+        'description': scenario.description,
+        'frames': frames,
+        'wall_s': round(time.perf_counter() - start, 2),
+        'operons': operons,
+    }
+
+
+def compare_with_baseline(results, baseline, threshold):
+    """
+    对比 WATCHED 方法的每步耗时中位数
+    :return: 退化列表 [(场景, 标签, 基线 ms, 本次 ms)]
+    """
+    regressions = []
+    for name, scenario in results['scenarios'].items():
+        base_scenario = baseline.get('scenarios', {}).get(name)
+        if base_scenario is None:
+            continue
+        for label in WATCHED:
+            current = scenario['operons'].get(label)
+            base = base_scenario['operons'].get(label)
+            if current is None or base is None or base['p50_ms'] <= 0:
+                continue
+            if current['p50_ms'] > base['p50_ms'] * threshold:
+                regressions.append((name, label, base['p50_ms'], current['p50_ms']))
+    return regressions
+
+
+def print_summary(name, result):
+    print(f"{name}: {result['frames']} steps in {result['wall_s']}s")
+    for label, stats in result['operons'].items():
+        alloc = f"  alloc {stats['alloc_mean_kb']:.1f} KB/step" if 'alloc_mean_kb' in stats else ''
+        print(f"  {label:<40} mean {stats['mean_ms']:8.3f} ms  p95 {stats['p95_ms']:8.3f} ms"
+              f"  max {stats['max_ms']:8.3f} ms{alloc}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the gameplay benchmark scenarios headless")
+    parser.add_argument('--frames', type=int, default=DEFAULT_FRAMES, help="measured simulation steps per scenario")
+    parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP, help="unmeasured steps before measuring")
+    parser.add_argument('--alloc-frames', type=int, default=DEFAULT_ALLOC_FRAMES,
+                        help="steps of the separate allocation-tracing pass (0 disables it)")
+    parser.add_argument('--scenario', action='append', choices=[s.name for s in SCENARIOS],
+                        help="run only this scenario (repeatable)")
+    parser.add_argument('--output', metavar='FILE', help="write the JSON results to FILE "
+                        "(use benchmarks/baseline.json to update the baseline)")
+    parser.add_argument('--baseline', metavar='FILE', nargs='?', const=BASELINE_FILE,
+                        help="fail if a watched operon's median step time regressed against FILE "
+                             "(default: the committed baseline)")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="median ratio that counts as a regression")
+    args = parser.parse_args()
+    if args.output and args.scenario and os.path.abspath(args.output) == os.path.abspath(BASELINE_FILE):
+        parser.error("the baseline is recorded from a run of every scenario; drop --scenario to update it")
+
+    results = {
+        'meta': {
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'platform': platform.platform(),
+            'frames': args.frames,
+            'warmup': args.warmup,
+            'alloc_frames': args.alloc_frames,
+            'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'scenarios': {}
+    }
+    for scenario in SCENARIOS:
+        if args.scenario and scenario.name not in args.scenario:
+            continue
+        result = run_scenario(scenario, args.frames, args.warmup, args.alloc_frames)
+        results['scenarios'][scenario.name] = result
+        print_summary(scenario.name, result)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+        for name, label, base_ms, current_ms in regressions:
+            print(f"REGRESSION {name} {label}: median {base_ms:.3f} ms -> {current_ms:.3f} ms "
+                  f"(x{current_ms / base_ms:.2f})")
+        if regressions:
+            print("If the slowdown is intended, re-record the baseline in the same commit: "
+                  "python -m benchmarks.run --output benchmarks/baseline.json")
+            sys.exit(1)
+        print(f"No regressions against {args.baseline} (threshold x{args.threshold})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import pygame
+from code.map_modules.interact_point_operon import INTERACT_DOOR
+from code.map_modules.map_data_operon import COLLISION
+from code.save_container import delete_slot
+from code.save_index import save_index
+from code.save_service import save_service
+
+# --- 基准场景 ---
+# 每个场景在新建的无界面 Game 上开局，之后每个模拟步通过 drive() 生成脚本化的输入动作，
+# 必要时直接调用游戏接口 (破门、存读档)，输入和随机种子固定，每次运行的工作量相同
+BENCHMARK_SLOT = 'benchmark'  # 存读档场景使用的临时存档槽，运行结束后删除
+ENEMY_TYPES = ('melee', 'ranged', 'shield')
+ENEMY_SPREAD = 1500  # 敌人分布在玩家左右各 ENEMY_SPREAD 像素内
+ENEMY_SPAWN_Y = 615  # 敌人中心高度: 50 像素高的敌人脚底正好贴着地面 (y = 640)，开局不嵌在地面里
+ENEMY_HALF_WIDTH = 15  # 远程敌人宽度的一半
+UNKILLABLE_HP = 10 ** 9
+
+
+def make_unkillable(game, entities):
+    """把实体的血量设为极大值，场景运行期间不会有人死亡 (工作量保持稳定)"""
+    for entity in entities:
+        health = game.combat_operon.health_systems.get(entity)
+        if health is not None:
+            health.max_hp = health.current_hp = UNKILLABLE_HP
+
+
+def spawn_enemies(game, count):
+    """在玩家附近均匀放置 count 个敌人 (近战、远程、盾牌轮流)"""
+    game.enemy_operon.clear_all_enemies()
+    start_x = game.movement_operon.player.rect.centerx - ENEMY_SPREAD
+    spacing = 2 * ENEMY_SPREAD / max(count, 1)
+    for i in range(count):
+        game.enemy_operon.create_enemy(ENEMY_TYPES[i % len(ENEMY_TYPES)], int(start_x + i * spacing), ENEMY_SPAWN_Y)
+
+
+def clear_of_walls(game, x, half_width=ENEMY_HALF_WIDTH):
+    """
+    把敌人中心 x 向右挪到地图内、站立高度上不与碰撞格重叠的位置
+    (起始时已重叠的碰撞格不参与碰撞，嵌在墙里的敌人会一直卡在墙里)
+    """
+    map_data = game.map_data_operon
+    tile_size = map_data.tile_size
+    x = max(x, half_width)
+    while (map_data.get_tile(x - half_width, ENEMY_SPAWN_Y) == COLLISION
+           or map_data.get_tile(x + half_width - 1, ENEMY_SPAWN_Y) == COLLISION):
+        x = (int((x - half_width) // tile_size) + 1) * tile_size + half_width
+    return x
+
+
+class Scenario:
+    """基准场景 - 子类覆盖 setup/drive/teardown"""
+    name = ''
+    description = ''
+    save_slot = None  # 开局时载入的存档槽
+
+    def setup(self, game):
+        """开局后、计时前调用"""
+        game.enemy_operon.clear_all_enemies()
+
+    def drive(self, game, step, actions):
+        """
+        脚本化一个模拟步
+        :param step: 模拟步序号 (包含预热步)
+        :param actions: 本步的默认动作字典，原地修改
+        """
+
+    def teardown(self, game):
+        """场景结束后清理写到磁盘的数据"""
+
+
+class IdleLongMap(Scenario):
+    name = 'idle_long_map'
+    description = '空闲: 整张长地图载入，没有敌人也没有输入'
+
+
+class PatrolWalk(Scenario):
+    """玩家来回走动并定时攻击，敌人围着玩家战斗"""
+    walk_steps = 120  # 每走这么多步掉头
+    attack_interval = 15
+
+    def drive(self, game, step, actions):
+        actions['move_dir'] = 1 if (step // self.walk_steps) % 2 == 0 else -1
+        actions['attack'] = step % self.attack_interval == 0
+
+
+class Enemies(PatrolWalk):
+    def __init__(self, count):
+        self.count = count
+        self.name = f'enemies_{count}'
+        self.description = f'{count} 个敌人分布在玩家附近，玩家来回走动并攻击'
+
+    def setup(self, game):
+        spawn_enemies(game, self.count)
+        make_unkillable(game, [game.movement_operon.player] + game.enemy_operon.get_all_enemies())
+
+
+class ProjectileStorm(Scenario):
+    name = 'projectile_storm'
+    description = '弹幕: 每步从玩家和远程敌人处向各个方向发射子弹'
+    shooters = 12
+    spread = 600  # 射手分布在玩家左右各 spread 像素内 (左侧被地图左墙截断)
+    shots_per_step = 16
+    speed = 6
+    damage = 5
+
+    def setup(self, game):
+        spawn_enemies(game, 0)
+        player = game.movement_operon.player
+        start_x = clear_of_walls(game, player.rect.centerx - self.spread)
+        spacing = (player.rect.centerx + self.spread - start_x) / self.shooters
+        for i in range(self.shooters):
+            game.enemy_operon.create_enemy('ranged', int(start_x + i * spacing), ENEMY_SPAWN_Y)
+        make_unkillable(game, [player] + game.enemy_operon.get_all_enemies())
+
+    def drive(self, game, step, actions):
+        owners = [game.movement_operon.player] + game.enemy_operon.get_all_enemies()
+        for i in range(self.shots_per_step):
+            owner = owners[(step + i) % len(owners)]
+            direction = pygame.Vector2(1, 0).rotate((step * 7 + i * 360 / self.shots_per_step) % 360)
+            game.combat_operon.process_attack(
+                {'type': 'projectile', 'direction': direction, 'speed': self.speed, 'damage': self.damage},
+                owner)
+
+
+class BulletHell(ProjectileStorm):
+    name = 'bullet_hell'
+    description = '弹幕 + 敌群: 200 个敌人分布在玩家附近，每步向各个方向发射子弹'
+    enemies = 200
+    shots_per_step = 32
+
+    def setup(self, game):
+        spawn_enemies(game, self.enemies)
+        make_unkillable(game, [game.movement_operon.player] + game.enemy_operon.get_all_enemies())
+
+
+class DoorBreaking(Scenario):
+    name = 'door_breaking'
+    description = '破门: 屏幕内布满门，宽攻击判定框来回扫过，门全部破坏后修复'
+    columns = range(-16, 24, 3)  # 相对玩家所在列，间隔 3 列避免相邻的门合并
+    rows = (1, 5, 9, 13)
+    hitbox_width = 96
+    sweep_speed = 16
+    damage = 15  # 门 30 点血，两次命中破坏
+
+    def setup(self, game):
+        super().setup(game)
+        tile_size = game.map_data_operon.tile_size
+        player_col = game.movement_operon.player.rect.centerx // tile_size
+        for col in self.columns:
+            for row in self.rows:
+                game.interact_point_operon.add_interact_point(
+                    ((player_col + col) * tile_size, row * tile_size), INTERACT_DOOR)
+        self.doors = [point for point in game.map_data_operon.interact_points if point['type'] == INTERACT_DOOR]
+        self.sweep_start = (player_col + self.columns.start - 1) * tile_size
+        self.sweep_end = (player_col + self.columns.stop + 1) * tile_size
+        self.sweep_x = self.sweep_start
+
+    def drive(self, game, step, actions):
+        hitbox = pygame.Rect(self.sweep_x, 0, self.hitbox_width, game.map_data_operon.map_height * game.map_data_operon.tile_size)
+        game.interact_point_operon.damage_door_at_rect(hitbox, self.damage)
+        self.sweep_x += self.sweep_speed
+        if self.sweep_x > self.sweep_end:
+            self.sweep_x = self.sweep_start
+            for point in self.doors:
+                point['is_broken'] = False
+                point['is_open'] = False
+            game.interact_point_operon.door_version += 1
+
+
+class EditorDragPaint(Scenario):
+    name = 'editor_drag_paint'
+    description = '编辑器: 按住 Shift 拖动鼠标画碰撞格，往回拖时擦除'
+    sweep_steps = 160  # 鼠标横扫一次屏幕的步数
+
+    def setup(self, game):
+        super().setup(game)
+        game.is_edit_mode = True
+
+    def drive(self, game, step, actions):
+        width, height = game.screen.get_size()
+        sweep, offset = divmod(step, self.sweep_steps)
+        x = width * offset // self.sweep_steps
+        if sweep % 2:
+            x = width - 1 - x
+        y = height // 4 + (sweep * 37) % (height // 2)
+        actions['shift_held'] = True
+        actions['mouse_pos'] = (x, y)
+        # 去程画碰撞格，回程用中键擦除
+        actions['mouse_buttons'] = (True, False, False) if sweep % 2 == 0 else (False, True, False)
+
+
+class SlotSaveLoad(PatrolWalk):
+    name = 'slot_save_load'
+    description = '存读档: 玩家在存档槽中游玩，定时保存 (等待写盘完成) 并重新载入'
+    save_slot = BENCHMARK_SLOT
+    save_interval = 30
+
+    def setup(self, game):
+        spawn_enemies(game, 20)
+
+    def drive(self, game, step, actions):
+        super().drive(game, step, actions)
+        if step % self.save_interval == self.save_interval - 1:
+            game._save_progress()
+            save_service.flush()
+            game._reset_player_state()
+
+    def teardown(self, game):
+        save_service.flush()
+        delete_slot(BENCHMARK_SLOT)
+        save_index.remove(BENCHMARK_SLOT)
+        save_service.flush()
+
+
+SCENARIOS = [
+    IdleLongMap(),
+    Enemies(50),
+    Enemies(200),
+    Enemies(1000),
+    ProjectileStorm(),
+    BulletHell(),
+    DoorBreaking(),
+    EditorDragPaint(),
+    SlotSaveLoad(),
+]
@@ -1,5 +1,7 @@
 import pygame
 import os
+from code.display_mode import convert_image
+from code.sim_clock import sim_clock
 
 class Animation:
     """Handles sprite animation with frame sequencing and timing."""
@@ -24,7 +26,7 @@ class Animation:
         # Load all frames
         for file_path in frame_files:
             try:
-                frame = pygame.image.load(file_path).convert_alpha()
+                frame = convert_image(pygame.image.load(file_path))
                 # Resize frame if target_size is specified
                 if target_size:
                     frame = pygame.transform.scale(frame, target_size)
@@ -39,7 +41,7 @@ class Animation:
         """Start playing the animation."""
         self.is_playing = True
         self.current_frame = 0
-        self.last_frame_time = pygame.time.get_ticks()
+        self.last_frame_time = sim_clock.now
 
     def stop(self):
         """Stop playing the animation."""
@@ -53,7 +55,7 @@ class Animation:
         if not self.is_playing:
             return
 
-        current_time = pygame.time.get_ticks()
+        current_time = sim_clock.now
         if current_time - self.last_frame_time > self.frame_duration:
             self.current_frame += 1
             self.last_frame_time = current_time
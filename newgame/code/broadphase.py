@@ -0,0 +1,95 @@
+from bisect import bisect_left
+from itertools import compress, repeat
+from operator import and_, ne, sub
+
+# --- 实体宽相位 ---
+# 横版地图上实体沿 x 轴分布，每个模拟步把实体按左边界排序一次 (sweep and prune 的单轴版本)，
+# 子弹、近战判定框、爆炸只检查左边界落在查询范围内的实体，不再逐个检查全部实体。
+# 重建只做一次排序 (map_modules.spatial_hash 逐个对象登记到字典，适合很少变动的静态点，
+# 每步重建上千个实体时开销比逐个比较还大)
+
+
+class SweepAndPrune:
+    """
+    按 x 排序的实体索引 - 每步 rebuild 一次，query 返回与矩形重叠的实体 (按 rebuild 时的列表顺序)
+    """
+    def __init__(self):
+        self._lefts = []     # 排序后的实体左边界
+        self._entities = []  # 与 _lefts 对应的实体 (移除后为 None)
+        self._order = []     # 与 _lefts 对应的原列表序号
+        self._max_width = 0
+
+    def rebuild(self, entities):
+        """
+        重新登记全部实体
+        :param entities: 带 rect 属性的实体列表，列表顺序就是查询结果的顺序
+        """
+        order = sorted(range(len(entities)), key=lambda i: entities[i].rect.left)
+        self._order = order
+        self._entities = [entities[i] for i in order]
+        self._lefts = [entity.rect.left for entity in self._entities]
+        self._max_width = max((entity.rect.width for entity in self._entities), default=0)
+
+    def remove(self, entity):
+        """
+        注销实体 (本步内死亡的实体不再被查询到)
+        :return: 实体是否曾被登记
+        """
+        # 死亡很少发生，逐个查找即可 (登记后实体可能已经移动，不能按左边界查找)
+        for i, registered in enumerate(self._entities):
+            if registered is entity:
+                self._entities[i] = None
+                return True
+        return False
+
+    def query(self, rect):
+        """
+        查询与矩形重叠的实体
+        :param rect: pygame.Rect (世界坐标)
+        :return: 按 rebuild 列表顺序排列的实体
+        """
+        return self.query_bounds(rect.left, rect.top, rect.right, rect.bottom)
+
+    def query_bounds(self, left, top, right, bottom):
+        """
+        查询与包围盒重叠的实体 (不需要 Rect，重叠判定与 Rect.colliderect 相同)
+        :return: 按 rebuild 列表顺序排列的实体
+        """
+        if right <= left or bottom <= top:
+            return ()
+        lefts = self._lefts
+        # 左边界在 (left - 最大宽度, right) 内的实体才可能重叠
+        start = bisect_left(lefts, left - self._max_width + 1)
+        end = bisect_left(lefts, right, start)
+        if start == end:
+            return ()
+        entities = self._entities
+        hits = []
+        for i in range(start, end):
+            entity = entities[i]
+            if entity is None:
+                continue
+            other = entity.rect
+            if (left < other.right and other.left < right and top < other.bottom and other.top < bottom
+                    and other.width and other.height):
+                hits.append((self._order[i], entity))
+        if len(hits) > 1:
+            hits.sort(key=lambda hit: hit[0])
+        return [entity for _, entity in hits]
+
+    def query_batch(self, lefts, tops, rights, bottoms, mask):
+        """
+        批量查询一组包围盒 (按列存放)。先整列二分查找出 x 范围内有实体的包围盒，只对它们做精确判定；
+        逐个惰性判定，处理前一个结果时 remove 的实体不会出现在后面的结果中
+        :param mask: 每个包围盒是否参与查询
+        :return: 生成 (序号, 重叠的实体列表)，没有重叠的包围盒不生成
+        """
+        entity_lefts = self._lefts
+        if not entity_lefts:
+            return
+        starts = map(bisect_left, repeat(entity_lefts), map(sub, lefts, repeat(self._max_width - 1)))
+        ends = map(bisect_left, repeat(entity_lefts), rights)
+        for i in compress(range(len(lefts)), map(and_, mask, map(ne, starts, ends))):
+            hits = self.query_bounds(lefts[i], tops[i], rights[i], bottoms[i])
+            if hits:
+                yield i, hits
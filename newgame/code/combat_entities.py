@@ -1,4 +1,5 @@
 import pygame
+from code.sim_clock import sim_clock
 
 class Projectile(pygame.sprite.Sprite):
     """Represents a projectile (e.g., an arrow) that moves in a straight line."""
@@ -40,9 +41,9 @@ class TimedEffect(pygame.sprite.Sprite):
         pygame.draw.circle(self.image, color, (size // 2, size // 2), size // 2)
         self.image.set_alpha(150)
         self.rect = self.image.get_rect(center=(x, y))
-        self.spawn_time = pygame.time.get_ticks()
+        self.spawn_time = sim_clock.now
         self.duration = duration
 
     def update(self):
-        if pygame.time.get_ticks() - self.spawn_time > self.duration:
+        if sim_clock.now - self.spawn_time > self.duration:
             self.kill()
\ No newline at end of file
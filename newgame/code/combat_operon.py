@@ -1,51 +1,64 @@
+from itertools import compress
 import pygame
-
-class Projectile(pygame.sprite.Sprite):
-    """Represents a projectile (e.g., an arrow) that moves in a straight line."""
-    def __init__(self, x, y, direction_vector, speed, damage, owner):
-        super().__init__()
-        self.original_image = pygame.Surface((15, 5), pygame.SRCALPHA)
-        self.original_image.fill((200, 200, 200))
-        self.image = self.original_image
-        self.rect = self.image.get_rect(center=(x, y))
-        
-        self.pos = pygame.Vector2(x, y)
-        
-        # Ensure the direction vector is normalized
-        if direction_vector.length() > 0:
-            self.velocity = direction_vector.normalize() * speed
-        else:
-            # Default to moving right if direction is a zero vector
-            self.velocity = pygame.Vector2(speed, 0)
-
-        self.damage = damage
-        self.owner = owner
-
-        # Rotate image to match direction
-        angle = self.velocity.angle_to(pygame.Vector2(1, 0))
-        self.image = pygame.transform.rotate(self.original_image, -angle)
-        self.rect = self.image.get_rect(center=self.pos)
-
-    def update(self):
-        """Move the projectile in a straight line without gravity."""
-        self.pos += self.velocity
-        self.rect.center = self.pos
+from code.sim_clock import sim_clock
+from code.broadphase import SweepAndPrune
+from code.physics import pixel
+from code.projectile_store import ProjectileStore, DEFAULT_PROJECTILE_STYLE
+from code.effect_sprites import effect_sprites
 
 class TimedEffect(pygame.sprite.Sprite):
     """A visual effect that disappears after a duration, like an explosion."""
-    def __init__(self, x, y, size, duration, color=(255, 0, 0)):
+    def __init__(self, pool=None):
+        """Create an unlaunched effect; EffectPool.spawn launches it."""
         super().__init__()
-        self.image = pygame.Surface((size, size))
-        self.image.set_colorkey((0, 0, 0))
-        pygame.draw.circle(self.image, color, (size // 2, size // 2), size // 2)
-        self.image.set_alpha(150)
-        self.rect = self.image.get_rect(center=(x, y))
-        self.spawn_time = pygame.time.get_ticks()
+        self.pool = pool
+        self.frames = ()
+        self.image = None
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.spawn_time = 0
+        self.duration = 0
+
+    def launch(self, x, y, frames, duration):
+        """
+        Reset the effect in place, centered on (x, y).
+        :param frames: cached surfaces from effect_sprites, played evenly over the duration
+        """
+        self.frames = frames
+        self.image = frames[0]
+        self.rect.size = self.image.get_size()
+        self.rect.center = (x, y)
+        self.spawn_time = sim_clock.now
         self.duration = duration
 
     def update(self):
-        if pygame.time.get_ticks() - self.spawn_time > self.duration:
+        elapsed = sim_clock.now - self.spawn_time
+        if elapsed > self.duration:
             self.kill()
+        elif len(self.frames) > 1:
+            frame = elapsed * len(self.frames) // self.duration if self.duration > 0 else 0
+            self.image = self.frames[min(frame, len(self.frames) - 1)]
+
+    def kill(self):
+        """Remove the effect from its groups and hand it back to the pool."""
+        if self.alive():
+            super().kill()
+            self.frames = ()
+            self.image = None
+            if self.pool is not None:
+                self.pool.release(self)
+
+class EffectPool:
+    """Recycles expired effects so explosions don't build sprites or surfaces."""
+    def __init__(self):
+        self.free = []
+
+    def spawn(self, x, y, frames, duration):
+        effect = self.free.pop() if self.free else TimedEffect(self)
+        effect.launch(x, y, frames, duration)
+        return effect
+
+    def release(self, effect):
+        self.free.append(effect)
 
 class HealthSystem:
     """Manages health for a game entity."""
@@ -63,12 +76,19 @@ class HealthSystem:
 
 class CombatOperon:
     """Handles all combat-related logic."""
-    def __init__(self):
+    def __init__(self, view_size=(1280, 720)):
+        self.view_size = view_size  # Visible area used to cull projectiles (no display surface needed)
         self.health_systems = {}
-        self.projectiles = pygame.sprite.Group()
+        self.projectiles = ProjectileStore()
         self.effects = pygame.sprite.Group()
+        self.effect_pool = EffectPool()
         self.damage_callbacks = []
         self.kill_callbacks = []
+        self.broadphase = SweepAndPrune()  # Entity rects, rebuilt once per tick
+
+    def rebuild_broadphase(self, entities):
+        """Index the entities' rects for this tick; every attack and projectile test reads the index."""
+        self.broadphase.rebuild(entities)
 
     def register_entity(self, entity, max_hp):
         if entity not in self.health_systems:
@@ -84,7 +104,7 @@ class CombatOperon:
         """Register a callback function to be called when an entity is killed."""
         self.kill_callbacks.append(callback)
 
-    def process_attack(self, attack_data, all_entities, attacker, map_operon=None):
+    def process_attack(self, attack_data, attacker, map_operon=None):
         if not attack_data:
             return
 
@@ -113,7 +133,7 @@ class CombatOperon:
                 map_operon.damage_door_at_rect(hitbox_rect, attack_data['damage'])
             
             # Check entity damage
-            for entity in all_entities:
+            for entity in self.broadphase.query(hitbox_rect):
                 if entity is not attacker and hitbox_rect.colliderect(entity.rect):
                     self.apply_damage(entity, attack_data['damage'], attacker)
         
@@ -122,23 +142,32 @@ class CombatOperon:
             # 调整子弹发射位置，稍微调高但不超过敌人高度
             py -= 20  # 向上调整20像素
             direction_vector = attack_data.get('direction', pygame.Vector2(1, 0))
-            proj = Projectile(px, py, direction_vector, attack_data['speed'], attack_data['damage'], attacker)
-            self.projectiles.add(proj)
+            self.projectiles.spawn(px, py, direction_vector, attack_data['speed'], attack_data['damage'],
+                                   attacker, attack_data.get('projectile_style', DEFAULT_PROJECTILE_STYLE))
         
         elif attack_type == 'effect':
             effect_type = attack_data.get('effect_type')
             if effect_type == 'explosion':
                 pos = attacker.rect.center
-                explosion = TimedEffect(pos[0], pos[1], attack_data['radius'] * 2, attack_data['duration'], attack_data['color'])
-                self.effects.add(explosion)
+                # Cached circle by default; 'effect_strip' plays a registered multi-frame strip instead
+                strip = attack_data.get('effect_strip')
+                if strip:
+                    frames = effect_sprites.strip(strip)
+                else:
+                    frames = effect_sprites.circle(attack_data['radius'] * 2, attack_data['color'])
+                self.effects.add(self.effect_pool.spawn(pos[0], pos[1], frames, attack_data['duration']))
+                
+                # The blast covers the radius whatever size the strip's frames are
+                blast_rect = pygame.Rect(0, 0, attack_data['radius'] * 2, attack_data['radius'] * 2)
+                blast_rect.center = pos
                 
                 # Check door damage from explosions
                 if map_operon and hasattr(map_operon, 'damage_door_at_rect'):
-                    map_operon.damage_door_at_rect(explosion.rect, attack_data['damage'])
+                    map_operon.damage_door_at_rect(blast_rect, attack_data['damage'])
                 
                 # Check entity damage
-                for entity in all_entities:
-                    if entity is not attacker and explosion.rect.colliderect(entity.rect):
+                for entity in self.broadphase.query(blast_rect):
+                    if entity is not attacker and blast_rect.colliderect(entity.rect):
                         self.apply_damage(entity, attack_data['damage'], attacker)
             elif effect_type == 'heal':
                 self.apply_heal(attacker, attack_data['amount'])
@@ -150,37 +179,48 @@ class CombatOperon:
                     self.apply_heal(attacker, heal_amount)
                     print(f"Full heal applied: {heal_amount} HP restored")
 
-    def update(self, all_entities, camera_x=0, map_operon=None):
-        self.projectiles.update()
+    def update(self, camera_x=0, map_operon=None):
+        """
+        Advance every projectile in one pass, then cull and hit-test them against the entity broadphase.
+        :param map_operon: map data answering trace_solid queries (None lets projectiles fly through everything)
+        """
+        projectiles = self.projectiles
+        if not len(projectiles):
+            # Nothing in flight: skip the column pipeline, whose fixed cost dwarfs the effects update
+            self.effects.update()
+            return
+        projectiles.advance(getattr(map_operon, 'trace_solid', None), getattr(map_operon, 'tile_size', 1))
         self.effects.update()
         
-        # Correctly define the screen rectangle for culling
-        screen_rect = pygame.display.get_surface().get_rect()
-        screen_rect.x += camera_x
-
-        for proj in self.projectiles:
-            # The projectile's rect is in world coordinates.
-            # We check if it's outside the camera's view.
-            if not screen_rect.colliderect(proj.rect):
-                proj.kill()
-                continue
-            
-            # Check door damage from projectiles
-            if map_operon and hasattr(map_operon, 'damage_door_at_rect'):
-                map_operon.damage_door_at_rect(proj.rect, proj.damage)
-            
-            for entity in all_entities:
-                if entity is not proj.owner and proj.rect.colliderect(entity.rect):
-                    self.apply_damage(entity, proj.damage, proj.owner)
-                    proj.kill()
+        # The camera's view in world coordinates, rounded like moving a Rect by camera_x
+        view_left = pixel(camera_x)
+        view_right = view_left + self.view_size[0]
+        view_bottom = self.view_size[1]
+        bounds = projectiles.bounds_columns()
+        
+        # Projectiles outside the camera's view die
+        projectiles.cull(bounds, view_left, 0, view_right, view_bottom)
+        alive, damages, owners = projectiles.alive, projectiles.damages, projectiles.owners
+        
+        # Check door damage from projectiles
+        if map_operon and hasattr(map_operon, 'damage_door_at_rect'):
+            for i in compress(range(len(alive)), alive):
+                map_operon.damage_door_at_rect(projectiles.rect(i), damages[i])
+        
+        # Each projectile hits the first entity it overlaps (other than its owner) and dies
+        for i, entities in self.broadphase.query_batch(*bounds, alive):
+            owner = owners[i]
+            for entity in entities:
+                if entity is not owner:
+                    self.apply_damage(entity, damages[i], owner)
+                    alive[i] = False
                     break
 
+        projectiles.compact()
+
     def draw(self, screen, camera_x=0):
         # Adjust projectile and effect positions for camera
-        for proj in self.projectiles:
-            adjusted_rect = proj.rect.copy()
-            adjusted_rect.x -= camera_x
-            screen.blit(proj.image, adjusted_rect)
+        self.projectiles.draw(screen, camera_x)
         for effect in self.effects:
             adjusted_rect = effect.rect.copy()
             adjusted_rect.x -= camera_x
@@ -227,6 +267,7 @@ class CombatOperon:
                 else:
                     if hasattr(target_entity, 'kill'): target_entity.kill()
                     self.health_systems.pop(target_entity, None)
+                    self.broadphase.remove(target_entity)
     
     def apply_heal(self, target_entity, amount):
         if target_entity in self.health_systems:
@@ -0,0 +1,28 @@
+import os
+
+# --- 无界面模式 ---
+# 服务器、机器人测试和性能基准只运行模拟: 使用 SDL dummy 驱动，不创建窗口，
+# 跳过所有绘制和素材转换 (convert/convert_alpha 需要显示表面)
+_headless = False
+
+
+def enable_headless():
+    """切换到无界面模式 (必须在 pygame.init 之前调用)"""
+    global _headless
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    _headless = True
+
+
+def is_headless():
+    return _headless
+
+
+def convert_image(image):
+    """
+    把载入的图片转换为显示格式以加快绘制；无界面模式下没有显示表面，原样返回
+    :param image: pygame.image.load 的结果
+    """
+    if _headless:
+        return image
+    return image.convert_alpha()
@@ -0,0 +1,60 @@
+import pygame
+from code.display_mode import convert_image
+
+# --- 特效图像缓存 ---
+# 爆炸等特效的图像按 (尺寸, 颜色, 透明度) 只画一次，之后所有同样的特效共用同一张 Surface；
+# 多帧动画特效由预先烘焙好的帧条 (所有帧横向排成一张图) 切成子表面，播放时只切换引用，不再创建图像。
+# 特效图像只读 (绘制时不修改)，可以安全共用
+EFFECT_ALPHA = 150  # 圆形特效的整体透明度
+EFFECT_COLORKEY = (0, 0, 0)
+
+
+class EffectSpriteCache:
+    """特效图像缓存 - 圆形特效按参数懒绘制，帧条特效按名字登记"""
+    def __init__(self):
+        self._circles = {}  # (尺寸, 颜色, 透明度) -> 单帧元组
+        self._strips = {}   # 帧条名 -> 帧元组
+
+    def circle(self, size, color, alpha=EFFECT_ALPHA):
+        """
+        取圆形特效的帧 (第一次用到时绘制)
+        :param size: 直径 (像素)
+        :param color: 颜色 (RGB)
+        :return: 只含一帧的元组
+        """
+        key = (size, tuple(color), alpha)
+        frames = self._circles.get(key)
+        if frames is None:
+            image = pygame.Surface((size, size))
+            image.set_colorkey(EFFECT_COLORKEY)
+            pygame.draw.circle(image, color, (size // 2, size // 2), size // 2)
+            image.set_alpha(alpha)
+            frames = self._circles[key] = (image,)
+        return frames
+
+    def register_strip(self, name, sheet, frame_width=None):
+        """
+        登记一个多帧特效
+        :param name: 帧条名 (攻击数据中 'effect_strip' 使用的名字)
+        :param sheet: 帧条图像 (Surface) 或图片路径，各帧从左到右排成一行
+        :param frame_width: 每帧宽度，None 时按正方形帧 (宽度等于图像高度)
+        :return: 切好的帧元组
+        """
+        if not isinstance(sheet, pygame.Surface):
+            sheet = convert_image(pygame.image.load(sheet))
+        width, height = sheet.get_size()
+        frame_width = frame_width or height
+        if frame_width <= 0 or width % frame_width:
+            raise ValueError(f"Effect strip '{name}' width {width} is not a multiple of frame width {frame_width}")
+        frames = tuple(sheet.subsurface((left, 0, frame_width, height))
+                       for left in range(0, width, frame_width))
+        self._strips[name] = frames
+        return frames
+
+    def strip(self, name):
+        """取已登记的帧条，未登记时抛出 KeyError"""
+        return self._strips[name]
+
+
+# 全局特效图像缓存 (图像与游戏状态无关，所有 CombatOperon 共用)
+effect_sprites = EffectSpriteCache()
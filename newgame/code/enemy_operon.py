@@ -1,5 +1,9 @@
 import pygame
 import random
+from code.save_service import save_service
+from code.save_container import SECTION_ENEMIES, container_path, read_section
+from code.sim_clock import sim_clock
+from code.physics import pixel, move_x, move_y
 
 class Enemy(pygame.sprite.Sprite):
     """Base class for all enemy types."""
@@ -38,7 +42,7 @@ class Enemy(pygame.sprite.Sprite):
         self.patrol_wait_duration = 2000  # 2 seconds wait at endpoints
 
     def can_attack(self):
-        return pygame.time.get_ticks() - self.last_attack_time > self.attack_cooldown
+        return sim_clock.now - self.last_attack_time > self.attack_cooldown
 
     def perform_attack(self, player):
         return None
@@ -52,7 +56,7 @@ class Enemy(pygame.sprite.Sprite):
         
         # --- Combat Update ---
         if self.is_attacking:
-            if pygame.time.get_ticks() - self.attack_timer > self.attack_duration:
+            if sim_clock.now - self.attack_timer > self.attack_duration:
                 self.is_attacking = False
                 self.attack_hitbox = None
             else:
@@ -68,52 +72,24 @@ class Enemy(pygame.sprite.Sprite):
         if self.velocity.y > 10: 
             self.velocity.y = 10
         
-        # Horizontal collision
-        self.rect.x += self.velocity.x
+        # Horizontal collision (swept, like the player)
+        dx = pixel(self.rect.x + self.velocity.x) - self.rect.x
         if map_operon:
-            collision_rects = self._get_collision_rects(map_operon)
-            for rect in collision_rects:
-                if self.rect.colliderect(rect):
-                    if self.velocity.x > 0:
-                        self.rect.right = rect.left
-                    elif self.velocity.x < 0:
-                        self.rect.left = rect.right
-                    self.velocity.x = 0
+            if move_x(self.rect, dx, map_operon.sweep_solid):
+                self.velocity.x = 0
+        else:
+            self.rect.x += dx
         
         # Vertical collision
-        self.rect.y += self.velocity.y
+        dy = pixel(self.rect.y + self.velocity.y) - self.rect.y
         self.on_ground = False
         if map_operon:
-            collision_rects = self._get_collision_rects(map_operon)
-            for rect in collision_rects:
-                if self.rect.colliderect(rect):
-                    if self.velocity.y > 0:
-                        self.rect.bottom = rect.top
-                        self.on_ground = True
-                    elif self.velocity.y < 0:
-                        self.rect.top = rect.bottom
-                    self.velocity.y = 0
-    
-    def _get_collision_rects(self, map_operon):
-        """Get collision rects around enemy (similar to player)"""
-        if not map_operon:
-            return []
-        
-        collision_rects = []
-        player_gx = int(self.rect.centerx // map_operon.tile_size)
-        player_gy = int(self.rect.centery // map_operon.tile_size)
-
-        # Get tile collision rects
-        for x_offset in range(-2, 3):
-            for y_offset in range(-2, 3):
-                world_x = (player_gx + x_offset) * map_operon.tile_size
-                world_y = (player_gy + y_offset) * map_operon.tile_size
-                
-                tile_type = map_operon.get_tile(world_x, world_y)
-                if tile_type == 1:  # COLLISION tile
-                    collision_rects.append(pygame.Rect(world_x, world_y, map_operon.tile_size, map_operon.tile_size))
-        
-        return collision_rects
+            normal_y = move_y(self.rect, dy, map_operon.sweep_solid)
+            if normal_y:
+                self.on_ground = normal_y < 0
+                self.velocity.y = 0
+        else:
+            self.rect.y += dy
     
     def update_ai(self, player):
         """Basic AI behavior - to be overridden by subclasses"""
@@ -123,7 +99,7 @@ class Enemy(pygame.sprite.Sprite):
         
         # Update aggressive state
         if self.is_aggressive:
-            current_time = pygame.time.get_ticks()
+            current_time = sim_clock.now
             if current_time - self.aggressive_timer > self.aggressive_duration:
                 self.is_aggressive = False
                 print("Enemy is no longer aggressive")
@@ -132,12 +108,12 @@ class Enemy(pygame.sprite.Sprite):
         """Handle taking damage - becomes aggressive"""
         # This will be called by combat system when enemy takes damage
         self.is_aggressive = True
-        self.aggressive_timer = pygame.time.get_ticks()
+        self.aggressive_timer = sim_clock.now
         print("Enemy became aggressive after taking damage!")
     
     def update_patrol_behavior(self):
         """Update patrol behavior when player is not detected and not aggressive"""
-        current_time = pygame.time.get_ticks()
+        current_time = sim_clock.now
         
         # Check if waiting at endpoint
         if self.patrol_wait_timer > 0:
@@ -223,9 +199,9 @@ class MeleeEnemy(Enemy):
 
     def perform_attack(self, player):
         if self.can_attack() and not self.is_attacking and self.rect.colliderect(player.rect.inflate(self.attack_range, self.attack_range)):
-            self.last_attack_time = pygame.time.get_ticks()
+            self.last_attack_time = sim_clock.now
             self.is_attacking = True
-            self.attack_timer = pygame.time.get_ticks()
+            self.attack_timer = sim_clock.now
             direction = pygame.Vector2(player.rect.centerx - self.rect.centerx, player.rect.centery - self.rect.centery).normalize()
             return {'type': 'melee', 'damage': self.damage, 'range': self.attack_range, 'direction': direction}
         return None
@@ -272,7 +248,7 @@ class RangedEnemy(Enemy):
             
     def perform_attack(self, player):
         if self.can_attack() and not self.is_attacking:
-            self.last_attack_time = pygame.time.get_ticks()
+            self.last_attack_time = sim_clock.now
             
             # Calculate the precise direction vector towards the player
             player_pos = pygame.Vector2(player.rect.center)
@@ -310,7 +286,7 @@ class RangedEnemy(Enemy):
                 attack = self.perform_attack(player)
                 if attack:
                     self.is_attacking = True
-                    self.attack_timer = pygame.time.get_ticks()
+                    self.attack_timer = sim_clock.now
         else:
             # Player not visible, implement patrol behavior
             self.velocity.x = 0  # Will be handled by patrol behavior
@@ -390,9 +366,8 @@ class EnemyOperon:
         """Clear all enemies from the game"""
         self.enemies.empty()
         
-    def save_enemies(self, filename):
-        """Save current enemy states to file."""
-        import json
+    def get_save_data(self):
+        """Snapshot of the current enemy states (the save container's enemies section)."""
         enemy_data = []
         for enemy in self.enemies:
             enemy_info = {
@@ -403,20 +378,22 @@ class EnemyOperon:
                 # Add other enemy-specific attributes as needed
             }
             enemy_data.append(enemy_info)
-        
-        try:
-            with open(filename, 'w') as f:
-                json.dump(enemy_data, f)
-            print(f"Saved {len(enemy_data)} enemies to {filename}")
-        except Exception as e:
-            print(f"Failed to save enemies: {e}")
+        return enemy_data
+
+    def save_enemies(self, save_slot):
+        """Save current enemy states to the slot's save container (written in the background)."""
+        filename = container_path(save_slot)
+        enemy_data = self.get_save_data()
+        save_service.save_sections(filename, {SECTION_ENEMIES: enemy_data}, f"Saved {len(enemy_data)} enemies to {filename}")
     
-    def load_enemies(self, filename, combat_operon):
-        """Load enemy states from file."""
-        import json
+    def load_enemies(self, save_slot, combat_operon):
+        """Load enemy states from the slot's save container."""
+        save_service.flush()
+        filename = container_path(save_slot)
         try:
-            with open(filename, 'r') as f:
-                enemy_data = json.load(f)
+            enemy_data = read_section(save_slot, SECTION_ENEMIES)
+            if enemy_data is None:
+                raise FileNotFoundError(filename)
             
             # Clear existing enemies
             self.clear_all_enemies()
@@ -1,5 +1,6 @@
 import pygame
 import random
+from code.sim_clock import sim_clock
 
 class Enemy(pygame.sprite.Sprite):
     """Base class for all enemy types."""
@@ -16,14 +17,14 @@ class Enemy(pygame.sprite.Sprite):
         self.attack_hitbox = None
 
     def can_attack(self):
-        return pygame.time.get_ticks() - self.last_attack_time > self.attack_cooldown
+        return sim_clock.now - self.last_attack_time > self.attack_cooldown
 
     def perform_attack(self, player):
         return None
 
     def update(self, player):
         if self.is_attacking:
-            if pygame.time.get_ticks() - self.attack_timer > self.attack_duration:
+            if sim_clock.now - self.attack_timer > self.attack_duration:
                 self.is_attacking = False
                 self.attack_hitbox = None
             else:
@@ -63,9 +64,9 @@ class MeleeEnemy(Enemy):
 
     def perform_attack(self, player):
         if self.can_attack() and not self.is_attacking and self.rect.colliderect(player.rect.inflate(self.attack_range, self.attack_range)):
-            self.last_attack_time = pygame.time.get_ticks()
+            self.last_attack_time = sim_clock.now
             self.is_attacking = True
-            self.attack_timer = pygame.time.get_ticks()
+            self.attack_timer = sim_clock.now
             direction = pygame.Vector2(player.rect.centerx - self.rect.centerx, player.rect.centery - self.rect.centery).normalize()
             return {'type': 'melee', 'damage': self.damage, 'range': self.attack_range, 'direction': direction}
         return None
@@ -94,7 +95,7 @@ class RangedEnemy(Enemy):
             
     def perform_attack(self, player):
         if self.can_attack() and not self.is_attacking:
-            self.last_attack_time = pygame.time.get_ticks()
+            self.last_attack_time = sim_clock.now
             
             # Calculate the precise direction vector towards the player
             player_pos = pygame.Vector2(player.rect.center)
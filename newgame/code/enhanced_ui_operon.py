@@ -1,5 +1,6 @@
 import pygame
 import math
+from code.sim_clock import sim_clock
 
 class EnhancedUIOperon:
     """
@@ -124,7 +125,7 @@ class EnhancedUIOperon:
         self.item_notifications.append({
             'text': f"获得: {item_name}",
             'lifetime': 2.0,  # 2 seconds
-            'start_time': pygame.time.get_ticks()
+            'start_time': sim_clock.now
         })
     
     def start_fade_transition(self):
@@ -134,8 +135,8 @@ class EnhancedUIOperon:
     def get_screen_shake_offset(self):
         """Get current screen shake offset"""
         if self.screen_shake_intensity > 0 and self.screen_shake_duration > 0:
-            offset_x = pygame.time.get_ticks() % 10 - 5
-            offset_y = pygame.time.get_ticks() % 10 - 5
+            offset_x = sim_clock.now % 10 - 5
+            offset_y = sim_clock.now % 10 - 5
             return (offset_x * self.screen_shake_intensity / 10, 
                    offset_y * self.screen_shake_intensity / 10)
         return (0, 0)
@@ -239,7 +240,7 @@ class EnhancedUIOperon:
         
         # Cooldown overlay
         if slot_key in weapon_operon.skill_cooldowns:
-            current_time = pygame.time.get_ticks()
+            current_time = sim_clock.now
             cooldown_end = weapon_operon.skill_cooldowns[slot_key]
             
             if current_time < cooldown_end:
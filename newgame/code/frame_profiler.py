@@ -0,0 +1,237 @@
+import gc
+import json
+import os
+import time
+from collections import deque
+import pygame
+
+# --- 帧性能分析器 ---
+# 开启时把登记的 operon 方法替换为计时包装 (实例属性)，关闭时删除包装，关闭状态下没有额外开销。
+# 每帧汇总各方法耗时，保存滚动窗口的统计，记录垃圾回收停顿，可以叠加显示在画面上，
+# 也可以导出 Chrome trace-event JSON (chrome://tracing 或 Perfetto 打开) 供离线分析
+FRAME_BUDGET_MS = 1000 / 60
+HISTORY_FRAMES = 300  # 滚动统计窗口 (帧)
+WORST_FRAMES = 5
+RECENT_GC_PAUSES = 5
+MAX_TRACE_EVENTS = 200000  # trace 缓冲上限，超出后丢弃最早的事件
+OVERLAY_REFRESH_FRAMES = 15  # 覆盖层文字每隔多少帧重新生成
+OVERLAY_BACKGROUND = (0, 0, 0, 180)
+OVERLAY_TEXT_COLOR = (220, 220, 220)
+OVERLAY_WARN_COLOR = (255, 120, 80)
+PROFILE_TRACE_FILE = 'profile_trace.json'
+
+
+class RollingHistogram:
+    """最近若干个样本 (纳秒) 的滚动统计"""
+    def __init__(self, size=HISTORY_FRAMES):
+        self.samples = deque(maxlen=size)
+
+    def add(self, value):
+        self.samples.append(value)
+
+    def mean(self):
+        return sum(self.samples) / len(self.samples) if self.samples else 0
+
+    def percentile(self, p):
+        if not self.samples:
+            return 0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    def max(self):
+        return max(self.samples) if self.samples else 0
+
+
+class FrameProfiler:
+    """
+    按帧统计 operon 方法耗时 - Game 登记要计时的方法，主循环在每帧开始和结束时调用 begin_frame/end_frame
+    """
+    def __init__(self):
+        self.enabled = False
+        self.overlay_visible = False
+        self.frame_index = 0
+        self.frame_times = RollingHistogram()
+        self.histograms = {}  # 标签 -> 每帧耗时的 RollingHistogram
+        self.worst_frames = deque(maxlen=HISTORY_FRAMES)  # (帧序号, 帧耗时, 最耗时的标签, 其耗时)
+        self.gc_pauses = deque(maxlen=HISTORY_FRAMES)  # (帧序号, 代, 停顿 ns)
+        self.trace_events = deque(maxlen=MAX_TRACE_EVENTS)
+        self._targets = []  # (对象, 方法名)
+        self._wrapped = []
+        self._frame = {}  # 当前帧: 标签 -> 累计耗时
+        self._frame_start = None
+        self._gc_start = None
+        self._origin = time.perf_counter_ns()
+        self._pid = os.getpid()
+        self._overlay = None
+        self._overlay_font = None
+
+    def register(self, obj, *names):
+        """
+        登记要计时的方法 (已开启时立即生效)
+        :param obj: operon 实例
+        :param names: 方法名
+        """
+        for name in names:
+            self._targets.append((obj, name))
+            if self.enabled:
+                self._wrap(obj, name)
+
+    def unregister_all(self):
+        """取消所有登记并移除计时包装 (新建 Game 时调用，不再引用旧的 operon)"""
+        self._unwrap_all()
+        self._targets = []
+
+    def _unwrap_all(self):
+        for obj, name in self._wrapped:
+            delattr(obj, name)
+        self._wrapped = []
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        for obj, name in self._targets:
+            self._wrap(obj, name)
+        gc.callbacks.append(self._on_gc)
+
+    def disable(self):
+        if not self.enabled:
+            return
+        self.enabled = False
+        self._unwrap_all()
+        gc.callbacks.remove(self._on_gc)
+        self._frame_start = None
+        self._frame.clear()
+
+    def toggle_overlay(self):
+        """切换覆盖层 (同时开关分析器)"""
+        self.overlay_visible = not self.overlay_visible
+        if self.overlay_visible:
+            self.enable()
+        else:
+            self.disable()
+        self._overlay = None
+
+    def _wrap(self, obj, name):
+        label = f"{type(obj).__name__}.{name}"
+        method = getattr(obj, name)
+        frame = self._frame
+        events = self.trace_events
+        clock = time.perf_counter_ns
+
+        def profiled(*args, **kwargs):
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                duration = clock() - start
+                frame[label] = frame.get(label, 0) + duration
+                events.append((label, start, duration))
+        setattr(obj, name, profiled)
+        self._wrapped.append((obj, name))
+
+    def _on_gc(self, phase, info):
+        if phase == 'start':
+            self._gc_start = time.perf_counter_ns()
+        elif self._gc_start is not None:
+            duration = time.perf_counter_ns() - self._gc_start
+            label = f"gc gen {info['generation']}"
+            self.gc_pauses.append((self.frame_index, info['generation'], duration))
+            self._frame['gc'] = self._frame.get('gc', 0) + duration
+            self.trace_events.append((label, self._gc_start, duration))
+            self._gc_start = None
+
+    def begin_frame(self):
+        self._frame_start = time.perf_counter_ns()
+
+    def end_frame(self):
+        """结束一帧，把本帧各标签的耗时计入滚动统计"""
+        if self._frame_start is None:
+            return
+        end = time.perf_counter_ns()
+        duration = end - self._frame_start
+        self.trace_events.append(('frame', self._frame_start, duration))
+        self.frame_times.add(duration)
+        worst_label, worst_time = None, 0
+        for label, value in self._frame.items():
+            histogram = self.histograms.get(label)
+            if histogram is None:
+                histogram = self.histograms[label] = RollingHistogram()
+            histogram.add(value)
+            # 嵌套的 Game 方法包含各 operon，最耗时的标签只在 operon 中找
+            if value > worst_time and not label.startswith('Game.'):
+                worst_label, worst_time = label, value
+        self.worst_frames.append((self.frame_index, duration, worst_label, worst_time))
+        self._frame.clear()
+        self._frame_start = None
+        self.frame_index += 1
+        if self.overlay_visible and self.frame_index % OVERLAY_REFRESH_FRAMES == 0:
+            self._overlay = None
+
+    def export_chrome_trace(self, filename=PROFILE_TRACE_FILE):
+        """
+        把 trace 缓冲写成 Chrome trace-event JSON (时间单位为微秒)
+        :param filename: 输出文件
+        """
+        # tuple() 一次性复制缓冲 (C 实现，不会被遍历期间的垃圾回收回调打断)
+        events = [{'name': label, 'ph': 'X', 'ts': (start - self._origin) / 1000, 'dur': duration / 1000,
+                   'pid': self._pid, 'tid': 0, 'cat': 'gc' if label.startswith('gc') else 'frame'}
+                  for label, start, duration in tuple(self.trace_events)]
+        with open(filename, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        print(f"Exported {len(events)} trace events to {filename}")
+
+    def summary_lines(self):
+        """
+        覆盖层显示的文字，每行分为若干列 (第一列左对齐，其余列右对齐)
+        :return: [(列文字元组, 是否超出帧预算)]
+        """
+        ms = 1e-6
+        frame_mean = self.frame_times.mean() * ms
+        lines = [(("frame", f"{frame_mean:.2f}", f"{self.frame_times.percentile(95) * ms:.2f}",
+                   f"{self.frame_times.max() * ms:.2f}"), frame_mean > FRAME_BUDGET_MS),
+                 (("operon (ms)", "mean", "p95", "max"), False)]
+        ranked = sorted(self.histograms.items(), key=lambda item: item[1].mean(), reverse=True)
+        for label, histogram in ranked:
+            lines.append(((label, f"{histogram.mean() * ms:.2f}", f"{histogram.percentile(95) * ms:.2f}",
+                           f"{histogram.max() * ms:.2f}"), histogram.max() * ms > FRAME_BUDGET_MS))
+        lines.append((("worst frames",), False))
+        for index, duration, label, value in sorted(self.worst_frames, key=lambda f: f[1], reverse=True)[:WORST_FRAMES]:
+            lines.append(((f"  #{index} {label or '-'} {value * ms:.2f}", f"{duration * ms:.2f}"),
+                          duration * ms > FRAME_BUDGET_MS))
+        lines.append(((f"gc pauses ({len(self.gc_pauses)} in window)",), False))
+        for index, generation, duration in tuple(self.gc_pauses)[-RECENT_GC_PAUSES:]:
+            lines.append(((f"  #{index} gen {generation}", f"{duration * ms:.2f}"), False))
+        return lines
+
+    def draw_overlay(self, screen):
+        """在画面左上角绘制统计覆盖层 (文字每 OVERLAY_REFRESH_FRAMES 帧重新生成一次)"""
+        if not self.overlay_visible:
+            return
+        if self._overlay is None:
+            self._overlay = self._render_overlay()
+        screen.blit(self._overlay, (10, 10))
+
+    def _render_overlay(self):
+        if self._overlay_font is None:
+            self._overlay_font = pygame.font.Font(None, 18)
+        font = self._overlay_font
+        line_height = font.get_linesize()
+        rows = [[font.render(cell, True, OVERLAY_WARN_COLOR if warn else OVERLAY_TEXT_COLOR) for cell in cells]
+                for cells, warn in self.summary_lines()]
+        # 第一列宽度取表格行 (多列) 中最宽的标签，其余列固定宽度
+        label_width = max((row[0].get_width() for row in rows if len(row) > 1), default=0)
+        column_width = 56
+        width = max(max(row[0].get_width() for row in rows), label_width + 3 * column_width) + 12
+        overlay = pygame.Surface((width, line_height * len(rows) + 12), pygame.SRCALPHA)
+        overlay.fill(OVERLAY_BACKGROUND)
+        for i, row in enumerate(rows):
+            y = 6 + i * line_height
+            overlay.blit(row[0], (6, y))
+            for column, cell in enumerate(row[1:], 1):
+                overlay.blit(cell, (6 + label_width + column * column_width - cell.get_width(), y))
+        return overlay
+
+
+# 全局帧性能分析器实例
+frame_profiler = FrameProfiler()
@@ -1,4 +1,5 @@
 import pygame
+from code.sim_clock import sim_clock
 
 class InputOperon:
     """
@@ -11,6 +12,12 @@ class InputOperon:
             'sub_1': pygame.K_1, 'sub_2': pygame.K_2,
             'roll': pygame.K_LSHIFT
         }
+        # 游戏指令按键 (切换模式、暂停、存档等)，与其他动作一样进入动作字典，以便录制和回放
+        self.command_map = {
+            pygame.K_TAB: 'toggle_edit_mode', pygame.K_ESCAPE: 'toggle_pause',
+            pygame.K_i: 'toggle_inventory', pygame.K_s: 'quick_save', pygame.K_r: 'respawn'
+        }
+        self.upgrade_keys = (pygame.K_1, pygame.K_2, pygame.K_3)
         self.mouse_map = { 1: 'main_1', 3: 'main_2' }
         self.mouse_down_times = {}
         self.skill_triggered = {}
@@ -25,9 +32,12 @@ class InputOperon:
         actions['move_dir'] = keys[self.key_map['move_right']] - keys[self.key_map['move_left']]
         actions['jump'] = keys[self.key_map['jump']]
         actions['interact'] = keys[self.key_map['interact']]
+        actions['shift_held'] = keys[pygame.K_LSHIFT] or keys[pygame.K_RSHIFT]
+        actions['mouse_buttons'] = pygame.mouse.get_pressed()
 
         for event in events:
             self._handle_mouse_events(event, actions)
+            self._handle_command_keys(event, actions)
             self._handle_key_press_events(event, actions)
         
         self._update_long_presses(actions)
@@ -42,9 +52,21 @@ class InputOperon:
             'add_weapon_spawn': False,
             'add_door_interact': False, 'add_scroll_interact': False, 'add_chest_interact': False,
             'active_slot': None, 'is_skill': False, 'attack': False,
+            'shift_held': False, 'mouse_buttons': (False, False, False),
+            'toggle_edit_mode': False, 'toggle_pause': False, 'toggle_inventory': False,
+            'quick_save': False, 'respawn': False, 'upgrade_key': None,
             'mouse_pos': pygame.mouse.get_pos() if pygame.mouse.get_focused() else None
         }
 
+    def _handle_command_keys(self, event, actions):
+        """Handles KEYDOWN events for game commands (also fired alongside editor shortcuts)."""
+        if event.type == pygame.KEYDOWN:
+            command = self.command_map.get(event.key)
+            if command:
+                actions[command] = True
+            elif event.key in self.upgrade_keys:
+                actions['upgrade_key'] = event.key
+
     def _handle_key_press_events(self, event, actions):
         """Handles KEYDOWN events for single-press actions."""
         if event.type == pygame.KEYDOWN:
@@ -96,7 +118,7 @@ class InputOperon:
 
             if event.button in self.mouse_map:
                 slot = self.mouse_map[event.button]
-                self.mouse_down_times[slot] = pygame.time.get_ticks()
+                self.mouse_down_times[slot] = sim_clock.now
                 self.skill_triggered[slot] = False
                 # 设置攻击状态
                 actions['attack'] = True
@@ -106,7 +128,7 @@ class InputOperon:
             if event.button in self.mouse_map:
                 slot = self.mouse_map[event.button]
                 if slot in self.mouse_down_times:
-                    duration = (pygame.time.get_ticks() - self.mouse_down_times[slot]) / 1000.0
+                    duration = (sim_clock.now - self.mouse_down_times[slot]) / 1000.0
                     if duration < 0.5:
                         actions['active_slot'] = slot
                         actions['is_skill'] = False
@@ -117,7 +139,7 @@ class InputOperon:
         """Checks for and triggers skill attacks on long presses."""
         for slot, start_time in list(self.mouse_down_times.items()):
             if not self.skill_triggered.get(slot):
-                duration = (pygame.time.get_ticks() - start_time) / 1000.0
+                duration = (sim_clock.now - start_time) / 1000.0
                 if duration >= 0.5:
                     actions['active_slot'] = slot
                     actions['is_skill'] = True
@@ -0,0 +1,129 @@
+import gzip
+import json
+import struct
+import pygame
+
+# --- 输入录像 ---
+# 录像是一个 gzip 压缩的二进制流: 文件头 (魔数、版本、JSON 元数据: 随机种子、起始模拟时间、
+# 存档槽及开局时读取的存档分区)，之后每个模拟步一条定长记录 (该步的动作字典)。
+# 回放时用同样的种子、模拟时间和存档数据开局，再把动作逐步送回 Game.update_state，结果逐位一致
+REPLAY_MAGIC = b'BRRP'
+REPLAY_VERSION = 2  # 2: 模拟时钟在暂停时不再推进
+REPLAY_EXT = '.replay'
+REPLAY_SLOT = 'replay'  # 回放时载入录像中存档数据的临时存档槽
+
+HEADER = struct.Struct('<4sHI')  # 魔数, 版本, 元数据长度
+# 移动方向, 开关位 (布尔动作 + 鼠标按键 + 是否有鼠标位置), 武器槽/升级键编号 (各占 4 位), 鼠标 x, y
+FRAME = struct.Struct('<bIBhh')
+
+# 布尔动作，按位存储
+FLAG_ACTIONS = (
+    'jump', 'interact', 'roll', 'save_map',
+    'add_melee_spawn', 'add_ranged_spawn', 'remove_spawn_point', 'add_weapon_spawn',
+    'add_door_interact', 'add_scroll_interact', 'add_chest_interact',
+    'is_skill', 'attack', 'shift_held',
+    'toggle_edit_mode', 'toggle_pause', 'toggle_inventory', 'quick_save', 'respawn'
+)
+MOUSE_BUTTON_SHIFT = len(FLAG_ACTIONS)
+HAS_MOUSE_BIT = 1 << (MOUSE_BUTTON_SHIFT + 3)
+ACTIVE_SLOTS = (None, 'sub_1', 'sub_2', 'main_1', 'main_2')
+UPGRADE_KEYS = (None, pygame.K_1, pygame.K_2, pygame.K_3)
+
+
+def encode_actions(actions):
+    """把一个模拟步的动作字典编码为定长记录"""
+    flags = 0
+    for bit, name in enumerate(FLAG_ACTIONS):
+        if actions.get(name):
+            flags |= 1 << bit
+    for button, pressed in enumerate(actions.get('mouse_buttons', ())[:3]):
+        if pressed:
+            flags |= 1 << (MOUSE_BUTTON_SHIFT + button)
+    mouse_pos = actions.get('mouse_pos')
+    mouse_x = mouse_y = 0
+    if mouse_pos is not None:
+        flags |= HAS_MOUSE_BIT
+        mouse_x, mouse_y = mouse_pos
+    choices = ACTIVE_SLOTS.index(actions.get('active_slot')) | UPGRADE_KEYS.index(actions.get('upgrade_key')) << 4
+    return FRAME.pack(actions.get('move_dir', 0), flags, choices, mouse_x, mouse_y)
+
+
+def decode_actions(record):
+    """把定长记录还原为动作字典 (与 InputOperon.process_input 的结果等价)"""
+    move_dir, flags, choices, mouse_x, mouse_y = FRAME.unpack(record)
+    actions = {name: bool(flags & (1 << bit)) for bit, name in enumerate(FLAG_ACTIONS)}
+    actions['move_dir'] = move_dir
+    actions['mouse_buttons'] = tuple(bool(flags & (1 << (MOUSE_BUTTON_SHIFT + button))) for button in range(3))
+    actions['mouse_pos'] = (mouse_x, mouse_y) if flags & HAS_MOUSE_BIT else None
+    actions['active_slot'] = ACTIVE_SLOTS[choices & 0x0F]
+    actions['upgrade_key'] = UPGRADE_KEYS[choices >> 4]
+    return actions
+
+
+class InputRecorder:
+    """输入录制器 - 开局时写入文件头，之后每个模拟步追加一条动作记录"""
+    def __init__(self, filename, metadata):
+        """
+        开始录制
+        :param filename: 录像文件
+        :param metadata: 可 JSON 序列化的开局信息 (seed, start_ticks, save_slot, 存档分区等)
+        """
+        self.filename = filename
+        self.frame_count = 0
+        data = json.dumps(metadata).encode('utf-8')
+        self._file = gzip.open(filename, 'wb')
+        self._file.write(HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, len(data)))
+        self._file.write(data)
+
+    def record(self, actions):
+        self._file.write(encode_actions(actions))
+        self.frame_count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            print(f"Recorded {self.frame_count} steps to {self.filename}")
+
+
+class InputReplay:
+    """录像回放 - 一次读入整个录像，按模拟步依次给出动作字典"""
+    def __init__(self, filename):
+        """
+        读取录像
+        :param filename: 录像文件 (录制时中断导致的截断文件也能读出已写入的部分)
+        """
+        self.filename = filename
+        chunks = []
+        with gzip.open(filename, 'rb') as f:
+            try:
+                while True:
+                    chunk = f.read(1 << 16)
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+            except EOFError:
+                print(f"Replay {filename} is truncated, replaying the recorded part")
+        data = b''.join(chunks)
+
+        magic, version, metadata_size = HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC:
+            raise ValueError(f"{filename} is not a replay file")
+        if version != REPLAY_VERSION:
+            raise ValueError(f"Unsupported replay version {version}")
+        start = HEADER.size + metadata_size
+        self.metadata = json.loads(data[HEADER.size:start].decode('utf-8'))
+        self._frames = memoryview(data)[start:]
+        self.frame_count = len(self._frames) // FRAME.size
+        self.position = 0  # 下一个要回放的模拟步
+
+    def next_actions(self):
+        """
+        取出下一个模拟步的动作
+        :return: 动作字典，录像结束时返回 None
+        """
+        if self.position >= self.frame_count:
+            return None
+        offset = self.position * FRAME.size
+        self.position += 1
+        return decode_actions(self._frames[offset:offset + FRAME.size])
@@ -1,4 +1,5 @@
 import pygame
+from code.sim_clock import sim_clock
 
 class Interactable(pygame.sprite.Sprite):
     """
@@ -13,8 +14,8 @@ class Interactable(pygame.sprite.Sprite):
 
     def interact(self, player, operon):
         """Checks if the interaction cooldown has passed."""
-        if pygame.time.get_ticks() - self.last_interaction_time > 500:
-            self.last_interaction_time = pygame.time.get_ticks()
+        if sim_clock.now - self.last_interaction_time > 500:
+            self.last_interaction_time = sim_clock.now
             return True
         return False
     
@@ -1,5 +1,9 @@
 import pygame
 from .map_data_operon import INTERACT_DOOR, INTERACT_SCROLL, INTERACT_CHEST
+from code.sim_clock import sim_clock
+from code.physics import sweep_aabb
+
+DOOR_BUCKET_SHIFT = 3 # 门碰撞体积按每 8 列格子分桶索引
 
 class InteractPointOperon:
     """
@@ -12,43 +16,33 @@ class InteractPointOperon:
         """
         self.map_data = map_data_operon
         self.door_health = {}  # 用于存储门的血量
+        # 门碰撞体积缓存: 门状态变化 (开关、破坏、增删) 时递增版本号，缓存在版本号不一致时重建
+        self.door_version = 0
+        self._door_cache_key = None
+        self._door_cache_points = None
+        self._door_buckets = {} # 桶号 -> 该列范围内的门碰撞矩形列表
 
     def _find_nearby_same_type_points(self, grid_x, grid_y, interact_type):
         """Find nearby points of the same type in all 9 grid cells (3x3 area)."""
         nearby_points = []
+        tile_size = self.map_data.tile_size
         
-        # Check all 9 cells (3x3 area centered on current cell)
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                check_grid_x = grid_x + dx
-                check_grid_y = grid_y + dy
+        # Only points indexed around the 3x3 area centered on the current cell can match
+        area = pygame.Rect((grid_x - 1) * tile_size, (grid_y - 1) * tile_size, 3 * tile_size, 3 * tile_size)
+        for point in self.map_data.interact_index.query_rect(area):
+            if point['type'] == interact_type and not point.get('is_collected', False):
+                # For groups, check all positions in the group
+                if point.get('is_group') and 'group_positions' in point:
+                    positions = point['group_positions']
+                else:
+                    # Single point
+                    positions = [(int(point['pos'][0] // tile_size), int(point['pos'][1] // tile_size))]
                 
-                # Check if there's a point of the same type in this grid cell
-                for point in self.map_data.interact_points:
-                    if point['type'] == interact_type and not point.get('is_collected', False):
-                        # For groups, check all positions in the group
-                        if point.get('is_group') and 'group_positions' in point:
-                            for group_x, group_y in point['group_positions']:
-                                if group_x == check_grid_x and group_y == check_grid_y:
-                                    nearby_points.append(point)
-                                    break  # Found this point, no need to check other positions
-                        else:
-                            # Single point
-                            point_grid_x = int(point['pos'][0] // self.map_data.tile_size)
-                            point_grid_y = int(point['pos'][1] // self.map_data.tile_size)
-                            
-                            if point_grid_x == check_grid_x and point_grid_y == check_grid_y:
-                                nearby_points.append(point)
-        
-        # Remove duplicates (same point might be found multiple times)
-        unique_points = []
-        seen_points = set()
-        for point in nearby_points:
-            point_id = id(point)  # Use object id as unique identifier
-            if point_id not in seen_points:
-                seen_points.add(point_id)
-                unique_points.append(point)
-        return unique_points
+                for check_grid_x, check_grid_y in positions:
+                    if abs(check_grid_x - grid_x) <= 1 and abs(check_grid_y - grid_y) <= 1:
+                        nearby_points.append(point)
+                        break  # Found this point, no need to check other positions
+        return nearby_points
 
     def _merge_points_into_group(self, main_point, nearby_points):
         """Create or update a merged group of points."""
@@ -74,11 +68,12 @@ class InteractPointOperon:
         # Update the main point to mark it as a group
         main_point['is_group'] = True
         main_point['group_positions'] = group_positions
+        self.map_data.update_interact_point(main_point)
         
         # Remove the nearby points as they're now part of the group
         for point in nearby_points:
             if point in self.map_data.interact_points:
-                self.map_data.interact_points.remove(point)
+                self.map_data.remove_interact_point(point)
         
         print(f"Merged {len(nearby_points) + 1} {main_point['type']} points into a group")
 
@@ -153,7 +148,7 @@ class InteractPointOperon:
             # Remove all the old points
             for point in nearby_points:
                 if point in self.map_data.interact_points:
-                    self.map_data.interact_points.remove(point)
+                    self.map_data.remove_interact_point(point)
             
             # Create the new merged point
             new_point = {
@@ -165,7 +160,8 @@ class InteractPointOperon:
                 'is_group': True,
                 'group_positions': list(all_positions)
             }
-            self.map_data.interact_points.append(new_point)
+            self.map_data.add_interact_point(new_point)
+            self.door_version += 1
             
             print(f"Created merged {interact_type} group with {len(all_positions)} tiles at center ({center_x}, {center_y})")
         else:
@@ -179,39 +175,57 @@ class InteractPointOperon:
                 'is_group': True,
                 'group_positions': shape_positions
             }
-            self.map_data.interact_points.append(new_point)
+            self.map_data.add_interact_point(new_point)
+            self.door_version += 1
             print(f"Added {interact_type} interact point with {len(shape_positions)} tiles at center ({center_x}, {center_y})")
 
-    def get_door_collision_rects(self):
+    def sweep_doors(self, x, y, w, h, dx, dy, max_toi=1.0):
         """
-        获取所有门交互点的碰撞体积（仅关闭且未破坏的门）
-        :return: 门碰撞体积的矩形列表
+        碰撞查询 - 矩形移动时最先碰到的关闭的门，直接在门碰撞体积的分桶中求解 (不创建列表)
+        :return: (碰撞时刻 0..max_toi, 法线 x, 法线 y)，没有碰撞时为 (max_toi, 0, 0)
         """
-        door_rects = []
-        
-        for point in self.map_data.interact_points:
+        self._refresh_door_cache()
+        tile_size = self.map_data.tile_size
+        first_bucket = (int(min(x, x + dx) // tile_size) - 1) >> DOOR_BUCKET_SHIFT
+        last_bucket = (int(max(x + w, x + w + dx) // tile_size) + 1) >> DOOR_BUCKET_SHIFT
+        result = (max_toi, 0, 0)
+        for bucket in range(first_bucket, last_bucket + 1):
+            door_rects = self._door_buckets.get(bucket)
+            if door_rects:
+                hit = sweep_aabb(x, y, w, h, dx, dy, door_rects, result[0])
+                if hit[1] or hit[2]:
+                    result = hit
+        return result
+
+    def _refresh_door_cache(self):
+        """门状态或交互点列表变化后重建门碰撞体积缓存"""
+        interact_points = self.map_data.interact_points
+        cache_key = (self.door_version, len(interact_points))
+        if interact_points is self._door_cache_points and cache_key == self._door_cache_key:
+            return
+
+        tile_size = self.map_data.tile_size
+        door_buckets = {}
+        for point in interact_points:
             if point['type'] == INTERACT_DOOR:
                 # Only add collision for doors that are closed and not broken
                 if point.get('is_open', False) or point.get('is_broken', False):
                     continue
-                    
+
                 if point.get('is_group') and 'group_positions' in point:
                     # 如果是门的组合，为每个格子创建碰撞体积
-                    for grid_x, grid_y in point['group_positions']:
-                        world_x = grid_x * self.map_data.tile_size
-                        world_y = grid_y * self.map_data.tile_size
-                        door_rect = pygame.Rect(world_x, world_y, self.map_data.tile_size, self.map_data.tile_size)
-                        door_rects.append(door_rect)
+                    grid_positions = point['group_positions']
                 else:
                     # 单个门，创建碰撞体积
-                    grid_x = int(point['pos'][0] // self.map_data.tile_size)
-                    grid_y = int(point['pos'][1] // self.map_data.tile_size)
-                    world_x = grid_x * self.map_data.tile_size
-                    world_y = grid_y * self.map_data.tile_size
-                    door_rect = pygame.Rect(world_x, world_y, self.map_data.tile_size, self.map_data.tile_size)
-                    door_rects.append(door_rect)
-        
-        return door_rects
+                    grid_positions = [(int(point['pos'][0] // tile_size), int(point['pos'][1] // tile_size))]
+
+                for grid_x, grid_y in grid_positions:
+                    door_rect = pygame.Rect(grid_x * tile_size, grid_y * tile_size, tile_size, tile_size)
+                    door_buckets.setdefault(grid_x >> DOOR_BUCKET_SHIFT, []).append(door_rect)
+
+        self._door_buckets = door_buckets
+        self._door_cache_key = cache_key
+        self._door_cache_points = interact_points # 地图重新加载会替换整个列表
 
     def toggle_door_at_position(self, world_pos, interaction_range=50):
         """
@@ -222,7 +236,7 @@ class InteractPointOperon:
         """
         target_pos = pygame.Vector2(world_pos)
         
-        for point in self.map_data.interact_points:
+        for point in self.map_data.interact_index.query_radius(world_pos, interaction_range):
             if point['type'] == INTERACT_DOOR and not point.get('is_broken', False):
                 # Check if interaction point is near any part of this door group
                 interaction_found = False
@@ -249,6 +263,7 @@ class InteractPointOperon:
                 if interaction_found:
                     new_state = not point.get('is_open', False)
                     point['is_open'] = new_state
+                    self.door_version += 1
                     state_text = "opened" if new_state else "closed"
                     
                     if point.get('is_group') and 'group_positions' in point:
@@ -269,7 +284,7 @@ class InteractPointOperon:
         """
         target_pos = pygame.Vector2(world_pos)
         
-        for point in self.map_data.interact_points:
+        for point in self.map_data.interact_index.query_radius(world_pos, interaction_range):
             if point['type'] in [INTERACT_CHEST, INTERACT_SCROLL]:
                 # Skip if already collected
                 if point.get('is_collected', False):
@@ -288,7 +303,7 @@ class InteractPointOperon:
                 if interaction_found:
                     # Mark as collected
                     point['is_collected'] = True
-                    point['collection_time'] = pygame.time.get_ticks()
+                    point['collection_time'] = sim_clock.now
                     
                     # Calculate group size (1 for single points, actual size for groups)
                     group_size = 1
@@ -316,7 +331,7 @@ class InteractPointOperon:
         """
         doors_destroyed = False
         
-        for point in self.map_data.interact_points:
+        for point in self.map_data.interact_index.query_rect(damage_rect):
             if point['type'] == INTERACT_DOOR and not point.get('is_broken', False):
                 # 为每个门设置唯一的ID
                 door_id = id(point)
@@ -358,6 +373,7 @@ class InteractPointOperon:
                         point['is_broken'] = True
                         point['is_open'] = True  # Broken doors are effectively open
                         doors_destroyed = True
+                        self.door_version += 1
                         
                         # 移除门的血量记录
                         if door_id in self.door_health:
@@ -0,0 +1,239 @@
+import json
+import mmap
+import os
+import struct
+from .tile_grid import TileGrid
+
+# --- 二进制地图格式 (.bmap) ---
+# 布局 (小端序):
+#   文件头 | 格子平面 (width * height 字节, 行优先) | 敌人生成点表 | 武器生成点表 | 交互点表 | 交互点组格子表
+MAP_BINARY_EXT = '.bmap'
+MAGIC = b'BMAP'
+FORMAT_VERSION = 2  # v2: 交互点记录增加稳定 ID
+
+HEADER = struct.Struct('<4sHHIIIIIIIIIII')
+SPAWN_RECORD = struct.Struct('<Bdd')       # 类型, x, y
+WEAPON_RECORD = struct.Struct('<dd')       # x, y
+INTERACT_RECORD = struct.Struct('<BBIiiqII')  # 类型, 状态位, ID, x, y, 收集时间, 组起始下标, 组格子数
+INTERACT_RECORD_V1 = struct.Struct('<BBiiqII')  # v1 记录没有 ID
+GROUP_RECORD = struct.Struct('<ii')        # 格子 x, 格子 y
+
+SPAWN_TYPES = ('melee', 'ranged', 'shield', 'weapon')
+INTERACT_TYPES = ('door', 'scroll', 'chest')
+
+# 交互点状态位
+FLAG_OPEN = 1
+FLAG_OPEN_UNSET = 2  # is_open 为 None (宝箱、卷轴)
+FLAG_BROKEN = 4
+FLAG_COLLECTED = 8
+FLAG_GROUP = 16
+
+NO_COLLECTION_TIME = -1
+NO_INTERACT_ID = 0  # 未分配 ID 的交互点 (ID 从 1 开始)
+
+
+class MapFile:
+    """
+    已打开的二进制地图 - 格子平面直接映射自文件 (写时复制)，按需由操作系统分页载入
+    """
+    def __init__(self, filename, tiles, tile_size, spawn_points, weapon_spawn_points, interact_points, mapping=None):
+        self.filename = os.path.abspath(filename)
+        self.tiles = tiles
+        self.tile_size = tile_size
+        self.spawn_points = spawn_points
+        self.weapon_spawn_points = weapon_spawn_points
+        self.interact_points = interact_points
+        self._mapping = mapping
+
+    def close(self):
+        """
+        释放文件映射。格子平面会先被复制到内存中的 bytearray，并就地换掉 self.tiles.cells，
+        因此关闭后 self.tiles 仍然可读写: MapDataOperon 关闭映射后继续使用同一个 TileGrid (作为 ChunkedTileGrid 的 source)，依赖这一点
+        """
+        if self._mapping is not None:
+            view = self.tiles.cells
+            self.tiles.cells = bytearray(view)
+            view.release()
+            self._mapping.close()
+            self._mapping = None
+
+
+def _encode_interact_point(point, group_start):
+    flags = 0
+    is_open = point.get('is_open')
+    if is_open is None:
+        flags |= FLAG_OPEN_UNSET
+    elif is_open:
+        flags |= FLAG_OPEN
+    if point.get('is_broken', False):
+        flags |= FLAG_BROKEN
+    if point.get('is_collected', False):
+        flags |= FLAG_COLLECTED
+    group_positions = []
+    if point.get('is_group'):
+        flags |= FLAG_GROUP
+        group_positions = point.get('group_positions', [])
+    collection_time = point.get('collection_time')
+    return INTERACT_RECORD.pack(
+        INTERACT_TYPES.index(point['type']), flags, point.get('id', NO_INTERACT_ID),
+        int(point['pos'][0]), int(point['pos'][1]),
+        NO_COLLECTION_TIME if collection_time is None else int(collection_time),
+        group_start, len(group_positions)
+    ), group_positions
+
+
+def _decode_interact_point(record, groups):
+    type_code, flags, point_id, x, y, collection_time, group_start, group_count = record
+    point = {
+        'type': INTERACT_TYPES[type_code],
+        'pos': [x, y],
+        'is_open': None if flags & FLAG_OPEN_UNSET else bool(flags & FLAG_OPEN),
+        'is_broken': bool(flags & FLAG_BROKEN),
+        'is_collected': bool(flags & FLAG_COLLECTED),
+        'is_group': bool(flags & FLAG_GROUP),
+    }
+    if point_id != NO_INTERACT_ID:
+        point['id'] = point_id
+    if flags & FLAG_GROUP:
+        point['group_positions'] = [list(pos) for pos in groups[group_start:group_start + group_count]]
+    if collection_time != NO_COLLECTION_TIME:
+        point['collection_time'] = collection_time
+    return point
+
+
+def write_map(filename, tiles, tile_size, spawn_points, weapon_spawn_points, interact_points):
+    """
+    将地图写入二进制文件
+    :param tiles: TileGrid 格子存储
+    :param tile_size: 每个格子的像素大小
+    """
+    with open(filename, 'wb') as f:
+        f.write(encode_map(tiles, tile_size, spawn_points, weapon_spawn_points, interact_points))
+
+
+def encode_map(tiles, tile_size, spawn_points, weapon_spawn_points, interact_points):
+    """
+    将地图编码为二进制格式
+    :return: 完整文件内容 (bytes)
+    """
+    spawn_table = b''.join(
+        SPAWN_RECORD.pack(SPAWN_TYPES.index(point['type']), point['pos'][0], point['pos'][1])
+        for point in spawn_points
+    )
+    weapon_table = b''.join(
+        WEAPON_RECORD.pack(point['pos'][0], point['pos'][1]) for point in weapon_spawn_points
+    )
+
+    interact_records = []
+    group_records = []
+    for point in interact_points:
+        record, group_positions = _encode_interact_point(point, len(group_records))
+        interact_records.append(record)
+        group_records.extend(GROUP_RECORD.pack(gx, gy) for gx, gy in group_positions)
+    interact_table = b''.join(interact_records)
+    group_table = b''.join(group_records)
+
+    tiles_offset = HEADER.size
+    spawn_offset = tiles_offset + tiles.width * tiles.height
+    weapon_offset = spawn_offset + len(spawn_table)
+    interact_offset = weapon_offset + len(weapon_table)
+    group_offset = interact_offset + len(interact_table)
+
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, tile_size, tiles.width, tiles.height,
+        len(spawn_points), len(weapon_spawn_points), len(interact_records), len(group_records),
+        tiles_offset, spawn_offset, weapon_offset, interact_offset, group_offset
+    )
+    return b''.join((header, tiles.cells, spawn_table, weapon_table, interact_table, group_table))
+
+
+def read_map(filename):
+    """
+    以内存映射方式打开二进制地图，格子平面不会被一次性读入
+    :return: MapFile 实例
+    """
+    with open(filename, 'rb') as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    try:
+        (magic, version, tile_size, width, height,
+         spawn_count, weapon_count, interact_count, group_count,
+         tiles_offset, spawn_offset, weapon_offset, interact_offset, group_offset) = HEADER.unpack_from(mapping, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{filename} is not a binary map file")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"{filename} uses map format v{version}, newest supported is v{FORMAT_VERSION}")
+
+        spawn_points = []
+        for i in range(spawn_count):
+            type_code, x, y = SPAWN_RECORD.unpack_from(mapping, spawn_offset + i * SPAWN_RECORD.size)
+            spawn_points.append({'type': SPAWN_TYPES[type_code], 'pos': [x, y]})
+
+        weapon_spawn_points = []
+        for i in range(weapon_count):
+            x, y = WEAPON_RECORD.unpack_from(mapping, weapon_offset + i * WEAPON_RECORD.size)
+            weapon_spawn_points.append({'type': 'weapon', 'pos': [x, y]})
+
+        groups = [GROUP_RECORD.unpack_from(mapping, group_offset + i * GROUP_RECORD.size) for i in range(group_count)]
+        interact_points = []
+        for i in range(interact_count):
+            if version >= 2:
+                record = INTERACT_RECORD.unpack_from(mapping, interact_offset + i * INTERACT_RECORD.size)
+            else:
+                type_code, flags, *rest = INTERACT_RECORD_V1.unpack_from(mapping, interact_offset + i * INTERACT_RECORD_V1.size)
+                record = (type_code, flags, NO_INTERACT_ID, *rest)
+            interact_points.append(_decode_interact_point(record, groups))
+
+        cells = memoryview(mapping)[tiles_offset:tiles_offset + width * height]
+        tiles = TileGrid(width, height, cells=cells)
+    except Exception:
+        mapping.close()
+        raise
+
+    return MapFile(filename, tiles, tile_size, spawn_points, weapon_spawn_points, interact_points, mapping)
+
+
+def convert_json_to_binary(json_filename, binary_filename, tile_size=32):
+    """把 JSON 地图 (custom_map.json 格式) 转换为二进制地图"""
+    with open(json_filename, 'r') as f:
+        data = json.load(f)
+    write_map(
+        binary_filename,
+        TileGrid.from_rows(data.get('map_layout', [])),
+        tile_size,
+        data.get('spawn_points', []),
+        data.get('weapon_spawn_points', []),
+        data.get('interact_points', [])
+    )
+
+
+def convert_binary_to_json(binary_filename, json_filename):
+    """把二进制地图转换回 JSON 地图 (custom_map.json 格式)"""
+    map_file = read_map(binary_filename)
+    try:
+        data = {
+            'map_layout': map_file.tiles.to_rows(),
+            'spawn_points': map_file.spawn_points,
+            'weapon_spawn_points': map_file.weapon_spawn_points,
+            'interact_points': map_file.interact_points
+        }
+    finally:
+        map_file.close()
+    with open(json_filename, 'w') as f:
+        json.dump(data, f, indent=4)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert maps between JSON and the binary .bmap format.")
+    parser.add_argument('source', help="map file to convert (.json or .bmap)")
+    parser.add_argument('target', help="output file")
+    parser.add_argument('--tile-size', type=int, default=32, help="tile size stored in the binary header")
+    args = parser.parse_args()
+
+    if os.path.splitext(args.source)[1] == MAP_BINARY_EXT:
+        convert_binary_to_json(args.source, args.target)
+    else:
+        convert_json_to_binary(args.source, args.target, args.tile_size)
+    print(f"Converted {args.source} -> {args.target}")
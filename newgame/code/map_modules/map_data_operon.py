@@ -1,5 +1,14 @@
 import pygame
 import json
+import os
+from .tile_grid import TileGrid, ChunkedTileGrid, CHUNK_WIDTH
+from .map_binary import MAP_BINARY_EXT, encode_map, read_map, write_map
+from .map_store import (STORE_DIR, HEAD_FILE, DIFF_VERSION, blob_digest, blob_path,
+                        read_head, apply_interact_diff)
+from .spatial_hash import SpatialHash
+from code.save_service import save_service
+from code.physics import sweep_tiles, trace_tiles
+from code.save_container import SECTION_INTERACT_STATE, SECTION_MAP, container_path, read_section
 
 # --- 地图元素常量 ---
 EMPTY = 0
@@ -16,6 +25,10 @@ INTERACT_DOOR = 'door'
 INTERACT_SCROLL = 'scroll'
 INTERACT_CHEST = 'chest'
 
+POINT_INDEX_CELL_TILES = 4 # 生成点/交互点空间哈希的单元边长 (格子数)
+
+INTERACT_STATE_VERSION = 2 # 交互点状态文件格式: v2 以交互点 ID 为键
+
 class MapDataOperon:
     """
     地图数据操作子 - 管理地图数据和保存/加载功能
@@ -30,14 +43,22 @@ class MapDataOperon:
         self.map_width = map_width
         self.map_height = map_height
         self.tile_size = tile_size
-        self.map_data = [[EMPTY for _ in range(map_width)] for _ in range(map_height)]
+        self.tiles = ChunkedTileGrid(TileGrid(map_width, map_height, EMPTY))
         self.spawn_points = [] # For enemies
         self.weapon_spawn_points = [] # For weapons
         self.interact_points = [] # For interactive points (door, scroll, chest)
+        self._map_file = None # Memory-mapped binary map currently backing self.tiles
+        self.base_digest = None # Map store digest of the base map the current map was loaded from
+        # Spatial hashes over the point lists; mutate the lists through the add/remove helpers below
+        cell_size = tile_size * POINT_INDEX_CELL_TILES
+        self.spawn_index = SpatialHash(cell_size)
+        self.weapon_index = SpatialHash(cell_size)
+        self.interact_index = SpatialHash(cell_size)
+        self._next_interact_id = 1 # Stable interact point IDs start at 1
         # Add a default ground line across the entire map width
         ground_y = map_height - 2
         for x in range(map_width):
-            self.map_data[ground_y][x] = COLLISION
+            self.tiles.set(x, ground_y, COLLISION)
 
     def get_tile(self, world_x, world_y):
         """
@@ -46,71 +67,222 @@ class MapDataOperon:
         :param world_y: 世界 y 坐标
         :return: 格子类型
         """
-        map_x = int(world_x // self.tile_size)
-        map_y = int(world_y // self.tile_size)
-        
-        if 0 <= map_x < self.map_width and 0 <= map_y < self.map_height:
-            return self.map_data[map_y][map_x]
-        return None
+        return self.tiles.get(int(world_x // self.tile_size), int(world_y // self.tile_size))
 
-    def save_to_file(self, filename, save_slot=None):
-        """Saves the current state of the entire map and all points."""
-        # If save_slot is provided, modify filename to include slot number
-        if save_slot is not None:
-            filename = f"map_save_{save_slot}.json"
-        
-        data_to_save = {
-            'map_layout': self.map_data,
-            'spawn_points': self.spawn_points,
-            'weapon_spawn_points': self.weapon_spawn_points,
-            'interact_points': self.interact_points
-        }
-        try:
-            with open(filename, 'w') as f:
+    def sweep_solid(self, x, y, w, h, dx, dy, max_toi=1.0):
+        """
+        碰撞查询 - 矩形 (x, y, w, h) 移动 (dx, dy) 时最先碰到的碰撞格，直接遍历格子编号求解，
+        不创建碰撞矩形或候选列表 (玩家、敌人的物理都通过它查询地图)
+        :return: (碰撞时刻 0..max_toi, 法线 x, 法线 y)，没有碰撞时为 (max_toi, 0, 0)
+        """
+        return sweep_tiles(self.tiles, self.tile_size, COLLISION, x, y, w, h, dx, dy, max_toi)
+
+    def trace_solid(self, x, y, dx, dy, max_toi=1.0):
+        """
+        射线查询 - 点 (x, y) 移动 (dx, dy) 时最先进入的碰撞格，只逐格遍历线段穿过的格子 (子弹用)
+        :return: (碰撞时刻 0..max_toi, 法线 x, 法线 y)，没有碰撞时为 (max_toi, 0, 0)
+        """
+        return trace_tiles(self.tiles, self.tile_size, COLLISION, x, y, dx, dy, max_toi)
+
+    def _interact_point_bounds(self, point):
+        """交互点的世界坐标包围盒 (覆盖中心点所在格子以及组内所有格子)"""
+        tile_size = self.tile_size
+        left = int(point['pos'][0] // tile_size) * tile_size
+        top = int(point['pos'][1] // tile_size) * tile_size
+        right, bottom = left + tile_size, top + tile_size
+        if point.get('is_group') and 'group_positions' in point:
+            for grid_x, grid_y in point['group_positions']:
+                left = min(left, grid_x * tile_size)
+                top = min(top, grid_y * tile_size)
+                right = max(right, (grid_x + 1) * tile_size)
+                bottom = max(bottom, (grid_y + 1) * tile_size)
+        return left, top, right, bottom
+
+    @staticmethod
+    def _point_bounds(point):
+        x, y = point['pos'][0], point['pos'][1]
+        return x, y, x, y
+
+    def _assign_interact_ids(self):
+        """为没有 ID 的交互点 (旧地图文件) 按列表顺序分配 ID"""
+        self._next_interact_id = max((point.get('id', 0) for point in self.interact_points), default=0) + 1
+        for point in self.interact_points:
+            if 'id' not in point:
+                point['id'] = self._next_interact_id
+                self._next_interact_id += 1
+
+    def rebuild_point_indexes(self):
+        """按当前的点列表重建全部空间哈希 (加载地图后调用)"""
+        self._assign_interact_ids()
+        self.spawn_index.rebuild(self.spawn_points, self._point_bounds)
+        self.weapon_index.rebuild(self.weapon_spawn_points, self._point_bounds)
+        self.interact_index.rebuild(self.interact_points, self._interact_point_bounds)
+
+    def add_spawn_point(self, point):
+        self.spawn_points.append(point)
+        self.spawn_index.insert(point, self._point_bounds(point))
+
+    def remove_spawn_point(self, point):
+        self.spawn_points.remove(point)
+        self.spawn_index.remove(point)
+
+    def add_weapon_spawn_point(self, point):
+        self.weapon_spawn_points.append(point)
+        self.weapon_index.insert(point, self._point_bounds(point))
+
+    def remove_weapon_spawn_point(self, point):
+        self.weapon_spawn_points.remove(point)
+        self.weapon_index.remove(point)
+
+    def add_interact_point(self, point):
+        if 'id' not in point:
+            point['id'] = self._next_interact_id
+            self._next_interact_id += 1
+        self.interact_points.append(point)
+        self.interact_index.insert(point, self._interact_point_bounds(point))
+
+    def remove_interact_point(self, point):
+        self.interact_points.remove(point)
+        self.interact_index.remove(point)
+
+    def update_interact_point(self, point):
+        """交互点的位置或组格子被修改后重新登记"""
+        self.interact_index.insert(point, self._interact_point_bounds(point))
+
+    def stream_chunks_around(self, camera_x, view_width):
+        """
+        预先载入摄像机视野内以及左右各一块的地图块
+        :param camera_x: 摄像机水平偏移量
+        :param view_width: 视野宽度 (像素)
+        """
+        first_col = int(camera_x // self.tile_size) - CHUNK_WIDTH
+        last_col = int((camera_x + view_width) // self.tile_size) + 1 + CHUNK_WIDTH
+        self.tiles.prefetch(first_col, last_col)
+
+    def _snapshot(self):
+        """Cheap copy of the tile plane and the point dicts for the background writer."""
+        self.tiles.flush()
+        tiles = TileGrid(self.tiles.width, self.tiles.height, cells=bytes(self.tiles.source.cells))
+        spawn_points = [dict(point) for point in self.spawn_points]
+        weapon_spawn_points = [dict(point) for point in self.weapon_spawn_points]
+        interact_points = [dict(point) for point in self.interact_points]
+        return tiles, spawn_points, weapon_spawn_points, interact_points
+
+    def save_to_file(self, filename):
+        """
+        Saves the current state of the entire map and all points (.bmap files use the binary format).
+        The map is snapshotted here and written in the background by the save service.
+        """
+        # Never replace a file that is still mapped underneath self.tiles
+        if self._map_file is not None and os.path.abspath(filename) == self._map_file.filename:
+            self._release_map_file()
+
+        tiles, spawn_points, weapon_spawn_points, interact_points = self._snapshot()
+        message = f"Full map data saved to {filename}"
+
+        if os.path.splitext(filename)[1] == MAP_BINARY_EXT:
+            def write_binary(path):
+                write_map(path, tiles, self.tile_size, spawn_points, weapon_spawn_points, interact_points)
+            save_service.submit(filename, write_binary, message)
+            return
+
+        def write_json(path):
+            data_to_save = {
+                'map_layout': tiles.to_rows(),
+                'spawn_points': spawn_points,
+                'weapon_spawn_points': weapon_spawn_points,
+                'interact_points': interact_points
+            }
+            with open(path, 'w') as f:
                 json.dump(data_to_save, f, indent=4)
-            print(f"Full map data saved to {filename}")
-        except IOError as e:
-            print(f"Error saving map data to {filename}: {e}")
+        save_service.submit(filename, write_json, message)
+
+    def save_base_map(self, reset_slots=()):
+        """
+        Store the current map as the shared base map (content-addressed, written once however many slots use it).
+        :param reset_slots: save slots whose maps are reset to this base (an empty diff)
+        """
+        tiles, spawn_points, weapon_spawn_points, interact_points = self._snapshot()
+        data = encode_map(tiles, self.tile_size, spawn_points, weapon_spawn_points, interact_points)
+        digest = blob_digest(data)
+        self.base_digest = digest
+
+        os.makedirs(STORE_DIR, exist_ok=True)
+        path = blob_path(digest)
+        if not os.path.exists(path):
+            def write_blob(temp_path):
+                with open(temp_path, 'wb') as f:
+                    f.write(data)
+            save_service.submit(path, write_blob, f"Base map stored as {digest[:12]}")
+
+        def write_head(temp_path):
+            with open(temp_path, 'w') as f:
+                f.write(digest)
+        save_service.submit(HEAD_FILE, write_head)
+
+        for slot in reset_slots:
+            save_service.save_sections(container_path(slot), {SECTION_MAP: {'version': DIFF_VERSION, 'base': digest}},
+                                       f"Map of save slot {slot} reset to base map {digest[:12]}")
+
+    def _release_map_file(self):
+        """
+        Close the mapping backing self.tiles.
+        MapFile.close copies the tile plane into memory in place, so self.tiles.source stays valid afterwards.
+        """
+        if self._map_file is not None:
+            self._map_file.close()
+            self._map_file = None
             
-    def save_interact_state(self, filename):
-        """Save only the interact point states (collected status) to a separate file."""
-        interact_states = []
+    def get_interact_state(self):
+        """Snapshot of the interact point states (collected status), keyed by point id."""
+        interact_states = {}
         for point in self.interact_points:
-            interact_states.append({
-                'pos': point['pos'],
+            interact_states[str(point['id'])] = {
                 'type': point['type'],
                 'is_collected': point.get('is_collected', False),
                 'collection_time': point.get('collection_time', None)
-            })
-        
-        try:
-            with open(filename, 'w') as f:
-                json.dump(interact_states, f, indent=4)
-            print(f"Interact states saved to {filename}")
-        except IOError as e:
-            print(f"Error saving interact states to {filename}: {e}")
+            }
+        return {'version': INTERACT_STATE_VERSION, 'points': interact_states}
+
+    def save_interact_state(self, save_slot):
+        """Save only the interact point states to the slot's save container (written in the background)."""
+        filename = container_path(save_slot)
+        save_service.save_sections(filename, {SECTION_INTERACT_STATE: self.get_interact_state()},
+                                   f"Interact states saved to {filename}")
     
-    def load_interact_state(self, filename):
-        """Load interact point states from a separate file."""
+    def load_interact_state(self, save_slot):
+        """Load interact point states from the slot's save container."""
+        save_service.flush()
+        filename = container_path(save_slot)
         try:
-            with open(filename, 'r') as f:
-                interact_states = json.load(f)
+            data = read_section(save_slot, SECTION_INTERACT_STATE)
+            if data is None:
+                raise FileNotFoundError(filename)
             
-            # Update interact points with saved states
-            for saved_point in interact_states:
+            if isinstance(data, dict):
+                # Current format: records keyed by stable point id
+                points_by_key = {str(point.get('id')): point for point in self.interact_points}
+                saved_states = data.get('points', {}).items()
+            else:
+                # Legacy list format: match points by position and type
+                points_by_key = {}
                 for point in self.interact_points:
-                    # Match points by position and type
-                    if (point['pos'] == saved_point['pos'] and 
-                        point['type'] == saved_point['type']):
-                        point['is_collected'] = saved_point.get('is_collected', False)
-                        if 'collection_time' in saved_point:
-                            point['collection_time'] = saved_point['collection_time']
-                        break
+                    points_by_key.setdefault((point['type'], tuple(point['pos'])), point)
+                saved_states = (((saved['type'], tuple(saved['pos'])), saved) for saved in data)
+            
+            # Update interact points with saved states
+            for key, saved_point in saved_states:
+                point = points_by_key.get(key)
+                if point is None or point['type'] != saved_point.get('type', point['type']):
+                    continue
+                point['is_collected'] = saved_point.get('is_collected', False)
+                if 'collection_time' in saved_point:
+                    point['collection_time'] = saved_point['collection_time']
                         
             print(f"Interact states loaded from {filename}")
             return True
         except FileNotFoundError:
-            print(f"Interact state file '{filename}' not found.")
+            print(f"No interact states saved in '{filename}'.")
             return False
         except Exception as e:
             print(f"Error loading interact states from {filename}: {e}")
@@ -119,29 +291,106 @@ class MapDataOperon:
     def load_from_file(self, filename, save_slot=None):
         """
         Loads the entire map state from a saved file.
+        With a save slot, the slot's diff is applied over its memory-mapped base map.
         """
-        # If save_slot is provided, modify filename to include slot number
+        save_service.flush()
         if save_slot is not None:
-            filename = f"map_save_{save_slot}.json"
+            self._load_slot(save_slot)
+            return
         
+        if os.path.splitext(filename)[1] == MAP_BINARY_EXT:
+            self._load_binary(filename)
+            return
+
         try:
             with open(filename, 'r') as f:
                 data = json.load(f)
             
-            self.map_data = data.get('map_layout', self.map_data)
+            if data.get('map_layout'):
+                self._release_map_file()
+                self.tiles = ChunkedTileGrid(TileGrid.from_rows(data['map_layout']))
             self.spawn_points = data.get('spawn_points', [])
             self.weapon_spawn_points = data.get('weapon_spawn_points', [])
             self.interact_points = data.get('interact_points', [])
+            self.rebuild_point_indexes()
             
             # Update map dimensions based on loaded data
-            self.map_height = len(self.map_data)
-            self.map_width = len(self.map_data[0]) if self.map_height > 0 else 0
+            self.map_height = self.tiles.height
+            self.map_width = self.tiles.width
             
             print(f"Full map data from {filename} loaded successfully.")
         except FileNotFoundError:
             print(f"Map file '{filename}' not found. Using default empty map.")
         except Exception as e:
             print(f"An error occurred while loading map: {e}")
+
+    def load_base_map(self):
+        """
+        Map the current shared base map from the map store.
+        :return: whether a base map was found
+        """
+        save_service.flush()
+        digest = read_head()
+        if digest is None:
+            return False
+        if self._load_binary(blob_path(digest)):
+            self.base_digest = digest
+        return True
+
+    def _load_slot(self, save_slot):
+        """Apply a slot's diff over its base map, falling back to older full slot maps or the base map."""
+        try:
+            diff = read_section(save_slot, SECTION_MAP)
+        except Exception as e:
+            print(f"An error occurred while loading the map of save slot {save_slot}: {e}")
+            return
+        if diff is None:
+            legacy_file = f"map_save_{save_slot}{MAP_BINARY_EXT}"
+            if os.path.exists(legacy_file):
+                self._load_binary(legacy_file)
+            else:
+                self.load_base_map()
+            return
+
+        if self._load_binary(blob_path(diff['base']), diff):
+            self.base_digest = diff['base']
+
+    def _load_binary(self, filename, diff=None):
+        """
+        Map a binary map file; tile pages are only read from disk when touched.
+        :param diff: optional slot diff applied over the mapped map
+        :return: whether the map was loaded
+        """
+        try:
+            map_file = read_map(filename)
+        except FileNotFoundError:
+            print(f"Map file '{filename}' not found. Using default empty map.")
+            return False
+        except Exception as e:
+            print(f"An error occurred while loading map: {e}")
+            return False
+
+        if map_file.tile_size != self.tile_size:
+            print(f"Warning: {filename} was saved with tile size {map_file.tile_size}, using {self.tile_size}")
+        self._release_map_file()
+        self._map_file = map_file
+        self.tiles = ChunkedTileGrid(map_file.tiles)
+        self.spawn_points = map_file.spawn_points
+        self.weapon_spawn_points = map_file.weapon_spawn_points
+        self.interact_points = map_file.interact_points
+        if diff is not None:
+            # Edited tiles land in resident chunks; the mapped base itself is copy-on-write and never modified
+            for x, y, tile_type in diff.get('tiles', []):
+                self.tiles.set(x, y, tile_type)
+            self.spawn_points = diff.get('spawn_points', self.spawn_points)
+            self.weapon_spawn_points = diff.get('weapon_spawn_points', self.weapon_spawn_points)
+            if 'interact_points' in diff:
+                self.interact_points = apply_interact_diff(self.interact_points, diff['interact_points'])
+        self.rebuild_point_indexes()
+        self.map_height = self.tiles.height
+        self.map_width = self.tiles.width
+        print(f"Full map data from {filename} mapped successfully.")
+        return True
             
     def reset_interact_points(self):
         """Reset all interact points to uncollected state"""
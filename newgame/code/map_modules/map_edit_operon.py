@@ -24,19 +24,18 @@ class MapEditOperon:
         map_x = int(world_x // self.map_data.tile_size)
         map_y = int(mouse_pos[1] // self.map_data.tile_size)
 
-        if 0 <= map_x < self.map_data.map_width and 0 <= map_y < self.map_data.map_height:
-            self.map_data.map_data[map_y][map_x] = mark_type
+        if self.map_data.tiles.set(map_x, map_y, mark_type):
             print(f"标记格子 ({map_x}, {map_y}) 为 {mark_type}")
 
     def add_spawn_point(self, world_pos, spawn_type):
         """Adds a new enemy or weapon spawn point."""
         if spawn_type == SPAWN_WEAPON:
             new_point = {'type': spawn_type, 'pos': world_pos}
-            self.map_data.weapon_spawn_points.append(new_point)
+            self.map_data.add_weapon_spawn_point(new_point)
             print(f"Added weapon spawn point at {world_pos}")
         else: # Enemy spawns
             new_point = {'type': spawn_type, 'pos': world_pos}
-            self.map_data.spawn_points.append(new_point)
+            self.map_data.add_spawn_point(new_point)
             print(f"Added {spawn_type} spawn point at {world_pos}")
 
     def remove_spawn_point_at(self, world_pos, search_radius=15):
@@ -46,8 +45,8 @@ class MapEditOperon:
         # Check enemy spawn points first
         closest_enemy_point = None
         min_dist_sq_enemy = search_radius ** 2
-        for point in self.map_data.spawn_points:
-            dist_sq = target_pos.distance_to(pygame.Vector2(point['pos']))
+        for point in self.map_data.spawn_index.query_radius(world_pos, search_radius):
+            dist_sq = target_pos.distance_squared_to(pygame.Vector2(point['pos']))
             if dist_sq < min_dist_sq_enemy:
                 min_dist_sq_enemy = dist_sq
                 closest_enemy_point = point
@@ -55,8 +54,8 @@ class MapEditOperon:
         # Check weapon spawn points
         closest_weapon_point = None
         min_dist_sq_weapon = search_radius ** 2
-        for point in self.map_data.weapon_spawn_points:
-            dist_sq = target_pos.distance_to(pygame.Vector2(point['pos']))
+        for point in self.map_data.weapon_index.query_radius(world_pos, search_radius):
+            dist_sq = target_pos.distance_squared_to(pygame.Vector2(point['pos']))
             if dist_sq < min_dist_sq_weapon:
                 min_dist_sq_weapon = dist_sq
                 closest_weapon_point = point
@@ -64,21 +63,21 @@ class MapEditOperon:
         # Check interact points
         closest_interact_point = None
         min_dist_sq_interact = search_radius ** 2
-        for point in self.map_data.interact_points:
-            dist_sq = target_pos.distance_to(pygame.Vector2(point['pos']))
+        for point in self.map_data.interact_index.query_radius(world_pos, search_radius):
+            dist_sq = target_pos.distance_squared_to(pygame.Vector2(point['pos']))
             if dist_sq < min_dist_sq_interact:
                 min_dist_sq_interact = dist_sq
                 closest_interact_point = point
 
         # Prioritize removing the absolute closest point
         if closest_enemy_point and min_dist_sq_enemy < min_dist_sq_weapon and min_dist_sq_enemy < min_dist_sq_interact:
-            self.map_data.spawn_points.remove(closest_enemy_point)
+            self.map_data.remove_spawn_point(closest_enemy_point)
             print(f"Removed {closest_enemy_point['type']} spawn point at {closest_enemy_point['pos']}")
         elif closest_weapon_point and min_dist_sq_weapon < min_dist_sq_interact:
-            self.map_data.weapon_spawn_points.remove(closest_weapon_point)
+            self.map_data.remove_weapon_spawn_point(closest_weapon_point)
             print(f"Removed weapon spawn point at {closest_weapon_point['pos']}")
         elif closest_interact_point:
-            self.map_data.interact_points.remove(closest_interact_point)
+            self.map_data.remove_interact_point(closest_interact_point)
             print(f"Removed {closest_interact_point['type']} interact point at {closest_interact_point['pos']}")
         else:
             print(f"No spawn/interact point found within {search_radius} pixels of {world_pos}")
\ No newline at end of file
@@ -1,5 +1,16 @@
+import math
 import pygame
+from collections import OrderedDict
 from .map_data_operon import EMPTY, COLLISION, NPC, SPAWN_MELEE, SPAWN_RANGED, SPAWN_WEAPON, INTERACT_DOOR, INTERACT_SCROLL, INTERACT_CHEST
+from .tile_grid import CHUNK_WIDTH
+
+GRID_COLOR = (50, 50, 50) # 网格颜色
+TILE_FILL_COLORS = {
+    COLLISION: (100, 100, 100), # 填充灰色
+    NPC: (50, 50, 200),         # 填充蓝色
+}
+CHUNK_COLORKEY = (0, 0, 0)      # 块表面中的透明色
+MAX_CACHED_CHUNK_SURFACES = 4   # 每块表面约 2048x704 像素，只缓存视野附近的几块
 
 class MapRenderOperon:
     """
@@ -12,6 +23,9 @@ class MapRenderOperon:
         """
         self.map_data = map_data_operon
         self.font = pygame.font.SysFont('Arial', 12)
+        # 预渲染的格子层: 块号 -> (块版本号, Surface)，按最近使用顺序排列
+        self._chunk_surfaces = OrderedDict()
+        self._cached_tiles = None  # 缓存所对应的格子存储，地图重新加载后整体失效
 
     def draw_grid(self, surface, camera_x):
         """
@@ -20,41 +34,25 @@ class MapRenderOperon:
         :param camera_x: 摄像机水平偏移量
         """
         screen_width, _ = surface.get_size()
+        tile_size = self.map_data.tile_size
+        tiles = self.map_data.tiles
         
         # 计算可见的格子范围
-        start_col = int(camera_x // self.map_data.tile_size)
-        end_col = start_col + (screen_width // self.map_data.tile_size) + 2
+        start_col = int(camera_x // tile_size)
+        end_col = start_col + (screen_width // tile_size) + 2
 
-        for x_idx in range(start_col, end_col):
+        # 地图范围外的格子只绘制边框
+        for x_idx in list(range(start_col, min(end_col, 0))) + list(range(max(start_col, tiles.width), end_col)):
             for y in range(self.map_data.map_height):
-                # Map is now a long strip, no horizontal looping
-                map_x = x_idx
-
-                rect = pygame.Rect(
-                    x_idx * self.map_data.tile_size - camera_x,
-                    y * self.map_data.tile_size,
-                    self.map_data.tile_size,
-                    self.map_data.tile_size
-                )
-
-                if not (0 <= map_x < self.map_data.map_width):
-                    # For performance, just draw a simple border for tiles outside the defined map
-                    pygame.draw.rect(surface, (50, 50, 50), rect, 1)
-                    continue
-                
-                tile_type = self.map_data.map_data[y][map_x]
-                color = (50, 50, 50) # 网格颜色
-                fill_color = None
+                rect = pygame.Rect(x_idx * tile_size - camera_x, y * tile_size, tile_size, tile_size)
+                pygame.draw.rect(surface, GRID_COLOR, rect, 1)
 
-                if tile_type == COLLISION:
-                    fill_color = (100, 100, 100) # 填充灰色
-                elif tile_type == NPC:
-                    fill_color = (50, 50, 200)   # 填充蓝色
-
-                if fill_color:
-                    pygame.draw.rect(surface, fill_color, rect)
-                
-                pygame.draw.rect(surface, color, rect, 1) # 绘制边框
+        # 地图范围内的格子层按块整块贴图
+        first_chunk = max(start_col, 0) // CHUNK_WIDTH
+        last_chunk = (min(end_col, tiles.width) - 1) // CHUNK_WIDTH
+        for chunk_index in range(first_chunk, last_chunk + 1):
+            chunk_surface = self._get_chunk_surface(chunk_index)
+            surface.blit(chunk_surface, (math.floor(chunk_index * CHUNK_WIDTH * tile_size - camera_x), 0))
 
         # --- 绘制生成点 ---
         self._draw_spawn_points(surface, camera_x, screen_width)
@@ -65,6 +63,50 @@ class MapRenderOperon:
         # --- 绘制交互点 ---
         self._draw_interact_points(surface, camera_x, screen_width)
 
+    def _get_chunk_surface(self, chunk_index):
+        """
+        获取一个地图块的预渲染格子层，块被编辑过 (版本号变化) 时重新光栅化
+        :param chunk_index: 块号
+        """
+        tiles = self.map_data.tiles
+        if tiles is not self._cached_tiles:
+            self._chunk_surfaces.clear()
+            self._cached_tiles = tiles
+
+        version = tiles.chunk_versions[chunk_index]
+        cached = self._chunk_surfaces.get(chunk_index)
+        if cached is not None and cached[0] == version:
+            self._chunk_surfaces.move_to_end(chunk_index)
+            return cached[1]
+
+        chunk_surface = self._rasterise_chunk(chunk_index)
+        self._chunk_surfaces[chunk_index] = (version, chunk_surface)
+        self._chunk_surfaces.move_to_end(chunk_index)
+        while len(self._chunk_surfaces) > MAX_CACHED_CHUNK_SURFACES:
+            self._chunk_surfaces.popitem(last=False)
+        return chunk_surface
+
+    def _rasterise_chunk(self, chunk_index):
+        """把一个地图块的全部格子绘制到一张 Surface 上"""
+        tiles = self.map_data.tiles
+        tile_size = self.map_data.tile_size
+        x0 = chunk_index * CHUNK_WIDTH
+        columns = min(CHUNK_WIDTH, tiles.width - x0)
+
+        chunk_surface = pygame.Surface((columns * tile_size, tiles.height * tile_size))
+        chunk_surface.fill(CHUNK_COLORKEY)
+        for tile_x, tile_y, tile_type in tiles.tiles_in_rect(x0, 0, x0 + columns, tiles.height):
+            rect = pygame.Rect((tile_x - x0) * tile_size, tile_y * tile_size, tile_size, tile_size)
+            fill_color = TILE_FILL_COLORS.get(tile_type)
+            if fill_color:
+                pygame.draw.rect(chunk_surface, fill_color, rect)
+            pygame.draw.rect(chunk_surface, GRID_COLOR, rect, 1) # 绘制边框
+
+        if pygame.display.get_surface() is not None:
+            chunk_surface = chunk_surface.convert()
+        chunk_surface.set_colorkey(CHUNK_COLORKEY, pygame.RLEACCEL)
+        return chunk_surface
+
     def _draw_spawn_points(self, surface, camera_x, screen_width):
         """绘制敌人生成点"""
         for point in self.map_data.spawn_points:
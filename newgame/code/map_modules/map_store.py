@@ -0,0 +1,69 @@
+import glob
+import hashlib
+import json
+import os
+from .map_binary import MAP_BINARY_EXT
+from code.save_container import SAVE_CONTAINER_EXT, SECTION_MAP, read_sections
+
+# --- 内容寻址地图仓库 ---
+# 基础地图以二进制 (.bmap) 内容的 SHA-256 命名存放在 STORE_DIR 中，HEAD 记录当前基础地图；
+# 每个存档槽的 map 分区记录它使用的基础地图；保存基础地图时各存档槽被重置为空差异，
+# 载入时仍会应用旧存档 map 分区中的差异 (格子、生成点、交互点)
+STORE_DIR = 'map_store'
+HEAD_FILE = os.path.join(STORE_DIR, 'HEAD')
+DIFF_VERSION = 1
+
+
+def blob_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def blob_path(digest):
+    return os.path.join(STORE_DIR, f"{digest}{MAP_BINARY_EXT}")
+
+
+def read_head():
+    """
+    读取当前基础地图的摘要
+    :return: 摘要字符串，仓库为空时返回 None
+    """
+    try:
+        with open(HEAD_FILE, 'r') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def prune_blobs():
+    """删除既不是 HEAD、也没有被任何存档槽差异引用的基础地图"""
+    referenced = {read_head()}
+    for container in glob.glob(f"save_*{SAVE_CONTAINER_EXT}"):
+        try:
+            referenced.add(read_sections(container, [SECTION_MAP]).get(SECTION_MAP, {}).get('base'))
+        except Exception as e:
+            print(f"Keeping all base maps, could not read {container}: {e}")
+            return
+    for diff_file in glob.glob("map_save_*.mdiff"):  # 旧版本单独保存的存档槽差异
+        try:
+            with open(diff_file, 'r') as f:
+                referenced.add(json.load(f).get('base'))
+        except (OSError, ValueError) as e:
+            print(f"Keeping all base maps, could not read {diff_file}: {e}")
+            return
+    for path in glob.glob(os.path.join(STORE_DIR, f"*{MAP_BINARY_EXT}")):
+        digest = os.path.splitext(os.path.basename(path))[0]
+        if digest not in referenced:
+            os.remove(path)
+            print(f"Pruned unused base map {digest[:12]}")
+
+
+def apply_interact_diff(base_points, point_diff):
+    """
+    把交互点差异应用到基础地图的交互点列表上 (保持基础地图中的顺序，新增的排在最后)
+    :return: 新的交互点列表
+    """
+    removed = set(point_diff.get('removed', []))
+    changed = {point['id']: point for point in point_diff.get('changed', [])}
+    points = [changed.pop(point.get('id'), point) for point in base_points if point.get('id') not in removed]
+    points.extend(changed.values())
+    return points
@@ -0,0 +1,104 @@
+class SpatialHash:
+    """
+    均匀网格空间哈希 - 按包围盒把对象登记到覆盖的网格单元中，
+    查询只检查相关单元内的对象，结果按插入顺序返回 (与原列表顺序一致)
+    """
+    def __init__(self, cell_size):
+        """
+        初始化空间哈希
+        :param cell_size: 网格单元边长 (像素)
+        """
+        self.cell_size = cell_size
+        self._cells = {}    # (列, 行) -> {id(对象): 对象}
+        self._entries = {}  # id(对象) -> (插入序号, 对象, 所在单元列表)
+        self._next_seq = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._cells.clear()
+        self._entries.clear()
+        self._next_seq = 0
+
+    def _cell_keys(self, left, top, right, bottom):
+        cell_size = self.cell_size
+        return [(cx, cy)
+                for cx in range(int(left // cell_size), int(right // cell_size) + 1)
+                for cy in range(int(top // cell_size), int(bottom // cell_size) + 1)]
+
+    def insert(self, item, bounds):
+        """
+        登记对象 (已登记的对象会被移到新位置，保留原来的插入顺序)
+        :param item: 任意对象 (按 id 区分，可以是不可哈希的字典)
+        :param bounds: 世界坐标包围盒 (left, top, right, bottom)，边界包含在内
+        """
+        item_id = id(item)
+        entry = self._entries.get(item_id)
+        if entry is not None:
+            seq = entry[0]
+            self.remove(item)
+        else:
+            seq = self._next_seq
+            self._next_seq += 1
+        keys = self._cell_keys(*bounds)
+        for key in keys:
+            self._cells.setdefault(key, {})[item_id] = item
+        self._entries[item_id] = (seq, item, keys)
+
+    def remove(self, item):
+        """
+        注销对象
+        :return: 对象是否曾被登记
+        """
+        entry = self._entries.pop(id(item), None)
+        if entry is None:
+            return False
+        for key in entry[2]:
+            bucket = self._cells[key]
+            del bucket[id(item)]
+            if not bucket:
+                del self._cells[key]
+        return True
+
+    def rebuild(self, items, bounds_func):
+        """
+        按列表顺序重新登记全部对象
+        :param items: 对象列表
+        :param bounds_func: 对象 -> 包围盒的函数
+        """
+        self.clear()
+        for item in items:
+            self.insert(item, bounds_func(item))
+
+    def query_bounds(self, left, top, right, bottom):
+        """
+        查询与包围盒所在网格单元重叠的对象 (粗筛，调用方需自行做精确判断)
+        :return: 按插入顺序排列的对象列表
+        """
+        found = {}
+        cells = self._cells
+        for key in self._cell_keys(left, top, right, bottom):
+            bucket = cells.get(key)
+            if bucket:
+                found.update(bucket)
+        if len(found) > 1:
+            entries = self._entries
+            return sorted(found.values(), key=lambda item: entries[id(item)][0])
+        return list(found.values())
+
+    def query_rect(self, rect):
+        """
+        查询矩形附近的对象
+        :param rect: pygame.Rect (世界坐标)
+        """
+        return self.query_bounds(rect.left, rect.top, rect.right, rect.bottom)
+
+    def query_radius(self, center, radius):
+        """
+        查询圆形区域附近的对象
+        :param center: 圆心 (世界坐标)
+        :param radius: 半径 (像素)
+        """
+        x, y = center
+        return self.query_bounds(x - radius, y - radius, x + radius, y + radius)
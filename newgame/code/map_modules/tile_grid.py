@@ -0,0 +1,288 @@
+from collections import OrderedDict
+
+# --- 分块参数 ---
+CHUNK_SHIFT = 6
+CHUNK_WIDTH = 1 << CHUNK_SHIFT  # 每块 64 列
+CHUNK_MASK = CHUNK_WIDTH - 1
+MAX_RESIDENT_CHUNKS = 32
+
+
+class TileGrid:
+    """
+    紧凑格子存储 - 每个格子占 1 字节，按行优先 (row-major) 存放在 bytearray 中
+    """
+    def __init__(self, width, height, fill=0, cells=None):
+        """
+        初始化格子存储
+        :param width: 宽度 (格子数)
+        :param height: 高度 (格子数)
+        :param fill: 初始格子类型
+        :param cells: 可选的现成缓冲区 (长度必须为 width * height)
+        """
+        self.width = width
+        self.height = height
+        self.stride = width  # 相邻两行在缓冲区中的偏移
+        if cells is None:
+            cells = bytearray([fill]) * (width * height)
+        elif len(cells) != width * height:
+            raise ValueError(f"Tile buffer has {len(cells)} cells, expected {width * height}")
+        self.cells = cells
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        从旧的二维列表 (map_layout) 构建格子存储
+        :param rows: 行列表，每行是格子类型整数列表
+        """
+        height = len(rows)
+        width = len(rows[0]) if height > 0 else 0
+        cells = bytearray(width * height)
+        for y, row in enumerate(rows):
+            cells[y * width:(y + 1) * width] = bytes(row)
+        return cls(width, height, cells=cells)
+
+    def to_rows(self):
+        """转换为二维列表，用于 JSON 保存"""
+        stride = self.stride
+        return [list(self.cells[y * stride:(y + 1) * stride]) for y in range(self.height)]
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def get(self, x, y):
+        """
+        标量快速路径 - 读取单个格子
+        :return: 格子类型，越界时返回 None
+        """
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.cells[y * self.stride + x]
+        return None
+
+    def set(self, x, y, tile_type):
+        """
+        写入单个格子
+        :return: 是否写入成功 (越界时返回 False)
+        """
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.cells[y * self.stride + x] = tile_type
+            return True
+        return False
+
+    def column_contains(self, x, y0, y1, tile_type):
+        """
+        碰撞查询 - 第 x 列的 [y0, y1) 行中是否有 tile_type 格子 (地图外视为没有)，直接按下标读取缓冲区
+        """
+        if not 0 <= x < self.width:
+            return False
+        cells = self.cells
+        stride = self.stride
+        for offset in range(max(y0, 0) * stride + x, min(y1, self.height) * stride, stride):
+            if cells[offset] == tile_type:
+                return True
+        return False
+
+    def row_contains(self, y, x0, x1, tile_type):
+        """
+        碰撞查询 - 第 y 行的 [x0, x1) 列中是否有 tile_type 格子 (地图外视为没有)
+        """
+        if not 0 <= y < self.height:
+            return False
+        x0 = max(x0, 0)
+        x1 = min(x1, self.width)
+        row_start = y * self.stride
+        return x0 < x1 and self.cells.find(tile_type, row_start + x0, row_start + x1) != -1
+
+    def tiles_in_rect(self, x0, y0, x1, y1):
+        """
+        批量查询矩形区域 [x0, x1) x [y0, y1) 内的格子，区域会被裁剪到地图范围内
+        :return: 逐个产出 (x, y, 格子类型)
+        """
+        x0 = max(x0, 0)
+        y0 = max(y0, 0)
+        x1 = min(x1, self.width)
+        y1 = min(y1, self.height)
+        cells = self.cells
+        stride = self.stride
+        for y in range(y0, y1):
+            row_start = y * stride
+            for x in range(x0, x1):
+                yield x, y, cells[row_start + x]
+
+
+class TileChunk:
+    """一个固定列宽的地图块，块内格子同样按行优先存放"""
+    __slots__ = ('index', 'x0', 'width', 'cells', 'dirty')
+
+    def __init__(self, index, x0, width, cells):
+        self.index = index
+        self.x0 = x0          # 块内第一列在地图中的列号
+        self.width = width    # 有效列数 (地图最后一块可能不足 CHUNK_WIDTH)
+        self.cells = cells
+        self.dirty = False    # 是否有尚未写回后备存储的修改
+
+
+class ChunkedTileGrid:
+    """
+    分块格子存储 - 地图按 CHUNK_WIDTH 列切分为块，块在被访问时才从后备存储复制进内存，
+    常驻块数超过上限时按 LRU 淘汰 (脏块先写回)
+    """
+    def __init__(self, source, max_chunks=MAX_RESIDENT_CHUNKS):
+        """
+        初始化分块格子存储
+        :param source: 后备 TileGrid (通常映射自 .bmap 文件)
+        :param max_chunks: 最多常驻内存的块数
+        """
+        self.source = source
+        self.width = source.width
+        self.height = source.height
+        self.max_chunks = max(2, max_chunks)
+        self.chunk_count = (self.width + CHUNK_WIDTH - 1) >> CHUNK_SHIFT
+        self._chunks = OrderedDict()  # 块号 -> TileChunk，按最近使用顺序排列
+        # 每块的修改版本号，格子内容变化时递增，供渲染/碰撞缓存判断是否过期
+        self.chunk_versions = [0] * self.chunk_count
+        # 最近一次访问的块，连续访问同一块时跳过字典查找和 LRU 更新
+        self._last_index = -1
+        self._last_chunk = None
+
+    def _chunk(self, index):
+        """获取块，必要时从后备存储载入"""
+        if index == self._last_index:
+            return self._last_chunk
+        chunk = self._chunks.get(index)
+        if chunk is None:
+            chunk = self._load_chunk(index)
+        else:
+            self._chunks.move_to_end(index)
+        self._last_index = index
+        self._last_chunk = chunk
+        return chunk
+
+    def _load_chunk(self, index):
+        x0 = index << CHUNK_SHIFT
+        width = min(CHUNK_WIDTH, self.width - x0)
+        cells = bytearray(CHUNK_WIDTH * self.height)
+        source_cells = self.source.cells
+        stride = self.source.stride
+        for y in range(self.height):
+            start = y * stride + x0
+            cells[y * CHUNK_WIDTH:y * CHUNK_WIDTH + width] = source_cells[start:start + width]
+
+        chunk = TileChunk(index, x0, width, cells)
+        self._chunks[index] = chunk
+        while len(self._chunks) > self.max_chunks:
+            _, evicted = self._chunks.popitem(last=False)
+            if evicted.dirty:
+                self._write_back(evicted)
+        return chunk
+
+    def _write_back(self, chunk):
+        source_cells = self.source.cells
+        stride = self.source.stride
+        width = chunk.width
+        for y in range(self.height):
+            start = y * stride + chunk.x0
+            source_cells[start:start + width] = chunk.cells[y * CHUNK_WIDTH:y * CHUNK_WIDTH + width]
+        chunk.dirty = False
+
+    def flush(self):
+        """把所有脏块写回后备存储 (保存地图前调用)"""
+        for chunk in self._chunks.values():
+            if chunk.dirty:
+                self._write_back(chunk)
+
+    def prefetch(self, x0, x1):
+        """
+        预先载入覆盖列范围 [x0, x1) 的所有块
+        :param x0: 起始列
+        :param x1: 结束列 (不含)
+        """
+        first = max(x0, 0) >> CHUNK_SHIFT
+        last = (min(x1, self.width) - 1) >> CHUNK_SHIFT
+        for index in range(first, last + 1):
+            self._chunk(index)
+
+    @property
+    def resident_chunks(self):
+        return len(self._chunks)
+
+    def to_rows(self):
+        """转换为二维列表，用于 JSON 保存"""
+        self.flush()
+        return self.source.to_rows()
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def get(self, x, y):
+        """
+        标量快速路径 - 读取单个格子 (所在块不在内存中时自动载入)
+        :return: 格子类型，越界时返回 None
+        """
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self._chunk(x >> CHUNK_SHIFT).cells[y * CHUNK_WIDTH + (x & CHUNK_MASK)]
+        return None
+
+    def set(self, x, y, tile_type):
+        """
+        写入单个格子
+        :return: 是否写入成功 (越界时返回 False)
+        """
+        if 0 <= x < self.width and 0 <= y < self.height:
+            index = x >> CHUNK_SHIFT
+            chunk = self._chunk(index)
+            offset = y * CHUNK_WIDTH + (x & CHUNK_MASK)
+            if chunk.cells[offset] != tile_type:
+                chunk.cells[offset] = tile_type
+                chunk.dirty = True
+                self.chunk_versions[index] += 1
+            return True
+        return False
+
+    def column_contains(self, x, y0, y1, tile_type):
+        """
+        碰撞查询 - 第 x 列的 [y0, y1) 行中是否有 tile_type 格子 (地图外视为没有)，直接按下标读取块缓冲区
+        """
+        if not 0 <= x < self.width:
+            return False
+        cells = self._chunk(x >> CHUNK_SHIFT).cells
+        for offset in range(max(y0, 0) * CHUNK_WIDTH + (x & CHUNK_MASK), min(y1, self.height) * CHUNK_WIDTH, CHUNK_WIDTH):
+            if cells[offset] == tile_type:
+                return True
+        return False
+
+    def row_contains(self, y, x0, x1, tile_type):
+        """
+        碰撞查询 - 第 y 行的 [x0, x1) 列中是否有 tile_type 格子 (地图外视为没有)，逐块在缓冲区中查找
+        """
+        if not 0 <= y < self.height:
+            return False
+        x = max(x0, 0)
+        x1 = min(x1, self.width)
+        while x < x1:
+            chunk = self._chunk(x >> CHUNK_SHIFT)
+            segment_end = min(x1, chunk.x0 + CHUNK_WIDTH)
+            row_start = y * CHUNK_WIDTH - chunk.x0
+            if chunk.cells.find(tile_type, row_start + x, row_start + segment_end) != -1:
+                return True
+            x = segment_end
+        return False
+
+    def tiles_in_rect(self, x0, y0, x1, y1):
+        """
+        批量查询矩形区域 [x0, x1) x [y0, y1) 内的格子，区域会被裁剪到地图范围内
+        :return: 逐块、逐行产出 (x, y, 格子类型)
+        """
+        x0 = max(x0, 0)
+        y0 = max(y0, 0)
+        x1 = min(x1, self.width)
+        y1 = min(y1, self.height)
+        x = x0
+        while x < x1:
+            chunk = self._chunk(x >> CHUNK_SHIFT)
+            cells = chunk.cells
+            segment_end = min(x1, chunk.x0 + CHUNK_WIDTH)
+            for y in range(y0, y1):
+                row_start = y * CHUNK_WIDTH - chunk.x0
+                for tile_x in range(x, segment_end):
+                    yield tile_x, y, cells[row_start + tile_x]
+            x = segment_end
@@ -1,5 +1,6 @@
 import pygame
 import json
+from code.sim_clock import sim_clock
 
 # --- 地图元素常量 ---
 EMPTY = 0
@@ -548,7 +549,7 @@ class MapOperon:
                 if interaction_found:
                     # Mark as collected
                     point['is_collected'] = True
-                    point['collection_time'] = pygame.time.get_ticks()
+                    point['collection_time'] = sim_clock.now
                     
                     # Calculate group size (1 for single points, actual size for groups)
                     group_size = 1
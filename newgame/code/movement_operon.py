@@ -11,6 +11,11 @@ ROLL_DURATION = 300 # in milliseconds
 # Animation imports
 from code.simple_animation import SimpleFrameAnimation
 from code.shooting_animation import ShootingAnimation
+from code.save_service import save_service
+from code.save_container import SECTION_PLAYER, container_path, read_section
+from code.save_index import save_index
+from code.sim_clock import sim_clock
+from code.physics import pixel, sweep_aabb, move_x, move_y
 
 class Player:
     """Represents the player character, now with rolling capabilities."""
@@ -44,6 +49,7 @@ class Player:
         self.scroll_collected = 0  # Track total scrolls collected
         self.currency = 0  # Player's currency
         self.upgrade_level = 1  # Current upgrade level
+        self.play_time = 0.0  # Total time played in this save, in seconds
         self.upgrade_cost = 500  # Initial upgrade cost (increases by 500 each time)
         self.can_upgrade = False  # Flag to show upgrade option
         self.notifications = []  # Store active notifications
@@ -107,7 +113,7 @@ class Player:
             # We can add a check here to disable roll in edit mode if needed
             self.is_rolling = True
             self.is_invincible = True
-            self.roll_timer = pygame.time.get_ticks()
+            self.roll_timer = sim_clock.now
             self.velocity.x = self.roll_direction * ROLL_SPEED
 
     def update_state(self):
@@ -130,40 +136,34 @@ class Player:
         # Update shooting animation
         self.update_shooting_animation()
 
-    def update_physics(self, platforms):
+    def update_physics(self, collision_sweep):
+        """
+        Move by the current velocity with swept collision, so no speed multiplier can tunnel through walls.
+        :param collision_sweep: function(x, y, w, h, dx, dy) returning (time of impact, normal x, normal y)
+        """
         # Apply gravity only when not rolling
         if not self.is_rolling:
             self.velocity.y += GRAVITY
             if self.velocity.y > 10: self.velocity.y = 10
 
         # --- Horizontal Collision ---
-        self.rect.x += self.velocity.x
-        for platform in platforms:
-            if self.rect.colliderect(platform):
-                if self.velocity.x > 0: # Moving right
-                    self.rect.right = platform.left
-                elif self.velocity.x < 0: # Moving left
-                    self.rect.left = platform.right
+        dx = pixel(self.rect.x + self.velocity.x) - self.rect.x
+        move_x(self.rect, dx, collision_sweep)
 
         # --- Vertical Collision ---
-        self.rect.y += self.velocity.y
+        dy = pixel(self.rect.y + self.velocity.y) - self.rect.y
         self.on_ground = False
-        for platform in platforms:
-            if self.rect.colliderect(platform):
-                if self.velocity.y > 0: # Moving down
-                    self.rect.bottom = platform.top
-                    self.velocity.y = 0
-                    self.on_ground = True
-                elif self.velocity.y < 0: # Moving up
-                    self.rect.top = platform.bottom
-                    self.velocity.y = 0
+        normal_y = move_y(self.rect, dy, collision_sweep)
+        if normal_y:
+            self.velocity.y = 0
+            self.on_ground = normal_y < 0 # Landed on top of something
 
         # Update visual rectangle to match collision rectangle
         self.update_visual_rect()
 
     def _update_roll_state(self):
         if self.is_rolling:
-            if pygame.time.get_ticks() - self.roll_timer > ROLL_DURATION:
+            if sim_clock.now - self.roll_timer > ROLL_DURATION:
                 self.is_rolling = False
                 self.is_invincible = False
                 self.velocity.x = 0
@@ -200,7 +200,7 @@ class Player:
         
         notification = {
             'text': f"+{display_name} +{percent_increase:.0f}% (Total: +{total_percent:.0f}%)",
-            'start_time': pygame.time.get_ticks(),
+            'start_time': sim_clock.now,
             'duration': 4000,  # Show for 4 seconds
             'color': {
                 'speed': (100, 200, 255),    # Light blue
@@ -257,7 +257,7 @@ class Player:
             
             notification = {
                 'text': f"{display_name} 升级 +{value:.2f}! (总计: +{total_percent:.0f}%)",
-                'start_time': pygame.time.get_ticks(),
+                'start_time': sim_clock.now,
                 'duration': 4000,  # Show for 4 seconds
                 'color': {
                     'speed': (100, 200, 255),    # Light blue
@@ -269,66 +269,44 @@ class Player:
             
             print(f"Upgraded {attribute_type} by {value:.2f} (total: {self.permanent_upgrades[attribute_type]:.2f}x)")
     
-    def save_currency(self, save_slot=None, weapon_operon=None):
-        """Save player currency to file."""
-        import json
+    def get_save_data(self, weapon_operon=None):
+        """Snapshot of the player's persistent state (the save container's player section)."""
         save_data = {
             'currency': self.currency,
-            'permanent_upgrades': self.permanent_upgrades,
+            'permanent_upgrades': dict(self.permanent_upgrades),
             'upgrade_level': self.upgrade_level,
             'upgrade_cost': self.upgrade_cost,
             'position': {
                 'x': self.rect.x,
                 'y': self.rect.y
             },
-            'scroll_collected': self.scroll_collected
+            'scroll_collected': self.scroll_collected,
+            'play_time': self.play_time
         }
         
         # Save weapon data if weapon_operon is provided
         if weapon_operon:
             save_data['weapons'] = weapon_operon.get_weapon_data()
-        
-        # Determine filename based on save slot
-        filename = f'save_{save_slot}.json' if save_slot is not None else 'player_save.json'
-        try:
-            with open(filename, 'w') as f:
-                json.dump(save_data, f)
-            print(f"Saved player data to {filename}: currency={self.currency}, pos=({self.rect.x}, {self.rect.y})")
-        except Exception as e:
-            print(f"Failed to save currency: {e}")
+        return save_data
+
+    def save_currency(self, save_slot=None, weapon_operon=None):
+        """Save player currency to the slot's save container (written in the background)."""
+        filename = container_path(save_slot)
+        save_data = self.get_save_data(weapon_operon)
+        save_service.save_sections(filename, {SECTION_PLAYER: save_data},
+                                   f"Saved player data to {filename}: currency={self.currency}, pos=({self.rect.x}, {self.rect.y})")
+        if save_slot is not None:
+            save_index.record(save_slot, save_data)
     
     def load_currency(self, save_slot=None, weapon_operon=None):
-        """Load player currency from file."""
-        import json
-        # Determine filename based on save slot
-        filename = f'save_{save_slot}.json' if save_slot is not None else 'player_save.json'
+        """Load player currency from the slot's save container."""
+        save_service.flush()
+        filename = container_path(save_slot)
         try:
-            with open(filename, 'r') as f:
-                save_data = json.load(f)
-            self.currency = save_data.get('currency', 0)
-            
-            # Load upgrade system data
-            self.upgrade_level = save_data.get('upgrade_level', 1)
-            self.upgrade_cost = save_data.get('upgrade_cost', 500)
-            self.scroll_collected = save_data.get('scroll_collected', 0)
-            
-            # Load permanent upgrades if available
-            if 'permanent_upgrades' in save_data:
-                self.permanent_upgrades.update(save_data['permanent_upgrades'])
-            
-            # Load player position if available
-            if 'position' in save_data:
-                pos = save_data['position']
-                self.rect.x = pos.get('x', 100)
-                self.rect.y = pos.get('y', 500)
-            
-            # Load weapon data if available and weapon_operon is provided
-            if 'weapons' in save_data and weapon_operon:
-                weapon_operon.load_weapon_data(save_data['weapons'])
-            
-            # Check if upgrade is available after loading
-            self.check_upgrade_available()
-            
+            save_data = read_section(save_slot, SECTION_PLAYER)
+            if save_data is None:
+                raise FileNotFoundError(filename)
+            self.apply_save_data(save_data, weapon_operon)
             print(f"Loaded player data from {filename}: currency={self.currency}, pos=({self.rect.x}, {self.rect.y})")
             return True
         except FileNotFoundError:
@@ -338,9 +316,36 @@ class Player:
             print(f"Failed to load currency: {e}")
             return False
 
+    def apply_save_data(self, save_data, weapon_operon=None):
+        """Restore the player's persistent state from a player section snapshot."""
+        self.currency = save_data.get('currency', 0)
+        
+        # Load upgrade system data
+        self.upgrade_level = save_data.get('upgrade_level', 1)
+        self.upgrade_cost = save_data.get('upgrade_cost', 500)
+        self.scroll_collected = save_data.get('scroll_collected', 0)
+        self.play_time = save_data.get('play_time', 0.0)
+        
+        # Load permanent upgrades if available
+        if 'permanent_upgrades' in save_data:
+            self.permanent_upgrades.update(save_data['permanent_upgrades'])
+        
+        # Load player position if available
+        if 'position' in save_data:
+            pos = save_data['position']
+            self.rect.x = pos.get('x', 100)
+            self.rect.y = pos.get('y', 500)
+        
+        # Load weapon data if available and weapon_operon is provided
+        if 'weapons' in save_data and weapon_operon:
+            weapon_operon.load_weapon_data(save_data['weapons'])
+        
+        # Check if upgrade is available after loading
+        self.check_upgrade_available()
+
     def update_notifications(self):
         """Update and remove expired notifications."""
-        current_time = pygame.time.get_ticks()
+        current_time = sim_clock.now
         self.notifications = [
             notif for notif in self.notifications 
             if current_time - notif['start_time'] < notif['duration']
@@ -362,14 +367,14 @@ class Player:
         """Trigger death state and animation"""
         if not self.is_dead:
             self.is_dead = True
-            self.death_timer = pygame.time.get_ticks()
+            self.death_timer = sim_clock.now
             self.death_animation_progress = 0
             self.velocity = pygame.Vector2(0, 0)
 
     def update_death_state(self):
         """Update death animation state"""
         if self.is_dead:
-            current_time = pygame.time.get_ticks()
+            current_time = sim_clock.now
             elapsed = current_time - self.death_timer
             self.death_animation_progress = min(1.0, elapsed / self.death_duration)
 
@@ -494,33 +499,22 @@ class MovementOperon:
                     self.interact_point_operon.toggle_door_at_position(player_world_pos)
         
         # Use map for collision detection
-        self.player.update_physics(self.get_collision_rects())
+        self.player.update_physics(self.sweep_collisions)
 
-    def get_collision_rects(self):
-        """Get all collision tiles from the map around the player."""
+    def sweep_collisions(self, x, y, w, h, dx, dy):
+        """Resolve moving the box (x, y, w, h) by (dx, dy) against collision tiles and closed doors, without building rect lists."""
         if not self.map_operon:
-            return self.platforms # Fallback to default platform
+            return sweep_aabb(x, y, w, h, dx, dy, self.platforms) # Fallback to default platform
         
-        collision_rects = []
-        player_gx = int(self.player.rect.centerx // self.map_operon.tile_size)
-        player_gy = int(self.player.rect.centery // self.map_operon.tile_size)
-
-        # Get tile collision rects
-        for x_offset in range(-2, 3):
-            for y_offset in range(-2, 3):
-                world_x = (player_gx + x_offset) * self.map_operon.tile_size
-                world_y = (player_gy + y_offset) * self.map_operon.tile_size
-                
-                tile_type = self.map_operon.get_tile(world_x, world_y)
-                if tile_type == 1: # COLLISION tile
-                    collision_rects.append(pygame.Rect(world_x, world_y, self.map_operon.tile_size, self.map_operon.tile_size))
+        hit = self.map_operon.sweep_solid(x, y, w, h, dx, dy)
         
-        # Get door collision rects from the interact point operon if available
-        if self.interact_point_operon:
-            door_rects = self.interact_point_operon.get_door_collision_rects()
-            collision_rects.extend(door_rects)
+        # Closed doors only need checking up to the first tile hit
+        if self.interact_point_operon and hit[0] > 0:
+            door_hit = self.interact_point_operon.sweep_doors(x, y, w, h, dx, dy, hit[0])
+            if door_hit[1] or door_hit[2]:
+                hit = door_hit
         
-        return collision_rects
+        return hit
 
     def respawn_player(self, spawn_x=100, spawn_y=500):
         """Respawn player at specified position"""
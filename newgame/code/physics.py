@@ -0,0 +1,239 @@
+import math
+
+# --- 连续碰撞检测 ---
+# 扫掠 AABB: 把移动的矩形沿位移方向扫过，求最先碰到的静止矩形 (或碰撞格) 的碰撞时刻和法线，
+# 每步只做一次求解，速度多大都不会穿过薄墙。只读取坐标，不创建新的 Rect 或候选列表。
+# 玩家、敌人按先水平后垂直分轴移动 (move_x / move_y)，子弹按线段逐格遍历 (trace_tiles)。
+# 碰撞格直接从格子平面查询 (sweep_tiles)，取代了原先按地图块贪心合并的碰撞网格 (CollisionMesh):
+# 查询本身不创建矩形，编辑格子后立即生效 (没有需要重新编译的缓存)，分轴扫掠只检查前沿将要进入的列 (行)，
+# 贴着地面走时相邻格子之间的接缝不会卡住
+
+
+def pixel(value):
+    """与给 pygame.Rect 坐标赋浮点数时相同的取整 (四舍五入，.5 远离零)"""
+    return int(value + 0.5) if value >= 0 else -int(0.5 - value)
+
+
+def _entry(x, y, right, bottom, dx, dy, left, top, box_right, box_bottom):
+    """
+    移动矩形与一个静止矩形的进入时刻 (分离轴)
+    :return: (进入时刻, 法线 x, 法线 y)；不会碰到、起始时已重叠或只贴边移动时返回 None
+    """
+    if dx > 0:
+        x_entry = (left - right) / dx
+        x_exit = (box_right - x) / dx
+    elif dx < 0:
+        x_entry = (box_right - x) / dx
+        x_exit = (left - right) / dx
+    elif right <= left or x >= box_right:
+        return None
+    else:
+        x_entry, x_exit = -math.inf, math.inf
+
+    if dy > 0:
+        y_entry = (top - bottom) / dy
+        y_exit = (box_bottom - y) / dy
+    elif dy < 0:
+        y_entry = (box_bottom - y) / dy
+        y_exit = (top - bottom) / dy
+    elif bottom <= top or y >= box_bottom:
+        return None
+    else:
+        y_entry, y_exit = -math.inf, math.inf
+
+    if x_entry > y_entry:
+        if x_entry < 0 or x_entry >= min(x_exit, y_exit):
+            return None
+        return x_entry, (-1 if dx > 0 else 1), 0
+    if y_entry < 0 or y_entry >= min(x_exit, y_exit):
+        return None
+    return y_entry, 0, (-1 if dy > 0 else 1)
+
+
+def sweep_aabb(x, y, w, h, dx, dy, boxes, max_toi=1.0):
+    """
+    求矩形 (x, y, w, h) 沿 (dx, dy) 移动时最先碰到的静止矩形。
+    起始时已经重叠的矩形被忽略 (可以从中走出)，只贴着边移动不算碰撞
+    :param boxes: 可迭代的静止矩形 (pygame.Rect)
+    :param max_toi: 只找早于该时刻的碰撞
+    :return: (碰撞时刻 0..max_toi, 法线 x, 法线 y)，没有碰撞时为 (max_toi, 0, 0)
+    """
+    result = (max_toi, 0, 0)
+    right = x + w
+    bottom = y + h
+    for box in boxes:
+        hit = _entry(x, y, right, bottom, dx, dy, box.left, box.top, box.right, box.bottom)
+        if hit is not None and hit[0] < result[0]:
+            result = hit
+    return result
+
+
+def sweep_tiles(tiles, tile_size, solid_tile, x, y, w, h, dx, dy, max_toi=1.0):
+    """
+    把矩形的移动直接与格子平面求解，不创建格子矩形或候选列表:
+    分轴移动时按移动方向逐列 (逐行) 检查前沿将要进入的格子，第一个含实心格子的列 (行) 就是碰撞面；
+    斜向移动逐个检查扫过范围内的实心格子 (子弹用 trace_tiles 逐格遍历)。起始时已重叠的格子被忽略，与 sweep_aabb 一致
+    :param tiles: TileGrid / ChunkedTileGrid
+    :param solid_tile: 参与碰撞的格子类型
+    :return: (碰撞时刻 0..max_toi, 法线 x, 法线 y)，没有碰撞时为 (max_toi, 0, 0)
+    """
+    if dy == 0:
+        if dx == 0:
+            return max_toi, 0, 0
+        first_row = int(y // tile_size)
+        end_row = int(-(-(y + h) // tile_size))
+        if dx > 0:
+            leading = x + w
+            for column in range(int(-(-leading // tile_size)), int(-(-(leading + dx) // tile_size))):
+                if tiles.column_contains(column, first_row, end_row, solid_tile):
+                    toi = (column * tile_size - leading) / dx
+                    return (toi, -1, 0) if toi < max_toi else (max_toi, 0, 0)
+        else:
+            for column in range(int(x // tile_size) - 1, int((x + dx) // tile_size) - 1, -1):
+                if tiles.column_contains(column, first_row, end_row, solid_tile):
+                    toi = ((column + 1) * tile_size - x) / dx
+                    return (toi, 1, 0) if toi < max_toi else (max_toi, 0, 0)
+        return max_toi, 0, 0
+
+    if dx == 0:
+        first_column = int(x // tile_size)
+        end_column = int(-(-(x + w) // tile_size))
+        if dy > 0:
+            leading = y + h
+            for row in range(int(-(-leading // tile_size)), int(-(-(leading + dy) // tile_size))):
+                if tiles.row_contains(row, first_column, end_column, solid_tile):
+                    toi = (row * tile_size - leading) / dy
+                    return (toi, 0, -1) if toi < max_toi else (max_toi, 0, 0)
+        else:
+            for row in range(int(y // tile_size) - 1, int((y + dy) // tile_size) - 1, -1):
+                if tiles.row_contains(row, first_column, end_column, solid_tile):
+                    toi = ((row + 1) * tile_size - y) / dy
+                    return (toi, 0, 1) if toi < max_toi else (max_toi, 0, 0)
+        return max_toi, 0, 0
+
+    # 斜向移动: 扫过范围内的每个实心格子做一次分离轴求解
+    result = (max_toi, 0, 0)
+    right = x + w
+    bottom = y + h
+    end_column = int(-(-max(right, right + dx) // tile_size))
+    for row in range(int(min(y, y + dy) // tile_size), int(-(-max(bottom, bottom + dy) // tile_size))):
+        top = row * tile_size
+        for column in range(int(min(x, x + dx) // tile_size), end_column):
+            if tiles.get(column, row) != solid_tile:
+                continue
+            left = column * tile_size
+            hit = _entry(x, y, right, bottom, dx, dy, left, top, left + tile_size, top + tile_size)
+            if hit is not None and hit[0] < result[0]:
+                result = hit
+    return result
+
+
+def trace_tiles(tiles, tile_size, solid_tile, x, y, dx, dy, max_toi=1.0):
+    """
+    点沿线段 (x, y) -> (x + dx, y + dy) 穿过格子平面 (Amanatides-Woo DDA):
+    从起点所在的格子出发，每次跨过最近的一条格线进入相邻格子，只读取线段真正穿过的格子。
+    起点所在格子被忽略，斜穿格点时两侧的格子只是贴角经过，判定与 sweep_tiles 传入 0 尺寸时相同；
+    正好沿格线水平 (竖直) 移动时格线两侧的格子都会碰到，任何一侧是实心格子都算撞上。
+    不用 x + dx、y + dy 求扫描范围，终点坐标舍入到格线上时也不会漏掉格子
+    :return: (碰撞时刻 0..max_toi, 法线 x, 法线 y)，没有碰撞时为 (max_toi, 0, 0)
+    """
+    side_column = side_row = None  # 沿格线移动时格线另一侧的列 (行)
+    # 起点在格线上时，按移动方向取线后面的格子 (时刻 0 就进入它)
+    if dx > 0:
+        column = int(x // tile_size)
+        column_entry = column * tile_size == x
+    elif dx < 0:
+        column = int(-(-x // tile_size)) - 1
+        column_entry = (column + 1) * tile_size == x
+    else:
+        column = int(x // tile_size)
+        column_entry = False
+        if column * tile_size == x:
+            side_column = column - 1  # 沿竖直格线移动
+    if dy > 0:
+        row = int(y // tile_size)
+        row_entry = row * tile_size == y
+    elif dy < 0:
+        row = int(-(-y // tile_size)) - 1
+        row_entry = (row + 1) * tile_size == y
+    elif dx == 0:
+        return max_toi, 0, 0  # 不动
+    else:
+        row = int(y // tile_size)
+        row_entry = False
+        if row * tile_size == y:
+            side_row = row - 1  # 沿水平格线移动
+
+    if (column_entry or row_entry) and (
+            tiles.get(column, row) == solid_tile
+            or (side_column is not None and tiles.get(side_column, row) == solid_tile)
+            or (side_row is not None and tiles.get(column, side_row) == solid_tile)):
+        # 与 _entry 相同: 同时进入时取 y 法线
+        if row_entry:
+            return 0.0, 0, (-1 if dy > 0 else 1)
+        return 0.0, (-1 if dx > 0 else 1), 0
+
+    step_x = 1 if dx > 0 else -1
+    step_y = 1 if dy > 0 else -1
+    while True:
+        # 到下一条竖直/水平格线的时刻，按格线坐标直接计算 (不累加，与 _entry 的算式一致)
+        if dx > 0:
+            next_x = ((column + 1) * tile_size - x) / dx
+        elif dx < 0:
+            next_x = (column * tile_size - x) / dx
+        else:
+            next_x = math.inf
+        if dy > 0:
+            next_y = ((row + 1) * tile_size - y) / dy
+        elif dy < 0:
+            next_y = (row * tile_size - y) / dy
+        else:
+            next_y = math.inf
+
+        if next_x < next_y:
+            toi = next_x
+            column += step_x
+            normal_x, normal_y = -step_x, 0
+        else:
+            # 正好穿过格点时斜向进入对角的格子，两侧的格子只是贴角经过
+            toi = next_y
+            if next_x == next_y:
+                column += step_x
+            row += step_y
+            normal_x, normal_y = 0, -step_y
+        if toi >= max_toi:
+            return max_toi, 0, 0
+        if (tiles.get(column, row) == solid_tile
+                or (side_column is not None and tiles.get(side_column, row) == solid_tile)
+                or (side_row is not None and tiles.get(column, side_row) == solid_tile)):
+            return toi, normal_x, normal_y
+
+
+def move_x(rect, dx, sweep):
+    """
+    水平移动矩形，撞上时停在碰撞面上
+    :param rect: 移动的 pygame.Rect (原地修改)
+    :param dx: 位移 (整数像素)
+    :param sweep: 碰撞求解函数 sweep(x, y, w, h, dx, dy)，返回 (碰撞时刻, 法线 x, 法线 y)
+    :return: 碰撞法线 x (撞上右侧为 -1，左侧为 1)，没有碰撞时为 0
+    """
+    if dx == 0:
+        return 0
+    toi, normal_x, _ = sweep(rect.x, rect.y, rect.width, rect.height, dx, 0)
+    rect.x += pixel(dx * toi)
+    return normal_x
+
+
+def move_y(rect, dy, sweep):
+    """
+    垂直移动矩形，撞上时停在碰撞面上
+    :param rect: 移动的 pygame.Rect (原地修改)
+    :param dy: 位移 (整数像素)
+    :param sweep: 碰撞求解函数，同 move_x
+    :return: 碰撞法线 y (落到地面为 -1，撞到顶部为 1)，没有碰撞时为 0
+    """
+    if dy == 0:
+        return 0
+    toi, _, normal_y = sweep(rect.x, rect.y, rect.width, rect.height, 0, dy)
+    rect.y += pixel(dy * toi)
+    return normal_y
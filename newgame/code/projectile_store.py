@@ -0,0 +1,218 @@
+import math
+from itertools import compress, repeat
+from operator import add, and_, gt, le, lt, sub
+import pygame
+from code.physics import pixel
+
+# --- 子弹存储 (结构数组) ---
+# 所有子弹的状态存放在平行的列表中 (位置、速度、伤害、发射者、图像、存活标记)，每个模拟步整体推进:
+# 位置按列一次性相加；每颗子弹记下下一次可能越过格子边界的步数，只有到期的子弹才沿这一步的线段逐格遍历碰撞格 (DDA)；
+# 死亡的子弹按存活标记统一压缩掉。
+# 不为每颗子弹创建 Sprite、Vector2 或 Rect；碰撞矩形由位置和图像尺寸直接算出 (与 Rect.center 取整一致)
+PROJECTILE_ROTATIONS = 64  # 每种样式缓存的旋转角度数
+PROJECTILE_STYLES = {
+    'arrow': ((15, 5), (200, 200, 200)),  # 样式名 -> (尺寸, 颜色)
+}
+DEFAULT_PROJECTILE_STYLE = 'arrow'
+RIGHT = pygame.Vector2(1, 0)
+STEP_MARGIN = 1e-6  # 估算留在格子内的步数时扣除的余量 (抵消逐步累加位置的浮点误差)
+NEVER = 1 << 62  # 不动的子弹永远不需要再遍历
+
+
+class ProjectileSpriteCache:
+    """子弹图像缓存 - 每种样式按角度分桶，第一次用到时才旋转"""
+    def __init__(self, rotations=PROJECTILE_ROTATIONS):
+        self.rotations = rotations
+        self._sprites = {}  # 样式 -> 各角度的图像列表 (未用到的为 None)
+        self._bases = {}
+
+    def get(self, style, angle):
+        """
+        取旋转到最近角度桶的子弹图像
+        :param style: PROJECTILE_STYLES 中的样式名
+        :param angle: 旋转角度 (逆时针，与 pygame.transform.rotate 相同)
+        """
+        sprites = self._sprites.get(style)
+        if sprites is None:
+            size, color = PROJECTILE_STYLES[style]
+            base = pygame.Surface(size, pygame.SRCALPHA)
+            base.fill(color)
+            self._bases[style] = base
+            sprites = self._sprites[style] = [None] * self.rotations
+        bucket = round(angle * self.rotations / 360) % self.rotations
+        sprite = sprites[bucket]
+        if sprite is None:
+            sprite = sprites[bucket] = pygame.transform.rotate(self._bases[style], bucket * 360 / self.rotations)
+        return sprite
+
+
+# 全局子弹图像缓存 (图像与游戏状态无关，所有 CombatOperon 共用)
+projectile_sprites = ProjectileSpriteCache()
+
+
+def steps_inside_tile(x, y, vx, vy, tile_size):
+    """
+    从 (x, y) 出发每步移动 (vx, vy)，肯定不会离开当前格子的步数 (偏保守)。
+    起点在格子边上时为 0 (下一步就要遍历)
+    """
+    column_offset = x % tile_size
+    row_offset = y % tile_size
+    if column_offset == 0 or row_offset == 0:
+        return 0
+    steps = math.inf
+    if vx > 0:
+        steps = (tile_size - column_offset) / vx
+    elif vx < 0:
+        steps = column_offset / -vx
+    if vy > 0:
+        steps = min(steps, (tile_size - row_offset) / vy)
+    elif vy < 0:
+        steps = min(steps, row_offset / -vy)
+    # 第 k 步的终点仍在格子内要求 k < steps
+    return NEVER if steps == math.inf else max(0, int(steps - STEP_MARGIN))
+
+
+class ProjectileStore:
+    """
+    子弹的结构数组存储 - 第 i 颗子弹的状态分布在各列表的第 i 项，顺序就是发射顺序
+    """
+    def __init__(self):
+        self.xs = []        # 中心位置
+        self.ys = []
+        self.vxs = []       # 每步位移
+        self.vys = []
+        self.damages = []
+        self.owners = []
+        self.sprites = []   # 旋转后的图像
+        self.half_widths = []   # 图像尺寸的一半 (碰撞矩形以位置为中心)
+        self.half_heights = []
+        self.widths = []    # 图像尺寸 (碰撞矩形尺寸)
+        self.heights = []
+        self.trace_steps = []  # 下一次需要遍历碰撞格的步序号
+        self.alive = []     # 存活标记，compact() 时移除 False 的子弹
+        self.step = 0       # 已推进的步数
+        self._direction = pygame.Vector2()  # 发射时计算速度用的临时向量
+
+    def __len__(self):
+        return len(self.xs)
+
+    def _columns(self):
+        return (self.xs, self.ys, self.vxs, self.vys, self.damages, self.owners, self.sprites,
+                self.half_widths, self.half_heights, self.widths, self.heights, self.trace_steps)
+
+    def clear(self):
+        for column in self._columns():
+            column.clear()
+        self.alive.clear()
+
+    def spawn(self, x, y, direction_vector, speed, damage, owner, style=DEFAULT_PROJECTILE_STYLE):
+        """
+        发射一颗子弹
+        :param direction_vector: 飞行方向 (不需要是单位向量，零向量表示向右)
+        :param speed: 每步移动的像素数
+        """
+        direction = self._direction
+        if direction_vector.length() > 0:
+            direction.update(direction_vector)
+            direction.normalize_ip()
+            direction *= speed
+        else:
+            direction.update(speed, 0)
+        self.xs.append(float(x))
+        self.ys.append(float(y))
+        self.vxs.append(direction.x)
+        self.vys.append(direction.y)
+        self.damages.append(damage)
+        self.owners.append(owner)
+        sprite = projectile_sprites.get(style, -direction.angle_to(RIGHT))
+        self.sprites.append(sprite)
+        width, height = sprite.get_size()
+        self.half_widths.append(width // 2)
+        self.half_heights.append(height // 2)
+        self.widths.append(width)
+        self.heights.append(height)
+        self.trace_steps.append(0)
+        self.alive.append(True)
+
+    def bounds(self, i):
+        """
+        第 i 颗子弹的碰撞矩形 (与把 Rect.center 设为位置时相同)
+        :return: (left, top, right, bottom)
+        """
+        left = pixel(self.xs[i]) - self.half_widths[i]
+        top = pixel(self.ys[i]) - self.half_heights[i]
+        return left, top, left + self.widths[i], top + self.heights[i]
+
+    def bounds_columns(self):
+        """
+        所有子弹的碰撞矩形 (按列)
+        :return: (lefts, tops, rights, bottoms)
+        """
+        lefts, tops = self._top_lefts()
+        return lefts, tops, list(map(add, lefts, self.widths)), list(map(add, tops, self.heights))
+
+    def _top_lefts(self):
+        return (list(map(sub, self._pixels(self.xs), self.half_widths)),
+                list(map(sub, self._pixels(self.ys), self.half_heights)))
+
+    @staticmethod
+    def _pixels(values):
+        """按列做 physics.pixel 取整: int(v ± 0.5) 向零截断，即 .5 远离零的四舍五入"""
+        return map(int, map(add, values, map(math.copysign, repeat(0.5), values)))
+
+    def cull(self, bounds, view_left, view_top, view_right, view_bottom):
+        """
+        碰撞矩形与视野不重叠的子弹标记为死亡
+        :param bounds: bounds_columns() 的结果
+        """
+        lefts, tops, rights, bottoms = bounds
+        inside_x = map(and_, map(gt, rights, repeat(view_left)), map(lt, lefts, repeat(view_right)))
+        inside_y = map(and_, map(gt, bottoms, repeat(view_top)), map(lt, tops, repeat(view_bottom)))
+        self.alive = list(map(and_, self.alive, map(and_, inside_x, inside_y)))
+
+    def rect(self, i):
+        """第 i 颗子弹的碰撞矩形 (pygame.Rect)"""
+        left, top, right, bottom = self.bounds(i)
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def advance(self, trace_solid=None, tile_size=1):
+        """
+        所有子弹前进一步，碰到碰撞格的子弹标记为死亡
+        :param trace_solid: 碰撞格射线查询函数 (同 MapDataOperon.trace_solid)，None 时穿过一切
+        :param tile_size: 格子边长，只有越过格子边界的子弹才需要遍历
+        """
+        xs, ys, vxs, vys = self.xs, self.ys, self.vxs, self.vys
+        new_xs = list(map(add, xs, vxs))
+        new_ys = list(map(add, ys, vys))
+        step = self.step
+        if trace_solid is not None:
+            # 整步都在同一个格子内部时不可能进入新的碰撞格，只有到期的子弹才遍历
+            trace_steps = self.trace_steps
+            alive = self.alive
+            for i in compress(range(len(xs)), list(map(le, trace_steps, repeat(step)))):
+                vx = vxs[i]
+                vy = vys[i]
+                _, normal_x, normal_y = trace_solid(xs[i], ys[i], vx, vy)
+                if normal_x or normal_y:
+                    alive[i] = False
+                else:
+                    trace_steps[i] = step + 1 + steps_inside_tile(new_xs[i], new_ys[i], vx, vy, tile_size)
+        self.xs = new_xs
+        self.ys = new_ys
+        self.step = step + 1
+
+    def compact(self):
+        """按存活标记一次性移除死亡的子弹 (保持其余子弹的顺序)"""
+        alive = self.alive
+        if all(alive):
+            return
+        (self.xs, self.ys, self.vxs, self.vys, self.damages, self.owners, self.sprites, self.half_widths,
+         self.half_heights, self.widths, self.heights, self.trace_steps) = (
+            list(compress(column, alive)) for column in self._columns())
+        self.alive = [True] * len(self.xs)
+
+    def draw(self, screen, camera_x=0):
+        """按发射顺序一次性绘制所有子弹"""
+        lefts, tops = self._top_lefts()
+        screen_lefts = list(map(sub, lefts, repeat(camera_x)))
+        screen.blits(zip(self.sprites, zip(self._pixels(screen_lefts), tops)), False)
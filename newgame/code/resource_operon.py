@@ -1,5 +1,6 @@
 import pygame
 import os
+from code.display_mode import convert_image
 
 class ResourceOperon:
     """资源操纵子 - 管理图片和地图资源"""
@@ -26,7 +27,7 @@ class ResourceOperon:
         if path_key not in self.images:
             full_path = self._get_path('images', *subpaths)
             try:
-                image = pygame.image.load(full_path).convert_alpha()
+                image = convert_image(pygame.image.load(full_path))
                 self.images[path_key] = image
             except pygame.error as e:
                 print(f"Error loading image: {full_path} - {e}")
@@ -0,0 +1,98 @@
+import json
+import os
+import sqlite3
+from contextlib import closing
+
+# --- 存档容器 ---
+# 每个存档槽一个 SQLite 文件，每个子系统一个分区 (section)，多个分区在同一个事务中写入；
+# 读取时可以只取需要的分区 (存档选择界面只读 player 分区)
+SAVE_CONTAINER_EXT = '.sav'
+CONTAINER_VERSION = 1
+
+SECTION_PLAYER = 'player'
+SECTION_ENEMIES = 'enemies'
+SECTION_INTERACT_STATE = 'interact_state'
+SECTION_MAP = 'map'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sections (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    data TEXT NOT NULL
+)
+"""
+
+
+def container_path(save_slot):
+    """存档槽对应的容器文件 (未选择存档槽时使用默认容器)"""
+    return f'save_{save_slot}{SAVE_CONTAINER_EXT}' if save_slot is not None else f'player_save{SAVE_CONTAINER_EXT}'
+
+
+def legacy_path(save_slot, section):
+    """容器出现之前各分区单独保存的文件，读取时作为后备"""
+    if save_slot is None:
+        return {SECTION_PLAYER: 'player_save.json', SECTION_ENEMIES: 'enemies_save.json'}.get(section)
+    return {
+        SECTION_PLAYER: f'save_{save_slot}.json',
+        SECTION_ENEMIES: f'enemies_save_{save_slot}.json',
+        SECTION_INTERACT_STATE: f'interact_state_{save_slot}.json',
+        SECTION_MAP: f'map_save_{save_slot}.mdiff',
+    }.get(section)
+
+
+def write_sections(path, sections):
+    """
+    在一个事务中写入 (覆盖) 多个分区，其余分区保持不变
+    :param path: 容器文件
+    :param sections: 分区名 -> 可 JSON 序列化的数据
+    """
+    rows = [(name, CONTAINER_VERSION, json.dumps(data)) for name, data in sections.items()]
+    with closing(sqlite3.connect(path)) as conn:
+        with conn:
+            conn.execute(_SCHEMA)
+            conn.executemany("INSERT OR REPLACE INTO sections (name, version, data) VALUES (?, ?, ?)", rows)
+
+
+def read_sections(path, names):
+    """
+    只读取指定的分区
+    :return: 分区名 -> 数据 (不存在的分区不在结果中)
+    """
+    if not os.path.exists(path):
+        return {}
+    with closing(sqlite3.connect(f'file:{path}?mode=ro', uri=True)) as conn:
+        placeholders = ', '.join('?' * len(names))
+        try:
+            rows = conn.execute(f"SELECT name, data FROM sections WHERE name IN ({placeholders})", list(names)).fetchall()
+        except sqlite3.OperationalError:
+            return {}  # 容器尚未写入任何分区
+    return {name: json.loads(data) for name, data in rows}
+
+
+def read_section(save_slot, section):
+    """
+    读取存档槽的一个分区，容器中没有时读取旧的单独存档文件
+    :return: 分区数据，都不存在时返回 None
+    """
+    data = read_sections(container_path(save_slot), [section]).get(section)
+    if data is not None:
+        return data
+    filename = legacy_path(save_slot, section)
+    if filename is None or not os.path.exists(filename):
+        return None
+    with open(filename, 'r') as f:
+        return json.load(f)
+
+
+def delete_slot(save_slot):
+    """删除存档槽的容器以及旧的单独存档文件"""
+    filenames = [container_path(save_slot)]
+    filenames += [legacy_path(save_slot, section) for section in (SECTION_PLAYER, SECTION_ENEMIES, SECTION_INTERACT_STATE, SECTION_MAP)]
+    filenames += [f'map_save_{save_slot}.json', f'map_save_{save_slot}.bmap']
+    for filename in filenames:
+        if filename and os.path.exists(filename):
+            try:
+                os.remove(filename)
+                print(f"Deleted {filename}")
+            except Exception as e:
+                print(f"Failed to delete {filename}: {e}")
@@ -0,0 +1,117 @@
+import json
+import os
+import time
+import pygame
+from code.save_service import save_service
+from code.save_container import SECTION_PLAYER, read_section
+
+# --- 存档元数据索引 ---
+# 所有存档槽的摘要 (金币、等级、游戏时长、最后位置、缩略图) 保存在一个小文件中，
+# 每次保存存档槽时更新；存档选择界面只读取这个索引，不再解析各存档
+SAVE_INDEX_FILE = 'save_index.json'
+THUMBNAIL_DIR = 'save_thumbnails'
+THUMBNAIL_SIZE = (80, 45)
+INDEX_VERSION = 1
+
+
+def summarise_player(player_data):
+    """
+    从存档容器的 player 分区提取索引摘要
+    :param player_data: Player.get_save_data() 的结果
+    """
+    position = player_data.get('position', {})
+    return {
+        'currency': player_data.get('currency', 0),
+        'level': player_data.get('upgrade_level', 1),
+        'permanent_upgrades': dict(player_data.get('permanent_upgrades', {})),
+        'play_time': player_data.get('play_time', 0),
+        'position': [position.get('x', 0), position.get('y', 0)],
+        'saved_at': time.time(),
+        'thumbnail': None
+    }
+
+
+def thumbnail_path(save_slot):
+    return os.path.join(THUMBNAIL_DIR, f"slot_{save_slot}.png")
+
+
+class SaveIndex:
+    """
+    存档元数据索引 - 内存中保存全部条目，修改后把整份快照交给后台存档服务写入
+    """
+    def __init__(self, filename=SAVE_INDEX_FILE):
+        self.filename = filename
+        self._entries = None  # str(存档槽) -> 摘要，首次使用时载入
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        save_service.flush()
+        self._entries = {}
+        try:
+            with open(self.filename, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION:
+                self._entries = data.get('slots', {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Failed to read save index {self.filename}, rebuilding it: {e}")
+
+    def _save(self):
+        snapshot = {'version': INDEX_VERSION, 'slots': dict(self._entries)}
+        save_service.save_json(self.filename, snapshot)
+
+    def get(self, save_slot):
+        """
+        获取存档槽的摘要，索引中没有时从存档的 player 分区补建 (兼容建立索引之前的存档)
+        :return: 摘要字典，存档槽为空时返回 None
+        """
+        self._load()
+        entry = self._entries.get(str(save_slot))
+        if entry is not None:
+            return entry
+        player_data = read_section(save_slot, SECTION_PLAYER)
+        if player_data is None:
+            return None
+        entry = summarise_player(player_data)
+        self._entries[str(save_slot)] = entry
+        self._save()
+        return entry
+
+    def record(self, save_slot, player_data, thumbnail=None):
+        """
+        保存存档槽后更新其摘要
+        :param player_data: 本次写入的 player 分区快照
+        :param thumbnail: 已缩放到 THUMBNAIL_SIZE 的画面 (pygame.Surface)，None 时保留原缩略图
+        """
+        self._load()
+        entry = summarise_player(player_data)
+        previous = self._entries.get(str(save_slot))
+        if thumbnail is not None:
+            path = thumbnail_path(save_slot)
+            os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+
+            def write_thumbnail(temp_path):
+                with open(temp_path, 'wb') as f:
+                    pygame.image.save(thumbnail, f, 'png')
+            save_service.submit(path, write_thumbnail)
+            entry['thumbnail'] = path
+        elif previous is not None:
+            entry['thumbnail'] = previous.get('thumbnail')
+        self._entries[str(save_slot)] = entry
+        self._save()
+
+    def remove(self, save_slot):
+        """删除存档槽的摘要和缩略图"""
+        self._load()
+        entry = self._entries.pop(str(save_slot), None)
+        if entry is None:
+            return
+        if entry.get('thumbnail') and os.path.exists(entry['thumbnail']):
+            os.remove(entry['thumbnail'])
+        self._save()
+
+
+# 全局存档索引实例
+save_index = SaveIndex()
@@ -1,6 +1,7 @@
 import pygame
-import json
-import os
+from code.save_service import save_service
+from code.save_container import delete_slot
+from code.save_index import save_index
 
 class SaveSelectOperon:
     """
@@ -108,6 +109,9 @@ class SaveSelectOperon:
             'no_hovered': False
         }
         
+        # 缩略图缓存: 存档槽 -> (保存时间, Surface)
+        self.thumbnails = {}
+        
         # 返回按钮
         self.back_button = {
             'text': '返回',
@@ -150,17 +154,12 @@ class SaveSelectOperon:
     
     def _load_save_data(self):
         """加载存档数据"""
+        save_service.flush() # 等待后台写入完成，避免读到旧存档
         for slot_num in self.save_slots:
-            save_file = f'save_{slot_num}.json'
-            
-            # Load player data
-            if os.path.exists(save_file):
-                try:
-                    with open(save_file, 'r') as f:
-                        self.save_slots[slot_num]['data'] = json.load(f)
-                except:
-                    self.save_slots[slot_num]['data'] = None
-            else:
+            # Load slot summary from the save index
+            try:
+                self.save_slots[slot_num]['data'] = save_index.get(slot_num)
+            except:
                 self.save_slots[slot_num]['data'] = None
                 
             # Check if map file exists for this slot
@@ -169,21 +168,10 @@ class SaveSelectOperon:
             
     def _delete_save_file(self, slot_num):
         """删除指定存档的所有相关文件"""
-        import os
-        files_to_delete = [
-            f'save_{slot_num}.json',
-            f'enemies_save_{slot_num}.json',
-            f'interact_state_{slot_num}.json',
-            f'map_save_{slot_num}.json'
-        ]
-        
-        for filename in files_to_delete:
-            if os.path.exists(filename):
-                try:
-                    os.remove(filename)
-                    print(f"Deleted {filename}")
-                except Exception as e:
-                    print(f"Failed to delete {filename}: {e}")
+        save_service.flush() # 避免删除后又被后台写入的存档恢复
+        delete_slot(slot_num)
+        save_index.remove(slot_num)
+        self.thumbnails.pop(slot_num, None)
         
         # 重新加载存档数据
         self._load_save_data()
@@ -387,6 +375,11 @@ class SaveSelectOperon:
         """绘制已有存档的槽位"""
         has_map = self.save_slots[slot_num]['has_map']
         
+        # 缩略图
+        thumbnail = self._get_thumbnail(slot_num, data)
+        if thumbnail is not None:
+            screen.blit(thumbnail, (rect.x + 10, rect.y + 8))
+        
         # 存档编号
         number_text = f"存档 {slot_num}"
         number_surface = self.font.render(number_text, True, self.colors['text'])
@@ -394,6 +387,15 @@ class SaveSelectOperon:
         number_y = rect.y + 15
         screen.blit(number_surface, (number_x, number_y))
         
+        # 游戏时长
+        minutes, seconds = divmod(int(data.get('play_time', 0)), 60)
+        hours, minutes = divmod(minutes, 60)
+        time_text = f"时长: {hours}:{minutes:02d}:{seconds:02d}"
+        time_surface = self.small_font.render(time_text, True, self.colors['text'])
+        time_x = rect.centerx - time_surface.get_width() // 2
+        time_y = rect.y + 40
+        screen.blit(time_surface, (time_x, time_y))
+        
         # 角色等级
         level = data.get('level', 1)
         level_text = f"等级: {level}"
@@ -428,6 +430,21 @@ class SaveSelectOperon:
         map_y = rect.y + 90
         screen.blit(map_surface, (map_x, map_y))
     
+    def _get_thumbnail(self, slot_num, data):
+        """获取存档缩略图，只在存档重新保存后才从磁盘重新读取"""
+        path = data.get('thumbnail')
+        if not path:
+            return None
+        cached = self.thumbnails.get(slot_num)
+        if cached is not None and cached[0] == data.get('saved_at'):
+            return cached[1]
+        try:
+            thumbnail = pygame.image.load(path)
+        except (pygame.error, FileNotFoundError):
+            thumbnail = None
+        self.thumbnails[slot_num] = (data.get('saved_at'), thumbnail)
+        return thumbnail
+    
     def _draw_back_button(self, screen):
         """绘制返回按钮"""
         rect = self.back_button['rect']
@@ -0,0 +1,136 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from code.save_container import write_sections
+
+
+def write_atomic(filename, write_func):
+    """
+    原子写入文件: 先写入同目录下的临时文件并落盘，再改名覆盖目标文件，
+    进程崩溃时目标文件要么是旧内容要么是完整的新内容
+    :param filename: 目标文件
+    :param write_func: 接收临时文件路径并写入内容的函数
+    """
+    temp_filename = f"{filename}.tmp"
+    try:
+        write_func(temp_filename)
+        with open(temp_filename, 'rb+') as f:
+            os.fsync(f.fileno())
+        os.replace(temp_filename, filename)
+    except BaseException:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+        raise
+
+
+class _FileJob:
+    """整文件写入任务"""
+    def __init__(self, filename, write_func, message):
+        self.filename = filename
+        self.write_func = write_func
+        self.message = message
+
+    def run(self):
+        write_atomic(self.filename, self.write_func)
+        return [self.message]
+
+
+class _SectionJob:
+    """存档容器写入任务 - 尚未写入的分区合并到同一个事务中"""
+    def __init__(self, filename):
+        self.filename = filename
+        self.sections = {}  # 分区名 -> 快照数据 (或在工作线程中生成数据的函数)
+        self.messages = {}
+
+    def add(self, sections, message):
+        self.sections.update(sections)
+        for name in sections:
+            self.messages[name] = message
+
+    def run(self):
+        sections = {name: data() if callable(data) else data for name, data in self.sections.items()}
+        write_sections(self.filename, sections)
+        return list(dict.fromkeys(self.messages.values()))
+
+
+class SaveService:
+    """
+    后台存档服务 - 游戏线程只负责生成快照并提交，序列化和写盘在工作线程完成。
+    同一文件在写入前被多次提交时只写最新的快照。
+    """
+    def __init__(self):
+        self._pending = OrderedDict()  # 目标文件 -> 写入任务
+        self._condition = threading.Condition()
+        self._busy = False
+        self._thread = None
+
+    def _enqueue(self, filename, job):
+        self._pending[filename] = job
+        self._pending.move_to_end(filename)
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="SaveService", daemon=True)
+            self._thread.start()
+        self._condition.notify_all()
+
+    def submit(self, filename, write_func, message=None):
+        """
+        提交一个整文件写入任务
+        :param filename: 目标文件
+        :param write_func: 接收文件路径并写入内容的函数 (在工作线程调用，只能访问快照数据)
+        :param message: 写入成功后打印的提示
+        """
+        with self._condition:
+            self._enqueue(filename, _FileJob(filename, write_func, message))
+
+    def save_json(self, filename, data, message=None, indent=None):
+        """
+        提交 JSON 存档 (data 必须是调用方不会再修改的快照)
+        :param indent: json.dump 的缩进
+        """
+        def write_json(path):
+            with open(path, 'w') as f:
+                json.dump(data, f, indent=indent)
+        self.submit(filename, write_json, message)
+
+    def save_sections(self, filename, sections, message=None):
+        """
+        提交存档容器的若干分区，同一次提交的分区保证在同一个事务中写入
+        :param filename: 容器文件
+        :param sections: 分区名 -> 快照数据，也可以是在工作线程中生成数据的函数
+        :param message: 写入成功后打印的提示
+        """
+        with self._condition:
+            job = self._pending.get(filename)
+            if not isinstance(job, _SectionJob):
+                job = _SectionJob(filename)
+            job.add(sections, message)
+            self._enqueue(filename, job)
+
+    def flush(self, timeout=None):
+        """
+        等待所有已提交的写入完成 (读取存档前、退出游戏前调用)
+        :return: 是否在超时前全部完成
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._busy = False
+                    self._condition.notify_all()
+                    self._condition.wait()
+                filename, job = self._pending.popitem(last=False)
+                self._busy = True
+            try:
+                for message in job.run():
+                    if message:
+                        print(message)
+            except Exception as e:
+                print(f"Failed to save {filename}: {e}")
+
+
+# 全局存档服务实例
+save_service = SaveService()
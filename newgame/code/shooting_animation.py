@@ -1,5 +1,7 @@
 import pygame
 import os
+from code.display_mode import convert_image
+from code.sim_clock import sim_clock
 
 class ShootingAnimation:
     """远程射击动画系统"""
@@ -40,7 +42,7 @@ class ShootingAnimation:
 
             if os.path.exists(frame_path):
                 try:
-                    frame = pygame.image.load(frame_path).convert_alpha()
+                    frame = convert_image(pygame.image.load(frame_path))
                     # 调整图片大小
                     original_width, original_height = frame.get_size()
                     scale_factor = max(64 / original_width, 128 / original_height)
@@ -58,7 +60,7 @@ class ShootingAnimation:
 
     def start_shooting(self, direction=1):
         """开始射击动画"""
-        current_time = pygame.time.get_ticks()
+        current_time = sim_clock.now
         time_since_last_shot = current_time - self.last_shot_time
         time_since_last_sequence = current_time - self.last_shot_sequence_time
 
@@ -106,7 +108,7 @@ class ShootingAnimation:
         if not self.is_active:
             return
 
-        current_time = pygame.time.get_ticks()
+        current_time = sim_clock.now
 
         # 检查是否超过1秒没有射击，如果是则停止动画
         time_since_last_shot = current_time - self.last_shot_time
@@ -169,7 +171,7 @@ class ShootingAnimation:
         if not self.is_active:
             return False
 
-        current_time = pygame.time.get_ticks()
+        current_time = sim_clock.now
         time_since_last_shot = current_time - self.last_shot_time
 
         # 只有在最后一次射击后1秒内才停止移动
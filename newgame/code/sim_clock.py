@@ -0,0 +1,33 @@
+class SimClock:
+    """
+    模拟时钟 - 每个模拟步推进一次并快照当前时间，所有 operon 读取 now 而不是各自调用
+    pygame.time.get_ticks()，同一步内的实体看到的时间相同。
+    只在世界被模拟时推进 (菜单、暂停、背包界面时计时器全部停住)，
+    同样的输入序列总能得到同样的计时结果 (录像回放、无界面模式下按 CPU 最快速度运行时都一致)
+    """
+    def __init__(self):
+        self._ticks = 0.0
+        self.now = 0  # 当前模拟步的时间 (毫秒，整数，与 pygame.time.get_ticks 相同)
+        self.dt = 0.0  # 当前模拟步的时长 (秒)
+        self.frame = 0  # 已推进的模拟步数
+
+    def get_ticks(self):
+        """当前模拟时间 (毫秒)，与 now 相同"""
+        return self.now
+
+    def advance(self, milliseconds):
+        """推进一个模拟步"""
+        self._ticks += milliseconds
+        self.now = int(self._ticks)
+        self.dt = milliseconds / 1000
+        self.frame += 1
+
+    def reset(self, ticks=0):
+        self._ticks = float(ticks)
+        self.now = int(ticks)
+        self.dt = 0.0
+        self.frame = 0
+
+
+# 全局模拟时钟实例
+sim_clock = SimClock()
@@ -1,5 +1,7 @@
 import pygame
 import os
+from code.display_mode import convert_image
+from code.sim_clock import sim_clock
 
 class SimpleFrameAnimation:
     """简单的帧动画类，用于循环播放一系列图片"""
@@ -34,7 +36,7 @@ class SimpleFrameAnimation:
 
             if os.path.exists(frame_path):
                 try:
-                    frame = pygame.image.load(frame_path).convert_alpha()
+                    frame = convert_image(pygame.image.load(frame_path))
                     # 等比例放大图片，使其比碰撞体积稍大一点
                     # 碰撞体积是32x64，我们将其放大到更合适的尺寸
                     original_width, original_height = frame.get_size()
@@ -60,7 +62,7 @@ class SimpleFrameAnimation:
         """开始播放动画"""
         self.is_playing = True
         self.current_frame_index = 0
-        self.last_frame_time = pygame.time.get_ticks()
+        self.last_frame_time = sim_clock.now
 
     def stop(self):
         """停止播放动画"""
@@ -71,7 +73,7 @@ class SimpleFrameAnimation:
         if not self.is_playing or not self.frames:
             return
 
-        current_time = pygame.time.get_ticks()
+        current_time = sim_clock.now
         if current_time - self.last_frame_time > self.frame_duration:
             self.current_frame_index = (self.current_frame_index + 1) % len(self.frames)
             self.last_frame_time = current_time
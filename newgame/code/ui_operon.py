@@ -1,4 +1,5 @@
 import pygame
+from code.sim_clock import sim_clock
 
 class UIOperon:
     """
@@ -141,7 +142,7 @@ class UIOperon:
         """
         绘制技能冷却和药水数量信息。
         """
-        current_time = pygame.time.get_ticks()
+        current_time = sim_clock.now
         start_x = 10
         start_y = screen.get_height() - 100
         line_height = 25
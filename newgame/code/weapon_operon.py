@@ -1,4 +1,5 @@
 import pygame
+from code.sim_clock import sim_clock
 
 class Weapon:
     """武器的基类，定义通用属性。"""
@@ -198,7 +199,7 @@ class WeaponOperon:
         direction_vector = pygame.Vector2(self.aiming_direction, 0)
 
         # --- 冷却检查 (技能攻击和有冷却的普通攻击) ---
-        current_time = pygame.time.get_ticks()
+        current_time = sim_clock.now
         if slot in self.skill_cooldowns and current_time < self.skill_cooldowns[slot]:
             # Weapon is on cooldown
             return None
@@ -229,7 +230,7 @@ class WeaponOperon:
             self.attack_range = attack_data.get('range', 60)
             # 近战攻击的方向也使用计算好的瞄准方向
             self.attack_direction = direction_vector
-            self.attack_timer = pygame.time.get_ticks()
+            self.attack_timer = sim_clock.now
 
             # 根据鼠标位置确定攻击方向
             mouse_screen_x = mouse_pos[0] + camera_x if camera_x else mouse_pos[0]
@@ -250,7 +251,7 @@ class WeaponOperon:
 
     def update(self, player_rect, mouse_pos):
         """更新近战攻击和射击状态。"""
-        current_time = pygame.time.get_ticks()
+        current_time = sim_clock.now
 
         # 更新近战攻击状态
         if self.is_attacking:
@@ -278,7 +279,7 @@ class WeaponOperon:
 
     def get_shot_interval_info(self):
         """获取射击间隔信息，用于动画系统决定播放哪一帧"""
-        current_time = pygame.time.get_ticks()
+        current_time = sim_clock.now
         time_since_last_shot = current_time - self.last_shot_time
 
         # 如果距离上次射击不到1秒，返回True表示应该播放最后一张图片
@@ -291,11 +292,11 @@ class WeaponOperon:
         rare_weapons = [FireSword(), IceBow()]
         
         # Randomly select a rare weapon
-        new_weapon = rare_weapons[pygame.time.get_ticks() % len(rare_weapons)]
+        new_weapon = rare_weapons[sim_clock.now % len(rare_weapons)]
         
         # Replace a random weapon slot
         slot_keys = list(self.slots.keys())
-        random_slot = slot_keys[pygame.time.get_ticks() % len(slot_keys)]
+        random_slot = slot_keys[sim_clock.now % len(slot_keys)]
         
         old_weapon = self.slots[random_slot]
         self.slots[random_slot] = new_weapon
@@ -1,3 +1,6 @@
+import os
+import random
+import time
 import pygame
 from code.input_operon import InputOperon
 from code.movement_operon import MovementOperon
@@ -14,21 +17,67 @@ from code.map_modules.map_data_operon import MapDataOperon, COLLISION, NPC, EMPT
 from code.map_modules.map_render_operon import MapRenderOperon
 from code.map_modules.map_edit_operon import MapEditOperon
 from code.map_modules.interact_point_operon import InteractPointOperon, INTERACT_DOOR, INTERACT_SCROLL, INTERACT_CHEST
+from code.map_modules.map_store import HEAD_FILE, read_head, prune_blobs
+from code.save_service import save_service
+from code.save_container import (SECTION_PLAYER, SECTION_ENEMIES, SECTION_INTERACT_STATE, SECTION_MAP,
+                                 container_path, read_section, write_sections)
+from code.save_index import save_index, THUMBNAIL_SIZE
+from code.display_mode import enable_headless
+from code.sim_clock import sim_clock
+from code.input_recorder import InputRecorder, InputReplay, REPLAY_SLOT
+from code.frame_profiler import frame_profiler, PROFILE_TRACE_FILE
 
 # --- Constants ---
 SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 720
-FPS = 60
+FPS = 60 # Simulation steps per second; physics constants are tuned per step
+SIM_DT = 1.0 / FPS
+MAX_RENDER_FPS = 144 # Render cap, independent of the simulation rate
+MAX_FRAME_TIME = 0.25 # Longer frames (stalls, window drags) are clamped so the simulation never spirals
+MAX_SIM_STEPS_PER_FRAME = 5 # Catch-up bound; any further backlog is dropped
+MAX_INTERPOLATION_DISTANCE = 4 * 32 # Larger moves within one step are teleports and are not interpolated
 TILE_SIZE = 32
+BASE_MAP_SOURCE = 'custom_map.json'
+LEGACY_BASE_MAP_FILE = 'custom_map.bmap' # Base map written before the map store existed
 
 # --- Game Class ---
 class Game:
     """Main game class that orchestrates all game components following bacterial code principles."""
-    def __init__(self):
+    def __init__(self, headless=False, record=None, replay=None, seed=None):
+        """
+        :param headless: simulate without a window (SDL dummy driver); nothing is rendered and assets are not converted
+        :param record: file to record the session's input to, from the moment a game is started
+        :param replay: recorded session to play back instead of live input
+        :param seed: fixed random seed (benchmarks); a fresh one is drawn by default
+        """
+        self.headless = headless
+        
+        # Deterministic runs: the seed is fixed before any operon draws from the random module
+        self.record_path = record
+        self.input_recorder = None
+        self.input_replay = InputReplay(replay) if replay else None
+        if self.input_replay is not None:
+            self._seed = self.input_replay.metadata['seed']
+        elif seed is not None:
+            self._seed = seed
+        else:
+            self._seed = int.from_bytes(os.urandom(8), 'little') >> 1
+        random.seed(self._seed)
+        sim_clock.reset()
+        
+        if headless:
+            enable_headless()
         pygame.init()
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        if headless:
+            # Off-screen surface that is never drawn to or presented; only its size is read
+            self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        else:
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Bacterial Roguelite")
         self.clock = pygame.time.Clock()
+        # Positions before the latest simulation step, for render interpolation
+        self._previous_positions = {}
+        self._previous_camera_x = None
         self.is_running = True
         self.is_edit_mode = True # Start in edit mode
         self.is_paused = False
@@ -40,10 +89,11 @@ class Game:
         
         # Chest reset timer
         self.chest_reset_interval = 300000  # 5 minutes in milliseconds
-        self.last_chest_reset = pygame.time.get_ticks()
+        self.last_chest_reset = sim_clock.now
         
         # Initialize all operons
         self._initialize_operons()
+        self._register_profiled_methods()
         
         # Set camera to center on the player
         self.camera_x = self.movement_operon.player.rect.centerx - SCREEN_WIDTH / 2
@@ -52,8 +102,11 @@ class Game:
         self.combat_operon.register_entity(self.movement_operon.player, 100)
         self.movement_operon.player._combat_operon = self.combat_operon
         
-        # Load saved currency and upgrades
-        self.movement_operon.player.load_currency(self.selected_save_slot)
+        if self.input_replay is not None:
+            self._start_replay()
+        else:
+            # Load saved currency and upgrades
+            self.movement_operon.player.load_currency(self.selected_save_slot)
 
     def _initialize_operons(self):
         """Initialize all operons with their dependencies."""
@@ -63,8 +116,8 @@ class Game:
         map_width = 1000
         map_height = SCREEN_HEIGHT // TILE_SIZE
         self.map_data_operon = MapDataOperon(map_width, map_height, TILE_SIZE)
-        # Load map - always load custom_map.json as the base map for all save slots
-        self.map_data_operon.load_from_file('custom_map.json')
+        # Load map - the binary base map is shared by all save slots
+        self._load_base_map()
         
         # Map module operons
         self.map_render_operon = MapRenderOperon(self.map_data_operon)
@@ -73,7 +126,7 @@ class Game:
         
         # Other operons
         self.movement_operon = MovementOperon(SCREEN_WIDTH, SCREEN_HEIGHT, self.map_data_operon, self.interact_point_operon)
-        self.combat_operon = CombatOperon()
+        self.combat_operon = CombatOperon((SCREEN_WIDTH, SCREEN_HEIGHT))
         self.enemy_operon = EnemyOperon(self.combat_operon)
         self.generation_operon = GenerationOperon(self.enemy_operon)
         self.npc_operon = NPCOperon()
@@ -92,6 +145,31 @@ class Game:
         # Generate level using spawn points
         self._generate_level_initial()
 
+    def _register_profiled_methods(self):
+        """Register the per-frame pipeline with the frame profiler (only wrapped while it is enabled)."""
+        frame_profiler.unregister_all()
+        frame_profiler.register(self, 'update_state', 'render_frame')
+        frame_profiler.register(self.input_operon, 'process_input')
+        for operon in (self.movement_operon, self.enemy_operon, self.npc_operon,
+                       self.combat_operon, self.weapon_operon, self.enhanced_ui_operon):
+            frame_profiler.register(operon, 'update', 'draw')
+        frame_profiler.register(self.map_render_operon, 'draw_grid')
+        frame_profiler.register(self.menu_operon, 'draw')
+        frame_profiler.register(self.save_select_operon, 'draw')
+
+    def _load_base_map(self):
+        """Map the shared base map from the map store, importing custom_map.json (or an older custom_map.bmap) when it is newer."""
+        head_time = os.path.getmtime(HEAD_FILE) if read_head() is not None else None
+        sources = [source for source in (BASE_MAP_SOURCE, LEGACY_BASE_MAP_FILE)
+                   if os.path.exists(source) and (head_time is None or os.path.getmtime(source) > head_time)]
+        if sources:
+            source = max(sources, key=os.path.getmtime)
+            self.map_data_operon.load_from_file(source)
+            self.map_data_operon.save_base_map()
+            print(f"Imported {source} into the map store")
+        self.map_data_operon.load_base_map()
+        prune_blobs()
+
     def _generate_level_initial(self):
         """Generate level using spawn points from map or default layout."""
         if self.map_data_operon.spawn_points:
@@ -115,11 +193,11 @@ class Game:
         if self.selected_save_slot is not None:
             player.load_currency(self.selected_save_slot, self.weapon_operon)
             # Load enemies as well
-            enemy_save_file = f'enemies_save_{self.selected_save_slot}.json'
-            self.enemy_operon.load_enemies(enemy_save_file, self.combat_operon)
+            self.enemy_operon.load_enemies(self.selected_save_slot, self.combat_operon)
+            # Load the slot's map (its diff applied over the shared base map)
+            self.map_data_operon.load_from_file(None, save_slot=self.selected_save_slot)
             # Load interact point states
-            interact_state_file = f'interact_state_{self.selected_save_slot}.json'
-            self.map_data_operon.load_interact_state(interact_state_file)
+            self.map_data_operon.load_interact_state(self.selected_save_slot)
         else:
             # Reset currency and upgrades
             player.currency = 0
@@ -131,6 +209,7 @@ class Game:
             player.scroll_collected = 0
             player.upgrade_level = 1
             player.upgrade_cost = 500
+            player.play_time = 0.0
             player.can_upgrade = False
             player.notifications = []
             
@@ -156,14 +235,37 @@ class Game:
         print(f"Player state loaded for save slot {self.selected_save_slot}")
 
     def run(self):
-        """The main game loop following bacterial principles."""
+        """The main game loop: fixed-rate simulation steps, rendering as often as allowed."""
+        previous_time = time.perf_counter()
+        accumulator = 0.0
+        pending_events = []
         try:
             while self.is_running:
+                if frame_profiler.enabled:
+                    frame_profiler.begin_frame()
                 events = pygame.event.get()
                 self.handle_events(events)
-                self.update_state(events)
-                self.render_frame()
-                self.clock.tick(FPS)
+                # Input events are consumed by the next simulation step, even if this frame runs none
+                pending_events.extend(events)
+                
+                now = time.perf_counter()
+                accumulator += min(now - previous_time, MAX_FRAME_TIME)
+                previous_time = now
+                
+                steps = 0
+                while accumulator >= SIM_DT and steps < MAX_SIM_STEPS_PER_FRAME:
+                    self._capture_previous_state()
+                    self.update_state(pending_events)
+                    pending_events = []
+                    accumulator -= SIM_DT
+                    steps += 1
+                if accumulator >= SIM_DT:
+                    # Too slow to catch up: drop the backlog rather than fall further behind
+                    accumulator %= SIM_DT
+                
+                self.render_frame(accumulator / SIM_DT)
+                frame_profiler.end_frame()
+                self.clock.tick(MAX_RENDER_FPS)
         except KeyboardInterrupt:
             print("Game interrupted")
         finally:
@@ -171,11 +273,94 @@ class Game:
             self._cleanup()
             pygame.quit()
 
+    def start_game(self, save_slot):
+        """Enter game mode on a save slot (None plays without a slot)."""
+        if self.record_path is not None and self.input_recorder is None:
+            self._start_recording(save_slot)
+        self.selected_save_slot = save_slot
+        self.current_screen = "game"
+        self.is_edit_mode = False
+        pygame.display.set_caption("Bacterial Roguelite - Game Mode")
+        # Reset player state for new game - this will load saved position
+        self._reset_player_state()
+        # Update camera to follow loaded player position
+        self.camera_x = self.movement_operon.player.rect.centerx - SCREEN_WIDTH / 2
+
+    def _start_recording(self, save_slot):
+        """Begin recording input, together with everything needed to start the session again identically."""
+        save_service.flush()
+        sections = {}
+        if save_slot is not None:
+            for section in (SECTION_PLAYER, SECTION_ENEMIES, SECTION_INTERACT_STATE, SECTION_MAP):
+                data = read_section(save_slot, section)
+                if data is not None:
+                    sections[section] = data
+        metadata = {
+            'seed': self._seed,
+            'start_ticks': sim_clock.now,
+            'save_slot': save_slot,
+            'initial_player': read_section(None, SECTION_PLAYER),  # loaded when the game was created
+            'sections': sections
+        }
+        self.input_recorder = InputRecorder(self.record_path, metadata)
+        print(f"Recording input to {self.record_path}")
+
+    def stop_recording(self):
+        """Finish the input recording, if one is running."""
+        if self.input_recorder is not None:
+            self.input_recorder.close()
+            self.input_recorder = None
+
+    def _start_replay(self):
+        """Start the recorded session again from the same saves, clock and seed."""
+        metadata = self.input_replay.metadata
+        if metadata['initial_player'] is not None:
+            self.movement_operon.player.apply_save_data(metadata['initial_player'])
+        
+        save_slot = None
+        if metadata['save_slot'] is not None:
+            # The recorded slot is loaded from a scratch slot, leaving the real save untouched
+            save_slot = REPLAY_SLOT
+            scratch_file = container_path(REPLAY_SLOT)
+            if os.path.exists(scratch_file):
+                os.remove(scratch_file)
+            write_sections(scratch_file, metadata['sections'])
+        
+        sim_clock.reset(metadata['start_ticks'])
+        self.start_game(save_slot)
+        if save_slot is not None:
+            os.remove(container_path(REPLAY_SLOT))
+        print(f"Replaying {self.input_replay.frame_count} steps from {self.input_replay.filename}")
+
+    def run_headless(self, steps, on_step=None):
+        """
+        Run simulation steps back to back as fast as the CPU allows, without rendering.
+        :param steps: number of fixed simulation steps
+        :param on_step: optional callback(game, step) called before each step (bots, probes)
+        :return: wall time taken in seconds
+        """
+        start = time.perf_counter()
+        for step in range(steps):
+            if frame_profiler.enabled:
+                frame_profiler.begin_frame()
+            if on_step:
+                on_step(self, step)
+            self.update_state(pygame.event.get())
+            frame_profiler.end_frame()
+        return time.perf_counter() - start
+
     def handle_events(self, events):
         """Processes quit events and mode switching."""
         # Get mouse position for UI interactions
         mouse_pos = pygame.mouse.get_pos()
         
+        # Profiler keys work on every screen and are never part of the simulation input
+        for event in events:
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                frame_profiler.toggle_overlay()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4 and frame_profiler.enabled:
+                frame_profiler.export_chrome_trace(PROFILE_TRACE_FILE)
+        
         # Handle events based on current screen
         if self.current_screen == "menu":
             result = self.menu_operon.handle_events(events, mouse_pos)
@@ -187,67 +372,85 @@ class Game:
             result = self.save_select_operon.handle_events(events, mouse_pos)
             if result and result.startswith("select_save_"):
                 # Extract save slot number
-                self.selected_save_slot = int(result.split("_")[-1])
-                self.current_screen = "game"
-                self.is_edit_mode = False
-                pygame.display.set_caption("Bacterial Roguelite - Game Mode")
-                # Reset player state for new game - this will load saved position
-                self._reset_player_state()
-                # Update camera to follow loaded player position
-                self.camera_x = self.movement_operon.player.rect.centerx - SCREEN_WIDTH / 2
+                self.start_game(int(result.split("_")[-1]))
             elif result and result.startswith("deleted_save_"):
                 # 存档已被删除，不需要特殊处理，界面会自动更新
                 pass
             elif result == "back_to_menu":
                 self.current_screen = "menu"
         else:
-            # Game events
+            # Game events (game commands arrive through the step's actions)
             for event in events:
                 if event.type == pygame.QUIT:
                     self.is_running = False
-                if event.type == pygame.KEYDOWN:
-                    self._handle_keydown_events(event)
 
-    def _handle_keydown_events(self, event):
-        """Handle keydown events for mode switching."""
-        if event.key == pygame.K_TAB:
+    def _apply_commands(self, actions):
+        """Apply the step's game commands: mode switching, pause, saving, respawn and upgrades."""
+        if actions.get('toggle_edit_mode'):
             self.is_edit_mode = not self.is_edit_mode
             mode = "Editor Mode" if self.is_edit_mode else "Game Mode"
             pygame.display.set_caption(f"Bacterial Roguelite - {mode}")
-        elif event.key == pygame.K_ESCAPE:
+        if actions.get('toggle_pause'):
             # Toggle pause state
             self.is_paused = not getattr(self, 'is_paused', False)
-        elif event.key == pygame.K_i:
+        if actions.get('toggle_inventory'):
             # Toggle inventory
             if not self.is_paused:  # Can't open inventory while paused
                 self.show_inventory = not self.show_inventory
-        elif event.key == pygame.K_s:
-            # Manual save (press S to save)
-            self.movement_operon.player.save_currency(self.selected_save_slot, self.weapon_operon)
-            # Save enemies as well
-            enemy_save_file = f'enemies_save_{self.selected_save_slot}.json' if self.selected_save_slot is not None else 'enemies_save.json'
-            self.enemy_operon.save_enemies(enemy_save_file)
-        elif event.key == pygame.K_r:
+        if actions.get('quick_save'):
+            # Manual save (press S to save player and enemies in one transaction)
+            self._save_progress(include_interact_state=False)
+        if actions.get('respawn'):
             # Handle respawn when player is dead
             if self.movement_operon.player.is_dead:
                 self._handle_player_respawn()
-        elif event.key in [pygame.K_1, pygame.K_2, pygame.K_3]:
+        if actions.get('upgrade_key') is not None:
             # Handle upgrade selection when upgrade is available
             if self.movement_operon.player.can_upgrade:
-                self._handle_upgrade_selection(event.key)
+                self._handle_upgrade_selection(actions['upgrade_key'])
+
+    def _next_actions(self, events):
+        """
+        Actions for this simulation step: the next replayed step, or live input (recorded when recording).
+        :return: actions dict, or None once a replay has ended
+        """
+        in_game = self.current_screen == "game"
+        if self.input_replay is not None and in_game:
+            actions = self.input_replay.next_actions()
+            if actions is None and self.is_running:
+                print(f"Replay finished after {self.input_replay.frame_count} steps")
+                self.is_running = False
+            return actions
+        actions = self.input_operon.process_input(events)
+        if self.input_recorder is not None and in_game:
+            self.input_recorder.record(actions)
+        return actions
 
     def update_state(self, events):
         """The main data processing pipeline for the game."""
-        actions = self.input_operon.process_input(events)
+        actions = self._next_actions(events)
+        if actions is None:
+            return
         
         # Update enhanced UI (for animations and effects)
-        delta_time = 1.0 / FPS
+        delta_time = SIM_DT
         self.enhanced_ui_operon.update(delta_time)
         
-        # If paused or showing inventory, only handle events and UI updates
+        # The world is only simulated in game mode; menus leave it and the simulation clock untouched
+        if self.current_screen != "game":
+            return
+        self._apply_commands(actions)
+        
+        # If paused or showing inventory, only handle events and UI updates (timers stand still too)
         if self.is_paused or self.show_inventory:
             return
         
+        # One clock snapshot per step, shared by every operon
+        sim_clock.advance(SIM_DT * 1000)
+        
+        # Accumulate play time for the save slot summary
+        self.movement_operon.player.play_time += sim_clock.dt
+        
         # Check if it's time to reset chests
         self._check_chest_reset()
         
@@ -262,7 +465,7 @@ class Game:
         
     def _check_chest_reset(self):
         """Check if it's time to reset interact points (chests and scrolls)"""
-        current_time = pygame.time.get_ticks()
+        current_time = sim_clock.now
         if current_time - self.last_chest_reset > self.chest_reset_interval:
             # Reset interact points
             self.map_data_operon.reset_interact_points()
@@ -277,20 +480,6 @@ class Game:
         else:
             self._update_game_mode(actions)
 
-    def _update_edit_mode(self, actions):
-        """Handles updates when in map editor mode."""
-        keys = pygame.key.get_pressed()
-        mouse_buttons = pygame.mouse.get_pressed()
-        
-        # Process map editing when SHIFT is pressed
-        if (keys[pygame.K_LSHIFT] or keys[pygame.K_RSHIFT]) and actions.get('mouse_pos'):
-            self._process_map_editing(actions, mouse_buttons)
-        
-        # Process map saving
-        if actions.get('save_map'):
-            self.map_data_operon.save_to_file('custom_map.json')
-            print("Save action triggered!")
-
     def _process_map_editing(self, actions, mouse_buttons):
         """Process map editing actions."""
         mouse_pos = actions['mouse_pos']
@@ -307,24 +496,22 @@ class Game:
 
     def _update_edit_mode(self, actions):
         """Handles updates when in map editor mode."""
-        keys = pygame.key.get_pressed()
-        mouse_buttons = pygame.mouse.get_pressed()
+        mouse_buttons = actions['mouse_buttons']
         
         # Process map editing when SHIFT is pressed
-        if (keys[pygame.K_LSHIFT] or keys[pygame.K_RSHIFT]) and actions.get('mouse_pos'):
+        if actions['shift_held'] and actions.get('mouse_pos'):
             self._process_map_editing(actions, mouse_buttons)
         
         # Process map saving
-        if actions.get('save_map'):
-            # Save base map to all save slots to keep them synchronized
-            self.map_data_operon.save_to_file('custom_map.json')
-            for slot in range(1, 4):
-                self.map_data_operon.save_to_file(f'map_save_{slot}.json', slot)
+        if actions.get('save_map') and self.input_replay is not None:
+            print("Map saving is disabled while replaying")
+        elif actions.get('save_map'):
+            # Store the base map once and reset every save slot to it (slots only keep a diff)
+            self.map_data_operon.save_base_map(reset_slots=range(1, 4))
             
             # Save interact point states separately for each save slot
             if self.selected_save_slot is not None:
-                interact_state_file = f'interact_state_{self.selected_save_slot}.json'
-                self.map_data_operon.save_interact_state(interact_state_file)
+                self.map_data_operon.save_interact_state(self.selected_save_slot)
             
             print("Save action triggered!")
 
@@ -404,15 +591,14 @@ class Game:
         # Handle player interactions
         self._handle_player_interactions()
         
+        # Index entity positions once; attacks and projectiles below all query it
+        self.combat_operon.rebuild_broadphase([self.movement_operon.player] + self.enemy_operon.get_all_enemies())
+        
         # Process all attacks
         self._process_all_attacks(player_attack, enemy_attacks)
         
         # Update combat systems
-        self.combat_operon.update(
-            [self.movement_operon.player] + self.enemy_operon.get_all_enemies(),
-            self.camera_x,
-            self.map_data_operon
-        )
+        self.combat_operon.update(self.camera_x, self.map_data_operon)
         
         # Update weapon operon
         self.weapon_operon.update(self.movement_operon.player.rect, actions.get('mouse_pos'))
@@ -440,7 +626,7 @@ class Game:
         # Add chest notification
         chest_notification = {
             'text': f"Ancient Weapon: {reward_info['new_weapon']}!",
-            'start_time': pygame.time.get_ticks(),
+            'start_time': sim_clock.now,
             'duration': 4000,
             'color': (255, 215, 0)
         }
@@ -466,19 +652,16 @@ class Game:
 
     def _process_all_attacks(self, player_attack, enemy_attacks):
         """Process all attacks from player and enemies."""
-        all_entities = [self.movement_operon.player] + self.enemy_operon.get_all_enemies()
-        
         if player_attack:
             self.combat_operon.process_attack(
                 player_attack,
-                all_entities,
                 self.movement_operon.player,
                 self.map_data_operon
             )
         
         for attack in enemy_attacks:
             attacker = attack.pop('attacker')
-            self.combat_operon.process_attack(attack, all_entities, attacker, self.map_data_operon)
+            self.combat_operon.process_attack(attack, attacker, self.map_data_operon)
 
     def _update_camera(self):
         """Update camera to follow player - creates infinite scroll effect."""
@@ -489,6 +672,9 @@ class Game:
         if player_screen_x < SCREEN_WIDTH * 0.4:
             self.camera_x += player_screen_x - SCREEN_WIDTH * 0.4
 
+        # Keep the map chunks around the camera paged in
+        self.map_data_operon.stream_chunks_around(self.camera_x, SCREEN_WIDTH)
+
     def _get_nearby_interactable(self):
         """Get the nearest interactable object to the player."""
         player = self.movement_operon.player
@@ -505,7 +691,7 @@ class Game:
             player_world_pos = (player.rect.centerx, player.rect.centery)
             target_pos = pygame.Vector2(player_world_pos)
             
-            for point in self.interact_point_operon.map_data.interact_points:
+            for point in self.interact_point_operon.map_data.interact_index.query_radius(player_world_pos, interaction_range):
                 if point.get('is_collected', False):
                     continue
                     
@@ -595,21 +781,74 @@ class Game:
             else:
                 print("Failed to apply upgrade - not enough currency")
 
+    def _save_progress(self, include_interact_state=True):
+        """Save player, enemies and interact point states to the slot's save container in a single transaction."""
+        if self.input_replay is not None:
+            return  # A replay never overwrites real saves
+        filename = container_path(self.selected_save_slot)
+        player_data = self.movement_operon.player.get_save_data(self.weapon_operon)
+        sections = {
+            SECTION_PLAYER: player_data,
+            SECTION_ENEMIES: self.enemy_operon.get_save_data(),
+        }
+        if include_interact_state and self.selected_save_slot is not None:
+            sections[SECTION_INTERACT_STATE] = self.map_data_operon.get_interact_state()
+        save_service.save_sections(filename, sections, f"Saved {', '.join(sections)} to {filename}")
+        
+        # Update the save select summary, with a thumbnail of the last rendered game frame
+        # (headless runs never render, so their off-screen surface would give a black thumbnail)
+        if self.selected_save_slot is not None:
+            thumbnail = None
+            if self.current_screen == "game" and not self.headless:
+                thumbnail = pygame.transform.smoothscale(self.screen, THUMBNAIL_SIZE)
+            save_index.record(self.selected_save_slot, player_data, thumbnail)
+
     def _cleanup(self):
         """Save currency before game closes."""
+        self.stop_recording()
+        if self.input_replay is not None:
+            return  # A replay never overwrites real saves
         print("Saving game progress...")
-        self.movement_operon.player.save_currency(self.selected_save_slot, self.weapon_operon)
-        # Save enemies as well
-        if self.selected_save_slot is not None:
-            enemy_save_file = f'enemies_save_{self.selected_save_slot}.json'
-            self.enemy_operon.save_enemies(enemy_save_file)
-            # Save interact point states
-            interact_state_file = f'interact_state_{self.selected_save_slot}.json'
-            self.map_data_operon.save_interact_state(interact_state_file)
+        self._save_progress()
+        # Wait for the background writer before the process exits
+        save_service.flush()
         print("Game saved successfully!")
 
-    def render_frame(self):
-        """Renders all game objects to the screen."""
+    def _capture_previous_state(self):
+        """Remember entity positions before a simulation step, for render interpolation."""
+        player = self.movement_operon.player
+        positions = {player: player.rect.topleft}
+        for enemy in self.enemy_operon.enemies:
+            positions[enemy] = enemy.rect.topleft
+        self._previous_positions = positions
+        self._previous_camera_x = self.camera_x
+
+    def _interpolation_offsets(self, alpha):
+        """
+        Offsets that move each entity from its current position back to the blend of its
+        previous and current positions.
+        :param alpha: fraction of a simulation step elapsed since the latest step
+        :return: list of (entity, dx, dy)
+        """
+        offsets = []
+        for entity, (prev_x, prev_y) in self._previous_positions.items():
+            x, y = entity.rect.topleft
+            if abs(x - prev_x) > MAX_INTERPOLATION_DISTANCE or abs(y - prev_y) > MAX_INTERPOLATION_DISTANCE:
+                continue
+            dx = round(prev_x + (x - prev_x) * alpha) - x
+            dy = round(prev_y + (y - prev_y) * alpha) - y
+            if dx or dy:
+                offsets.append((entity, dx, dy))
+        return offsets
+
+    def render_frame(self, alpha=1.0):
+        """
+        Renders all game objects to the screen.
+        :param alpha: fraction of a simulation step elapsed since the latest step (1.0 draws the latest state)
+        """
+        if self.headless:
+            return
+        
         # Clear screen
         self.screen.fill((20, 20, 30))
         
@@ -620,22 +859,44 @@ class Game:
             self.save_select_operon.draw(self.screen)
         else:
             # Draw map and game entities
-            self._render_game_world()
+            self._render_game_world(alpha)
             
             # Draw UI elements
             self._render_ui()
         
+        if frame_profiler.overlay_visible:
+            frame_profiler.draw_overlay(self.screen)
+        
         # Present frame
         pygame.display.flip()
 
-    def _render_game_world(self):
-        """Render the game world including map and entities."""
-        self.map_render_operon.draw_grid(self.screen, self.camera_x)
-        self.movement_operon.draw(self.screen, self.camera_x)
-        self.enemy_operon.draw(self.screen, self.camera_x)
-        self.npc_operon.draw(self.screen, self.camera_x)
-        self.weapon_operon.draw(self.screen, self.camera_x)
-        self.combat_operon.draw(self.screen, self.camera_x)
+    def _render_game_world(self, alpha=1.0):
+        """Render the game world including map and entities, interpolated between the last two simulation steps."""
+        camera_x = self.camera_x
+        offsets = []
+        if alpha < 1.0:
+            previous_camera_x = self._previous_camera_x
+            if previous_camera_x is not None and abs(self.camera_x - previous_camera_x) <= MAX_INTERPOLATION_DISTANCE:
+                camera_x = previous_camera_x + (self.camera_x - previous_camera_x) * alpha
+            offsets = self._interpolation_offsets(alpha)
+        
+        # Entities are drawn from their rects, so shift them for the draw and restore afterwards
+        for entity, dx, dy in offsets:
+            entity.rect.move_ip(dx, dy)
+            if hasattr(entity, 'visual_rect'):
+                entity.visual_rect.move_ip(dx, dy)
+        try:
+            self.map_render_operon.draw_grid(self.screen, camera_x)
+            self.movement_operon.draw(self.screen, camera_x)
+            self.enemy_operon.draw(self.screen, camera_x)
+            self.npc_operon.draw(self.screen, camera_x)
+            self.weapon_operon.draw(self.screen, camera_x)
+            self.combat_operon.draw(self.screen, camera_x)
+        finally:
+            for entity, dx, dy in offsets:
+                entity.rect.move_ip(-dx, -dy)
+                if hasattr(entity, 'visual_rect'):
+                    entity.visual_rect.move_ip(-dx, -dy)
 
     def _set_player_spawn_point(self):
         """Set player spawn point to initial position."""
@@ -669,5 +930,32 @@ class Game:
 
 # --- Main execution ---
 if __name__ == "__main__":
-    game = Game()
-    game.run()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Bacterial Roguelite")
+    parser.add_argument('--headless', type=int, nargs='?', const=0, metavar='STEPS',
+                        help="simulate STEPS fixed steps without a window and report the step rate "
+                             "(with --replay, the whole replay by default)")
+    parser.add_argument('--slot', type=int, help="save slot to load for a headless run")
+    parser.add_argument('--record', metavar='FILE', help="record the session's input to FILE")
+    parser.add_argument('--replay', metavar='FILE', help="play back a recorded session instead of live input")
+    parser.add_argument('--profile-trace', metavar='FILE',
+                        help="profile every frame from the start and write a Chrome trace to FILE on exit")
+    args = parser.parse_args()
+    if args.profile_trace:
+        frame_profiler.enable()
+
+    if args.headless is not None:
+        game = Game(headless=True, record=args.record, replay=args.replay)
+        if game.input_replay is None:
+            game.start_game(args.slot)
+        steps = args.headless or (game.input_replay.frame_count if game.input_replay else 0)
+        elapsed = game.run_headless(steps)
+        game.stop_recording()
+        print(f"Simulated {steps} steps in {elapsed:.2f}s ({steps / max(elapsed, 1e-9):.0f} steps/s)")
+        pygame.quit()
+    else:
+        game = Game(record=args.record, replay=args.replay)
+        game.run()
+    if args.profile_trace:
+        frame_profiler.export_chrome_trace(args.profile_trace)
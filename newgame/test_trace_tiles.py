@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+子弹 DDA 碰撞的回归检查: 正好沿格线移动的子弹不能穿过碰撞格
+"""
+
+import sys
+from code.physics import trace_tiles
+from code.map_modules.tile_grid import TileGrid
+
+TILE_SIZE = 32
+SOLID = 1
+
+
+def test_trace_along_grid_lines():
+    """沿水平/竖直格线移动的点撞上格线两侧的实心格子"""
+    # 第 5 列是一堵竖墙 (x = 160..192)
+    wall = TileGrid(10, 10)
+    for row in range(10):
+        wall.set(5, row, SOLID)
+    # y = 64 正好在第 1、2 行之间的格线上，与 y = 65 的结果应相同
+    assert trace_tiles(wall, TILE_SIZE, SOLID, 10.0, 64.0, 200.0, 0.0) == (0.75, -1, 0)
+    assert trace_tiles(wall, TILE_SIZE, SOLID, 10.0, 65.0, 200.0, 0.0) == (0.75, -1, 0)
+    assert trace_tiles(wall, TILE_SIZE, SOLID, 300.0, 64.0, -200.0, 0.0) == (0.54, 1, 0)
+    print("[OK] 沿水平格线移动会撞上竖墙")
+
+    # 第 5 行是一块地板 (y = 160..192)
+    floor = TileGrid(10, 10)
+    for column in range(10):
+        floor.set(column, 5, SOLID)
+    assert trace_tiles(floor, TILE_SIZE, SOLID, 64.0, 10.0, 0.0, 200.0) == (0.75, 0, -1)
+    assert trace_tiles(floor, TILE_SIZE, SOLID, 64.0, 300.0, 0.0, -200.0) == (0.54, 0, 1)
+    print("[OK] 沿竖直格线移动会撞上地板")
+
+    # 格线只有一侧是实心格子时也算撞上
+    half = TileGrid(10, 10)
+    half.set(5, 1, SOLID)
+    assert trace_tiles(half, TILE_SIZE, SOLID, 10.0, 64.0, 200.0, 0.0) == (0.75, -1, 0)
+    half = TileGrid(10, 10)
+    half.set(5, 2, SOLID)
+    assert trace_tiles(half, TILE_SIZE, SOLID, 10.0, 64.0, 200.0, 0.0) == (0.75, -1, 0)
+    print("[OK] 格线任一侧的实心格子都会被撞上")
+
+    # 两侧都空时照常飞过
+    empty = TileGrid(10, 10)
+    assert trace_tiles(empty, TILE_SIZE, SOLID, 10.0, 64.0, 200.0, 0.0) == (1.0, 0, 0)
+    print("[OK] 两侧没有实心格子时不会误撞")
+
+
+if __name__ == "__main__":
+    try:
+        test_trace_along_grid_lines()
+    except AssertionError:
+        print("[ERROR] 沿格线移动的子弹穿过了碰撞格")
+        sys.exit(1)
+    print("\n--- 所有测试通过！---")